@@ -0,0 +1,79 @@
+"""Throughput of concurrent tool calls, blocking vs. offloaded execution.
+
+"blocking" calls the plain tool function on the event loop, which is how
+FastMCP runs sync tools without the worker pool. "offloaded" goes through
+mcp.call_tool and the bounded executor. Requires a reachable MongoDB
+(MONGODB_URI, default mongodb://localhost:27017).
+
+    uv run python benchmarks/bench_concurrency.py --clients 1 4 16 --calls 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from mongodb_mcp.app import mcp
+from mongodb_mcp.tools import connection, exploration, query, crud
+
+DATABASE = "mcp_bench"
+COLLECTION = "concurrency"
+
+def seed(doc_count: int):
+    client = connection.get_client()
+    coll = client[DATABASE][COLLECTION]
+    if coll.estimated_document_count() >= doc_count:
+        return
+    coll.drop()
+    coll.insert_many(
+        {"i": i, "group": i % 50, "payload": "x" * 200} for i in range(doc_count)
+    )
+
+async def run_clients(clients: int, calls: int, tool_args: dict, offloaded: bool) -> float:
+    async def client_loop():
+        for _ in range(calls):
+            if offloaded:
+                await mcp.call_tool("aggregate", tool_args)
+            else:
+                query.aggregate(**tool_args)
+                await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    return clients * calls / elapsed
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--calls", type=int, default=20, help="Calls per client")
+    parser.add_argument("--docs", type=int, default=50000, help="Documents to seed")
+    args = parser.parse_args()
+
+    result = connection.connect(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    print(result)
+    seed(args.docs)
+
+    # A group over the whole collection: slow enough for blocking to matter
+    tool_args = {
+        "database": DATABASE,
+        "collection": COLLECTION,
+        "pipeline": [{"$group": {"_id": "$group", "n": {"$sum": 1}}}],
+    }
+
+    rows = []
+    for clients in args.clients:
+        before = await run_clients(clients, args.calls, tool_args, offloaded=False)
+        after = await run_clients(clients, args.calls, tool_args, offloaded=True)
+        rows.append({
+            "clients": clients,
+            "blocking_ops_per_sec": round(before, 1),
+            "offloaded_ops_per_sec": round(after, 1),
+            "speedup": round(after / before, 2),
+        })
+        print(json.dumps(rows[-1]))
+
+    connection.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Micro-benchmark of response encoding: legacy three-pass vs. single-pass encoder.
+
+The legacy path is json_util.dumps -> json.loads -> json.dumps(indent=2), as
+the tools used to do. Runs offline; only needs bson (PyMongo).
+
+    uv run python benchmarks/bench_encoding.py --docs 100 10000
+"""
+import argparse
+import datetime
+import json
+import random
+import timeit
+
+from bson import Binary, Decimal128, ObjectId, json_util
+
+from mongodb_mcp.encoding import encode
+
+def make_documents(count: int) -> list[dict]:
+    rng = random.Random(42)
+    now = datetime.datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"user-{i}",
+            "email": f"user{i}@example.com",
+            "created_at": now + datetime.timedelta(seconds=rng.randint(0, 10**7)),
+            "balance": Decimal128(f"{rng.uniform(0, 10000):.2f}"),
+            "avatar": Binary(rng.randbytes(64)),
+            "tags": [rng.choice(["a", "b", "c", "d"]) for _ in range(5)],
+            "address": {"city": "Springfield", "zip": f"{rng.randint(10000, 99999)}"},
+            "score": rng.random(),
+            "active": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+def legacy(documents):
+    return json.dumps({"count": len(documents), "documents": json.loads(json_util.dumps(documents))}, indent=2)
+
+def single_pass(documents, pretty=False):
+    return encode({"count": len(documents), "documents": documents}, pretty=pretty)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, nargs="+", default=[100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for count in args.docs:
+        documents = make_documents(count)
+        number = max(1, 2000 // count)
+        variants = {
+            "legacy": lambda: legacy(documents),
+            "encode_pretty": lambda: single_pass(documents, pretty=True),
+            "encode_compact": lambda: single_pass(documents),
+        }
+        baseline = None
+        for name, fn in variants.items():
+            best = min(timeit.repeat(fn, number=number, repeat=args.repeat)) / number
+            baseline = baseline or best
+            print(json.dumps({
+                "docs": count,
+                "variant": name,
+                "ms_per_response": round(best * 1000, 3),
+                "speedup": round(baseline / best, 2),
+                "bytes": len(fn()),
+            }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Startup benchmark: import time, stdio time-to-initialize and an import breakdown.
+
+Every measurement runs in a fresh interpreter, the way an MCP client spawns
+the server. No MongoDB is needed: nothing connects until the first tool call.
+
+    uv run python benchmarks/bench_startup.py --runs 20
+    uv run python benchmarks/bench_startup.py --top 25 --output startup.json
+
+Reports the median and p90 of (1) importing the server and registering all
+tools and (2) spawning `python -m mongodb_mcp.server` over stdio until it
+answers `initialize` and then `tools/list`, plus self import time per
+top-level package and the slowest modules by cumulative import time.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+IMPORT_SNIPPET = (
+    "import mongodb_mcp.server\n"
+    "from mongodb_mcp.tools import connection, exploration, query, crud, transfer, diagnostics, batch\n"
+)
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC, env.get("PYTHONPATH")]))
+    env.setdefault("LOG_LEVEL", "WARNING")
+    return env
+
+def summarize(values: list[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "median_ms": round(statistics.median(ordered), 1),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 1),
+        "min_ms": round(ordered[0], 1),
+        "runs": len(ordered),
+    }
+
+def measure_import(runs: int) -> dict:
+    """Wall time of importing the server and its tools, measured inside the child."""
+    code = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        f"{IMPORT_SNIPPET}"
+        "import sys\n"
+        "print((time.perf_counter() - started) * 1000, 'pymongo' in sys.modules)\n"
+    )
+    timings, driver_loaded = [], False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], env=child_env(), capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(output[0]))
+        driver_loaded |= output[1] == "True"
+    return {**summarize(timings), "pymongo_loaded": driver_loaded}
+
+def _request(process: subprocess.Popen, message: dict) -> dict | None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+    if "id" not in message:
+        return None
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("Server exited before answering")
+        response = json.loads(line)
+        if response.get("id") == message["id"]:
+            return response
+
+def measure_stdio(runs: int) -> dict:
+    """Time from spawning the server to its initialize and tools/list responses."""
+    initialize, tools_list = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "mongodb_mcp.server", "--transport", "stdio"],
+            env=child_env(), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1,
+        )
+        try:
+            _request(process, {
+                "jsonrpc": "2.0", "id": 1, "method": "initialize",
+                "params": {
+                    "protocolVersion": "2025-03-26",
+                    "capabilities": {},
+                    "clientInfo": {"name": "bench_startup", "version": "0"},
+                },
+            })
+            initialize.append((time.perf_counter() - started) * 1000)
+            _request(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+            _request(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+            tools_list.append((time.perf_counter() - started) * 1000)
+        finally:
+            process.stdin.close()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+    return {"initialize": summarize(initialize), "tools_list": summarize(tools_list)}
+
+def import_breakdown(top: int) -> dict:
+    """Parse `python -X importtime` output for the server's imports."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET],
+        env=child_env(), capture_output=True, text=True, check=True
+    ).stderr
+    by_package, modules = defaultdict(int), []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        by_package[module.split(".")[0]] += int(self_us)
+        modules.append((int(cumulative_us), module))
+    modules.sort(reverse=True)
+    return {
+        "total_ms": round(sum(by_package.values()) / 1000, 1),
+        "by_package_ms": {
+            package: round(us / 1000, 1)
+            for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "slowest_modules_ms": {module: round(us / 1000, 1) for us, module in modules[:top]},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Packages and modules to list in the breakdown")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "import_and_register": measure_import(args.runs),
+        "stdio": measure_stdio(args.runs),
+        "import_breakdown": import_breakdown(args.top),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""Load test: per-tool latency, throughput and RSS under increasing concurrency.
+
+Drives the real FastMCP server in-process (mcp.call_tool), over stdio (a
+child server process) and over streamable-http (a child server on a free
+port). The backend is a mongod launched into a temporary directory, an
+existing MongoDB (--uri), or mongomock for a dependency-free run. Each
+server seeds its own mongomock instance; real backends are seeded once.
+
+    uv run python benchmarks/load_test.py --backend mongod --transports inprocess stdio http \\
+        --docs 100000 --shape nested --concurrency 1 8 32 --output results.json
+    uv run python benchmarks/load_test.py --baseline old.json --output new.json
+
+Results are written as JSON: one row per transport, tool and concurrency
+level, plus run metadata. With --baseline, p95 and throughput changes
+against a previous run are printed.
+"""
+import argparse
+import asyncio
+import datetime
+import inspect
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+DATABASE = "mcp_bench"
+SCRATCH = "load_scratch"
+STATUSES = ["new", "active", "suspended", "closed"]
+
+def register_tools():
+    from mongodb_mcp.tools import connection, exploration, query, crud, transfer, diagnostics, batch, watch
+
+# --- Data -------------------------------------------------------------------
+
+def make_document(i: int, shape: str, rng: random.Random) -> dict:
+    doc = {"i": i, "group": i % 50, "status": STATUSES[i % len(STATUSES)], "score": rng.random()}
+    if shape == "wide":
+        doc.update({f"f{n}": rng.randint(0, 1000) for n in range(50)})
+    elif shape == "nested":
+        doc["profile"] = {
+            "name": f"user{i}",
+            "address": {"city": rng.choice(["Oslo", "Lima", "Pune", "Kyiv"]), "zip": f"{rng.randint(0, 99999):05d}"},
+        }
+        doc["tags"] = rng.sample(["a", "b", "c", "d", "e", "f"], k=rng.randint(0, 4))
+        doc["events"] = [{"type": rng.choice(["view", "buy"]), "at": i + n} for n in range(rng.randint(0, 5))]
+    else:
+        doc["payload"] = "x" * 100
+    return doc
+
+def seed(client, collection: str, docs: int, shape: str):
+    coll = client[DATABASE][collection]
+    if coll.estimated_document_count() == docs:
+        return
+    coll.drop()
+    rng = random.Random(42)
+    batch = []
+    for i in range(docs):
+        batch.append(make_document(i, shape, rng))
+        if len(batch) == 10000:
+            coll.insert_many(batch)
+            batch = []
+    if batch:
+        coll.insert_many(batch)
+    coll.create_index("group")
+    client[DATABASE][SCRATCH].drop()
+
+class CursorPages:
+    """get_more arguments: next_tokens of paginated finds, each used by one call at a time.
+
+    A token goes back to the pool after its call if the cursor has more
+    pages; when the pool is empty a new cursor is opened with find. The
+    find is not part of the measured latency.
+    """
+
+    def __init__(self, ns: dict):
+        self.ns = ns
+        self.transport = None
+        self.pool = []
+
+    def bind(self, transport):
+        self.transport = transport
+        self.pool = []
+
+    async def __call__(self, n: int) -> dict:
+        if not self.pool:
+            result = await self.transport.call("find", {**self.ns, "limit": 1, "paginate": True})
+            token = json.loads(result_text(result)).get("next_token")
+            if token is None:
+                raise RuntimeError("find returned no next_token; the collection needs more than one document")
+            self.pool.append(token)
+        return {"token": self.pool.pop(), "batch_size": 20}
+
+    def done(self, arguments: dict, result):
+        if '"next_token"' in result_text(result):
+            self.pool.append(arguments["token"])
+
+def workloads(collection: str, docs: int, writes: bool) -> dict:
+    """Tool name -> function building the arguments for call number n.
+
+    A builder may be a coroutine function, and may have bind(transport) and
+    done(arguments, result) hooks, for tools that need state from earlier calls.
+    """
+    ns = {"database": DATABASE, "collection": collection}
+    calls = {
+        "find": lambda n: {**ns, "filter": {"group": n % 50}, "limit": 20},
+        "find_one": lambda n: {**ns, "filter": {"i": n % docs}},
+        "count": lambda n: {**ns, "filter": {"group": n % 50}},
+        "distinct": lambda n: {**ns, "field": "status"},
+        "aggregate": lambda n: {**ns, "pipeline": [
+            {"$match": {"group": n % 50}},
+            {"$group": {"_id": "$status", "n": {"$sum": 1}, "avg": {"$avg": "$score"}}},
+        ]},
+        "facet": lambda n: {**ns, "field": "group", "filter": {"status": STATUSES[n % len(STATUSES)]}, "top_k": 10},
+        "explain": lambda n: {**ns, "filter": {"group": n % 50}},
+        "get_more": CursorPages(ns),
+        "batch": lambda n: {"operations": [
+            {"tool": "find", "args": {**ns, "filter": {"group": n % 50}, "limit": 5}},
+            {"tool": "count", "args": {**ns, "filter": {"group": n % 50}}},
+            {"tool": "distinct", "args": {**ns, "field": "status"}},
+        ]},
+        "collection_schema": lambda n: {**ns, "sample_size": 100},
+        "profile_collection": lambda n: {**ns, "sample_size": 1000, "refresh": n % 10 == 0},
+        "collection_stats": lambda n: ns,
+        "list_collections": lambda n: {"database": DATABASE},
+        "database_overview": lambda n: {"database": DATABASE},
+        "list_indexes": lambda n: ns,
+        "recommend_indexes": lambda n: ns,
+    }
+    if writes:
+        scratch = {"database": DATABASE, "collection": SCRATCH}
+        calls["insert_one"] = lambda n: {**scratch, "document": {"n": n, "at": time.time()}}
+        calls["update_one"] = lambda n: {**scratch, "filter": {"n": n}, "update": {"$set": {"seen": True}}, "upsert": True}
+        calls["bulk_write"] = lambda n: {**scratch, "ordered": False, "operations": [
+            *({"insert_one": {"document": {"n": n, "k": k}}} for k in range(50)),
+            {"update_many": {"filter": {"n": n}, "update": {"$set": {"bulk": True}}}},
+            {"delete_many": {"filter": {"n": n - 1}}},
+        ]}
+    return calls
+
+# --- Backends -----------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def launch_mongod(binary: str) -> tuple[subprocess.Popen, str, str]:
+    """Start a throwaway mongod and wait until it answers a ping."""
+    from pymongo import MongoClient
+
+    dbpath = tempfile.mkdtemp(prefix="mcp-bench-")
+    port = free_port()
+    process = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL,
+    )
+    uri = f"mongodb://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            MongoClient(uri, serverSelectionTimeoutMS=500).admin.command("ping")
+            return process, dbpath, uri
+        except Exception:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                raise RuntimeError(f"mongod did not start on port {port}")
+            time.sleep(0.2)
+
+def attach_backend(args):
+    """Point the in-process server at the backend, seeding mongomock if used."""
+    from mongodb_mcp.connection import open_client, set_client
+
+    if args.backend == "mongomock":
+        import mongomock
+
+        client = mongomock.MongoClient()
+        seed(client, args.collection, args.docs, args.shape)
+        set_client(client)
+    else:
+        open_client(None, args.uri)
+
+# --- Transports ----------------------------------------------------------------
+
+def rss_bytes(pid: int = None) -> int | None:
+    """Current resident set size of a process (Linux), or this process's peak RSS elsewhere."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+def find_child_pid(marker: str) -> int | None:
+    """PID of a child of this process whose command line contains marker (Linux only)."""
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == os.getpid() and marker.encode() in cmdline:
+            return int(entry)
+    return None
+
+def result_text(result) -> str:
+    if isinstance(result, tuple):
+        result = result[0]
+    content = getattr(result, "content", result)
+    return content[0].text if content and hasattr(content[0], "text") else ""
+
+def result_failed(result) -> bool:
+    if getattr(result, "isError", False):
+        return True
+    return result_text(result).startswith(("Error:", "Failed"))
+
+def server_command(args, transport: str, port: int = None) -> list[str]:
+    command = [
+        sys.executable, os.path.abspath(__file__), "--serve", transport,
+        "--backend", args.backend, "--docs", str(args.docs), "--shape", args.shape,
+        "--collection", args.collection,
+    ]
+    if args.uri:
+        command += ["--uri", args.uri]
+    if port:
+        command += ["--port", str(port)]
+    return command
+
+class InProcessTransport:
+    name = "inprocess"
+
+    async def __aenter__(self):
+        from mongodb_mcp.app import mcp
+
+        self.mcp = mcp
+        self.pid = None
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def call(self, tool: str, arguments: dict):
+        return await self.mcp.call_tool(tool, arguments)
+
+class SessionTransport:
+    """A client session to a child server process over stdio or streamable-http."""
+
+    def __init__(self, name: str, args):
+        self.name = name
+        self.args = args
+
+    async def __aenter__(self):
+        from contextlib import AsyncExitStack
+        from mcp import ClientSession
+
+        self.stack = AsyncExitStack()
+        env = {**os.environ, "LOG_LEVEL": "WARNING"}
+        if self.name == "stdio":
+            from mcp import StdioServerParameters
+            from mcp.client.stdio import stdio_client
+
+            command = server_command(self.args, "stdio")
+            params = StdioServerParameters(command=command[0], args=command[1:], env=env)
+            read, write = await self.stack.enter_async_context(stdio_client(params))
+            self.pid = find_child_pid("--serve")
+        else:
+            from mcp.client.streamable_http import streamablehttp_client
+
+            port = free_port()
+            self.process = subprocess.Popen(server_command(self.args, "http", port), env=env)
+            self.pid = self.process.pid
+            self.stack.callback(self.process.terminate)
+            await wait_for_port(port, self.process)
+            read, write, _ = await self.stack.enter_async_context(streamablehttp_client(f"http://127.0.0.1:{port}/mcp"))
+        self.session = await self.stack.enter_async_context(ClientSession(read, write))
+        await self.session.initialize()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stack.aclose()
+
+    async def call(self, tool: str, arguments: dict):
+        return await self.session.call_tool(tool, arguments)
+
+async def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("HTTP server exited during startup")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"HTTP server did not listen on port {port}")
+
+def open_transport(name: str, args):
+    return InProcessTransport() if name == "inprocess" else SessionTransport(name, args)
+
+# --- Measurement -----------------------------------------------------------------
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def arguments_for(build_args, n: int) -> dict:
+    arguments = build_args(n)
+    return await arguments if inspect.isawaitable(arguments) else arguments
+
+async def call_measured(transport, tool: str, build_args, n: int) -> tuple[float, bool]:
+    """Latency and failure of one call; building its arguments is not timed."""
+    arguments = await arguments_for(build_args, n)
+    started = time.perf_counter()
+    try:
+        result = await transport.call(tool, arguments)
+    except Exception:
+        return time.perf_counter() - started, True
+    elapsed = time.perf_counter() - started
+    if hasattr(build_args, "done"):
+        build_args.done(arguments, result)
+    return elapsed, result_failed(result)
+
+async def measure(transport, tool: str, build_args, concurrency: int, calls: int, warmup: int) -> dict:
+    if hasattr(build_args, "bind"):
+        build_args.bind(transport)
+    for n in range(warmup):
+        await call_measured(transport, tool, build_args, n)
+
+    latencies = []
+    errors = 0
+    counter = iter(range(calls))
+
+    async def worker():
+        nonlocal errors
+        for n in counter:
+            try:
+                latency, failed = await call_measured(transport, tool, build_args, n)
+            except Exception:
+                # The arguments could not be built; there is no call to time
+                errors += 1
+                continue
+            latencies.append(latency)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    rss = rss_bytes(transport.pid) if transport.pid or transport.name == "inprocess" else None
+    return {
+        "transport": transport.name,
+        "tool": tool,
+        "concurrency": concurrency,
+        "calls": len(latencies),
+        "errors": errors,
+        "throughput_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0,
+        "rss_mb": round(rss / 2**20, 1) if rss else None,
+    }
+
+def compare(baseline_path: str, rows: list[dict]):
+    with open(baseline_path) as f:
+        baseline = {(r["transport"], r["tool"], r["concurrency"]): r for r in json.load(f)["results"]}
+    print("\ntransport  tool                 conc    p95 change  throughput change")
+    for row in rows:
+        old = baseline.get((row["transport"], row["tool"], row["concurrency"]))
+        if not old or not old["p95_ms"] or not old["throughput_per_sec"]:
+            continue
+        p95 = (row["p95_ms"] / old["p95_ms"] - 1) * 100
+        throughput = (row["throughput_per_sec"] / old["throughput_per_sec"] - 1) * 100
+        print(f"{row['transport']:<10} {row['tool']:<20} {row['concurrency']:>4} {p95:>+13.1f}% {throughput:>+17.1f}%")
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+async def run(args) -> list[dict]:
+    attach_backend(args)
+    calls = workloads(args.collection, args.docs, args.writes)
+    tools = args.tools or list(calls)
+    if args.backend == "mongomock" and not args.tools:
+        # mongomock has no collStats or explain
+        for tool in ("collection_stats", "database_overview", "explain"):
+            tools.remove(tool)
+    rows = []
+    for transport_name in args.transports:
+        async with open_transport(transport_name, args) as transport:
+            for tool in tools:
+                for concurrency in args.concurrency:
+                    row = await measure(transport, tool, calls[tool], concurrency, args.calls, args.warmup)
+                    rows.append(row)
+                    print(json.dumps(row), file=sys.stderr)
+    return rows
+
+def serve(args):
+    """Child process mode: run the server over stdio or HTTP against the backend."""
+    from mongodb_mcp.app import mcp
+
+    register_tools()
+    attach_backend(args)
+    if args.serve == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        import uvicorn
+        from mongodb_mcp.server import http_app
+
+        mcp.settings.host = "127.0.0.1"
+        mcp.settings.port = args.port
+        mcp.settings.log_level = "WARNING"
+        uvicorn.run(http_app(), host="127.0.0.1", port=args.port, log_level="warning")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["mongod", "mongomock", "uri"], default="mongomock")
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI"), help="MongoDB URI for --backend uri")
+    parser.add_argument("--mongod", default=shutil.which("mongod") or "mongod", help="mongod binary for --backend mongod")
+    parser.add_argument("--transports", nargs="+", choices=["inprocess", "stdio", "http"], default=["inprocess", "stdio", "http"])
+    parser.add_argument("--tools", nargs="+", help="Subset of tools to run (default: all read tools)")
+    parser.add_argument("--writes", action="store_true", help="Also benchmark insert_one/update_one/bulk_write on a scratch collection")
+    parser.add_argument("--docs", type=int, default=10000, help="Documents in the seeded collection")
+    parser.add_argument("--shape", choices=["flat", "nested", "wide"], default="flat")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--calls", type=int, default=200, help="Measured calls per tool and concurrency level")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--collection", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--serve", choices=["stdio", "http"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.collection = args.collection or f"load_{args.shape}_{args.docs}"
+
+    if args.serve:
+        serve(args)
+        return
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    register_tools()
+    mongod = None
+    if args.backend == "mongod":
+        mongod, dbpath, args.uri = launch_mongod(args.mongod)
+    elif args.backend == "uri" and not args.uri:
+        parser.error("--backend uri needs --uri or MONGODB_URI")
+
+    try:
+        if args.backend != "mongomock":
+            from pymongo import MongoClient
+
+            with MongoClient(args.uri) as client:
+                seed(client, args.collection, args.docs, args.shape)
+        rows = asyncio.run(run(args))
+    finally:
+        if mongod:
+            mongod.terminate()
+            mongod.wait()
+            shutil.rmtree(dbpath, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "docs": args.docs,
+            "shape": args.shape,
+            "calls": args.calls,
+        },
+        "results": rows,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.baseline:
+        compare(args.baseline, rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import json
+import math
+import os
+import time
+from mongodb_mcp import executor
+from mongodb_mcp.auth import AUTH_DISABLED, authenticate, extract_api_key, get_api_keys, get_auth_mode
+from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.metrics import admission_in_flight, admission_rejections
+
+logger = get_logger("admission")
+
+# Rate-limit tokens a call costs, for tools that are heavier than a point read
+DEFAULT_TOOL_COSTS = {
+    "aggregate": 5,
+    "facet": 5,
+    "collection_schema": 3,
+    "profile_collection": 5,
+    "database_overview": 5,
+    "batch": 5,
+    "update_many": 5,
+    "delete_many": 10,
+    "bulk_write": 10,
+    "export_collection": 20,
+    "import_collection": 20,
+}
+
+# Idle clients tracked before their state is pruned
+MAX_CLIENTS = 10000
+
+class BodyTooLarge(Exception):
+    pass
+
+def get_tool_costs() -> dict[str, int]:
+    """Per-tool costs: DEFAULT_TOOL_COSTS overridden by TOOL_COSTS (e.g. "aggregate=8,find=2")."""
+    return {**DEFAULT_TOOL_COSTS, **executor._parse_limits(os.getenv("TOOL_COSTS", ""))}
+
+class TokenBucket:
+    """Refills at rate tokens per second up to burst. A rate of 0 never limits."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float) -> float:
+        """Take cost tokens. Returns 0 on success, else seconds until they would be available."""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        # A call costing more than the burst can still run once the bucket is full
+        cost = min(cost, self.burst)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return not self.rate or self.tokens >= self.burst
+
+class _ClientState:
+    def __init__(self, bucket: TokenBucket, max_concurrent: int):
+        self.bucket = bucket
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+
+def _tool_calls(body: bytes) -> tuple[list[str], object]:
+    """Tool names called by a JSON-RPC message or batch, and the first request id."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return [], None
+    messages = payload if isinstance(payload, list) else [payload]
+    tools, request_id = [], None
+    for message in messages:
+        if not isinstance(message, dict):
+            continue
+        if request_id is None:
+            request_id = message.get("id")
+        if message.get("method") == "tools/call":
+            params = message.get("params")
+            tools.append(params.get("name", "") if isinstance(params, dict) else "")
+    return tools, request_id
+
+async def _read_body(receive, max_bytes: int = 0) -> bytes:
+    """Read the whole request body, raising BodyTooLarge once it passes max_bytes (0: no limit)."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise BodyTooLarge()
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+async def _reject(send, status: int, message: str, request_id=None, retry_after: float = None):
+    logger.debug("Rejected request with %s: %s", status, message)
+    body = json.dumps({
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": -32000, "message": message},
+    }).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(max(1, math.ceil(retry_after))).encode()))
+    if status == 401:
+        headers.append((b"www-authenticate", b"Bearer"))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+class AdmissionMiddleware:
+    """ASGI middleware that authenticates HTTP clients and meters their tool calls.
+
+    With AUTH_MODE enabled every request needs a configured API key (X-API-Key
+    or Authorization: Bearer), otherwise clients are told apart by address.
+    Each client can have a token bucket that tools/call requests draw from by
+    tool cost, and a cap on tool calls in flight; the server can have a
+    global cap too. None of these limits apply unless configured.
+    Requests over a limit are rejected at once with 429 (or 503 for the
+    global cap) and Retry-After instead of queueing for a worker. Metrics
+    label clients by key name; unauthenticated clients share "anonymous".
+
+    POST bodies are buffered to find the tool calls, up to
+    ADMISSION_MAX_BODY_BYTES; larger requests get 413.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.auth_mode = get_auth_mode()
+        self.keys = get_api_keys()
+        self.costs = get_tool_costs()
+        # Metering is off unless configured, here or per key in MCP_API_KEYS
+        self.rate = float(os.getenv("ADMISSION_RATE_PER_SECOND", "0"))
+        self.burst = float(os.getenv("ADMISSION_BURST", "0"))
+        self.max_concurrent = int(os.getenv("ADMISSION_MAX_CONCURRENT", "0"))
+        self.max_in_flight = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "0"))
+        self.max_body_bytes = int(os.getenv("ADMISSION_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+        self.in_flight = 0
+        self._clients: dict[str, _ClientState] = {}
+
+    def _client(self, name: str, key) -> _ClientState:
+        state = self._clients.get(name)
+        if state is None:
+            if len(self._clients) >= MAX_CLIENTS:
+                self._prune()
+            rate = key.rate_per_second if key and key.rate_per_second is not None else self.rate
+            burst = key.burst if key and key.burst is not None else self.burst or 2 * rate
+            max_concurrent = key.max_concurrent if key and key.max_concurrent is not None else self.max_concurrent
+            state = self._clients[name] = _ClientState(TokenBucket(rate, burst), max_concurrent)
+        return state
+
+    def _prune(self):
+        for name in [name for name, state in self._clients.items() if not state.in_flight and state.bucket.idle]:
+            del self._clients[name]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        key = None
+        if self.auth_mode != AUTH_DISABLED:
+            headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+            key = authenticate(extract_api_key(headers), self.keys)
+            if key is None:
+                admission_rejections.inc("unauthenticated", "auth")
+                await _reject(send, 401, "Missing or invalid API key")
+                return
+            name = label = key.name
+        else:
+            name = scope["client"][0] if scope.get("client") else "unknown"
+            label = "anonymous"
+
+        if scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            declared = int(headers.get(b"content-length", 0))
+        except ValueError:
+            declared = 0
+        try:
+            if self.max_body_bytes and declared > self.max_body_bytes:
+                raise BodyTooLarge()
+            body = await _read_body(receive, self.max_body_bytes)
+        except BodyTooLarge:
+            admission_rejections.inc(label, "body_size")
+            await _reject(send, 413, f"Request body exceeds {self.max_body_bytes} bytes")
+            return
+        tools, request_id = _tool_calls(body)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        if not tools:
+            await self.app(scope, replay, send)
+            return
+
+        state = self._client(name, key)
+        calls = len(tools)
+        if self.max_in_flight and self.in_flight + calls > self.max_in_flight:
+            admission_rejections.inc(label, "server_busy")
+            await _reject(send, 503, f"Server busy: {self.in_flight} tool calls in flight", request_id, 1)
+            return
+        if state.max_concurrent and state.in_flight + calls > state.max_concurrent:
+            admission_rejections.inc(label, "concurrency")
+            await _reject(
+                send, 429, f"Too many tool calls in flight for '{name}' (limit {state.max_concurrent})", request_id, 1
+            )
+            return
+        cost = sum(self.costs.get(tool, 1) for tool in tools)
+        retry_after = state.bucket.take(cost)
+        if retry_after:
+            admission_rejections.inc(label, "rate")
+            await _reject(send, 429, f"Rate limit exceeded for '{name}' (cost {cost})", request_id, retry_after)
+            return
+
+        state.in_flight += calls
+        self.in_flight += calls
+        admission_in_flight.inc(label, amount=calls)
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            state.in_flight -= calls
+            self.in_flight -= calls
+            admission_in_flight.inc(label, amount=-calls)
@@ -1,3 +1,36 @@
+import inspect
 from mcp.server.fastmcp import FastMCP
+from mongodb_mcp.executor import offload
+from mongodb_mcp.logging_config import log_context
+from mongodb_mcp.metrics import instrument
+from mongodb_mcp.operations import bounded, tracked
 
-mcp = FastMCP("mongodb-mcp")
+class MongoMCP(FastMCP):
+    """FastMCP server that keeps blocking tool functions off the event loop.
+
+    FastMCP calls plain ``def`` tools directly on the asyncio loop, so a slow
+    PyMongo call would stall every other session. Sync tools registered through
+    ``@mcp.tool()`` are wrapped to run on the bounded worker pool instead.
+    The decorator still returns the original function, so tools stay callable
+    as plain functions.
+
+    Every tool is also instrumented with latency, outcome and response-size
+    metrics, and its driver operations are time-limited (MAX_TIME_MS) and
+    killed on the server if the MCP request is cancelled. Log records written
+    during the call carry the tool name and a request id.
+    """
+
+    def tool(self, *args, **kwargs):
+        register = super().tool(*args, **kwargs)
+
+        def decorator(fn):
+            name = kwargs.get("name") or fn.__name__
+            if inspect.iscoroutinefunction(fn):
+                register(log_context(name, instrument(name, tracked(name, fn))))
+            else:
+                register(log_context(name, instrument(name, tracked(name, offload(bounded(fn))))))
+            return fn
+
+        return decorator
+
+mcp = MongoMCP("mongodb-mcp")
@@ -1,6 +1,8 @@
 import os
 import hmac
 import hashlib
+import json
+from dataclasses import dataclass
 from functools import wraps
 from mongodb_mcp.logging_config import get_logger
 
@@ -19,6 +21,54 @@ def get_api_key() -> str | None:
     """Get the configured API key."""
     return os.getenv("MCP_API_KEY")
 
+@dataclass
+class ApiKey:
+    """A named API key with optional admission limits (None: use the defaults)."""
+    name: str
+    secret: str
+    rate_per_second: float | None = None
+    burst: float | None = None
+    max_concurrent: int | None = None
+
+def get_api_keys() -> dict[str, ApiKey]:
+    """API keys from the environment.
+
+    MCP_API_KEY is the key named "default". MCP_API_KEYS is a JSON object
+    mapping names to a secret or to {"key": ..., "rate_per_second": ...,
+    "burst": ..., "max_concurrent": ...}.
+    """
+    keys = {}
+    if get_api_key():
+        keys["default"] = ApiKey("default", get_api_key())
+    for name, spec in json.loads(os.getenv("MCP_API_KEYS", "{}")).items():
+        if isinstance(spec, str):
+            keys[name] = ApiKey(name, spec)
+        else:
+            keys[name] = ApiKey(
+                name, spec["key"], spec.get("rate_per_second"), spec.get("burst"), spec.get("max_concurrent")
+            )
+    return keys
+
+def extract_api_key(headers: dict) -> str | None:
+    """The key presented in request headers: X-API-Key, or an Authorization bearer token."""
+    if headers.get("x-api-key"):
+        return headers["x-api-key"]
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token.strip()
+    return None
+
+def authenticate(provided_key: str | None, keys: dict[str, ApiKey]) -> ApiKey | None:
+    """The configured key matching provided_key, compared in constant time."""
+    if not provided_key:
+        return None
+    matched = None
+    for key in keys.values():
+        # Compare against every key so timing does not reveal which one matched
+        if hmac.compare_digest(provided_key.encode(), key.secret.encode()):
+            matched = key
+    return matched
+
 def validate_api_key(provided_key: str) -> bool:
     """Validate an API key using constant-time comparison."""
     expected_key = get_api_key()
@@ -46,7 +96,7 @@ def require_auth(func):
         
         # For tool-level auth, we log access
         # The actual auth validation happens at transport level
-        logger.debug(f"Tool '{func.__name__}' called with auth mode: {auth_mode}")
+        logger.debug("Tool '%s' called with auth mode: %s", func.__name__, auth_mode)
         return func(*args, **kwargs)
     
     return wrapper
@@ -0,0 +1,157 @@
+import os
+from dataclasses import dataclass
+from bson import Binary
+from mongodb_mcp.encoding import Encoded
+
+# Truncated field paths listed in a response, at most
+MAX_REPORTED_FIELDS = 20
+
+# Room left for the response envelope (count, next_token, warnings, ...)
+ENVELOPE_BYTES = 512
+
+@dataclass(frozen=True)
+class Limits:
+    """Per-response size limits. Zero disables a limit."""
+    max_bytes: int = 1048576
+    max_string: int = 10000
+    max_array: int = 200
+    max_binary: int = 1024
+
+def get_limits() -> Limits:
+    return Limits(
+        max_bytes=int(os.getenv("RESPONSE_MAX_BYTES", "1048576")),
+        max_string=int(os.getenv("RESPONSE_MAX_STRING_CHARS", "10000")),
+        max_array=int(os.getenv("RESPONSE_MAX_ARRAY_ITEMS", "200")),
+        max_binary=int(os.getenv("RESPONSE_MAX_BINARY_BYTES", "1024")),
+    )
+
+def _truncate(value, limits: Limits, path: str, truncated: set, sliced: frozenset):
+    """Shorten oversized values, copying only the containers that change."""
+    if isinstance(value, str):
+        if limits.max_string and len(value) > limits.max_string:
+            truncated.add(path)
+            return f"{value[:limits.max_string]}...[{len(value) - limits.max_string} more chars]"
+        return value
+    if isinstance(value, dict):
+        result = None
+        for key, child in value.items():
+            new = _truncate(child, limits, f"{path}.{key}" if path else key, truncated, sliced)
+            if new is not child:
+                if result is None:
+                    result = dict(value)
+                result[key] = new
+        return value if result is None else result
+    if isinstance(value, list):
+        items = value
+        if limits.max_array and len(value) > limits.max_array:
+            truncated.add(path)
+            items = value[:limits.max_array]
+        result = [_truncate(child, limits, f"{path}[]", truncated, sliced) for child in items]
+        if items is not value:
+            marker = {"items_shown": limits.max_array}
+            # A server-side $slice hides the real length
+            if path not in sliced:
+                marker["items_total"] = len(value)
+            result.append({"$truncated": marker})
+            return result
+        return value if all(new is old for new, old in zip(result, value)) else result
+    if isinstance(value, (bytes, Binary)):
+        if limits.max_binary and len(value) > limits.max_binary:
+            truncated.add(path)
+            return {"$truncated": {"binData": len(value), "subType": f"{getattr(value, 'subtype', 0):02x}"}}
+        return value
+    return value
+
+def truncate_document(document: dict, limits: Limits, truncated: set, sliced: frozenset = frozenset()) -> dict:
+    """Apply the string, array and binary limits to a document.
+
+    Paths of shortened fields are added to truncated. Arrays in sliced were
+    cut short by a server-side $slice, so their markers carry no total.
+    """
+    return _truncate(document, limits, "", truncated, sliced)
+
+class ResponseBudget:
+    """Tracks the encoded size of documents added to one response.
+
+    Documents are truncated field by field as they are added, and once the
+    next document would push the response over max_bytes it is refused. The
+    first document is always accepted so a response is never empty.
+    Measured documents are returned as Encoded, so encoding the response
+    reuses the text instead of encoding them again.
+    """
+
+    def __init__(self, limits: Limits = None, sliced: frozenset = frozenset()):
+        self.limits = limits or get_limits()
+        self.sliced = sliced
+        self.used = ENVELOPE_BYTES
+        self.accepted = 0
+        self.exhausted = False
+        self.truncated_fields: set[str] = set()
+
+    def fit(self, document):
+        """Truncated document if it fits in the remaining budget, else None."""
+        if not isinstance(document, dict):
+            return document
+        document = truncate_document(document, self.limits, self.truncated_fields, self.sliced)
+        if self.limits.max_bytes:
+            document = Encoded(document)
+            size = len(document.text) + 1
+            if self.accepted and self.used + size > self.limits.max_bytes:
+                self.exhausted = True
+                return None
+            self.used += size
+        self.accepted += 1
+        return document
+
+    def collect(self, documents, limit: int) -> tuple[list, object]:
+        """Take up to limit documents that fit the budget.
+
+        Returns the documents and the first one that did not fit (None if
+        all fit), so a paginated caller can hand it out on the next page.
+        """
+        accepted = []
+        for document in documents:
+            fitted = self.fit(document)
+            if fitted is None:
+                return accepted, document
+            accepted.append(fitted)
+            if len(accepted) >= limit:
+                break
+        return accepted, None
+
+    def annotate(self, response: dict):
+        """Record truncation in a response, if any happened."""
+        if self.truncated_fields:
+            response["truncated_fields"] = sorted(self.truncated_fields)[:MAX_REPORTED_FIELDS]
+        if self.exhausted:
+            response["byte_budget_reached"] = True
+            response["max_bytes"] = self.limits.max_bytes
+
+def slice_projection(projection: dict, long_arrays: list[str], limits: Limits) -> tuple[dict, frozenset]:
+    """Add $slice to a find projection for arrays known to exceed the item limit.
+
+    Arrays are sliced to limit + 1 items so truncation is still detected.
+    Paths the projection excludes, already shapes, or would collide with
+    (a parent or child path in the projection) are left alone. Returns the
+    projection and the paths that were sliced.
+    """
+    if not limits.max_array or not long_arrays:
+        return projection, frozenset()
+    projection = dict(projection or {})
+    sliced = set()
+    inclusive = any(
+        value not in (0, False) for key, value in projection.items()
+        if key != "_id" and not isinstance(value, dict)
+    )
+    for path in long_arrays:
+        value = projection.get(path)
+        if value is None:
+            if inclusive:
+                continue
+            if any(key.startswith(f"{path}.") or path.startswith(f"{key}.") for key in projection):
+                continue
+        elif isinstance(value, dict) or value in (0, False):
+            continue
+        projection[path] = {"$slice": limits.max_array + 1}
+        sliced.add(path)
+    return projection, frozenset(sliced)
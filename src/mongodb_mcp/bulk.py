@@ -0,0 +1,137 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+import bson
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+MAX_ERROR_SAMPLES = 10
+
+_WRITE_MODELS = {
+    "insert_one": lambda spec: InsertOne(spec["document"]),
+    "update_one": lambda spec: UpdateOne(spec["filter"], spec["update"], upsert=spec.get("upsert", False)),
+    "update_many": lambda spec: UpdateMany(spec["filter"], spec["update"], upsert=spec.get("upsert", False)),
+    "replace_one": lambda spec: ReplaceOne(spec["filter"], spec["replacement"], upsert=spec.get("upsert", False)),
+    "delete_one": lambda spec: DeleteOne(spec["filter"]),
+    "delete_many": lambda spec: DeleteMany(spec["filter"]),
+}
+
+_COUNTS = {
+    "nInserted": "inserted_count",
+    "nMatched": "matched_count",
+    "nModified": "modified_count",
+    "nRemoved": "deleted_count",
+    "nUpserted": "upserted_count",
+}
+
+def get_chunk_limits() -> tuple[int, int]:
+    """Maximum operations and encoded bytes per chunk."""
+    return (
+        int(os.getenv("BULK_CHUNK_MAX_OPS", "5000")),
+        int(os.getenv("BULK_CHUNK_MAX_BYTES", str(8 * 1024 * 1024)))
+    )
+
+def parse_operations(operations: list) -> list[tuple[object, int]]:
+    """Turn {"insert_one": {...}}-style dicts into write models with their BSON size.
+
+    Raises ValueError naming the offending operation index.
+    """
+    parsed = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or len(operation) != 1:
+            raise ValueError(f"Operation {index} must be an object with exactly one key, e.g. {{\"insert_one\": {{...}}}}")
+        (kind, spec), = operation.items()
+        if kind not in _WRITE_MODELS:
+            raise ValueError(f"Operation {index}: unknown type '{kind}'. Use one of {sorted(_WRITE_MODELS)}")
+        try:
+            model = _WRITE_MODELS[kind](spec)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Operation {index} ({kind}): missing or invalid field {e}") from e
+        parsed.append((model, len(bson.encode(spec))))
+    return parsed
+
+def chunk_operations(parsed: list[tuple[object, int]], max_ops: int, max_bytes: int) -> list[tuple[int, list]]:
+    """Split write models into (offset, models) chunks bounded by count and wire size."""
+    chunks = []
+    current, current_bytes, offset = [], 0, 0
+    for index, (model, size) in enumerate(parsed):
+        if current and (len(current) >= max_ops or current_bytes + size > max_bytes):
+            chunks.append((offset, current))
+            current, current_bytes, offset = [], 0, index
+        current.append(model)
+        current_bytes += size
+    if current:
+        chunks.append((offset, current))
+    return chunks
+
+def run_chunk(coll, offset: int, models: list, ordered: bool) -> dict:
+    """Execute one chunk, returning driver-style counts and offset-adjusted errors."""
+    try:
+        result = coll.bulk_write(models, ordered=ordered)
+        return dict(result.bulk_api_result, writeErrors=[], writeConcernErrors=[], offset=offset)
+    except BulkWriteError as e:
+        return dict(e.details, offset=offset)
+
+class BulkSummary:
+    """Aggregated counts and a bounded error summary across chunks."""
+
+    def __init__(self):
+        self.counts = {name: 0 for name in _COUNTS.values()}
+        self.error_count = 0
+        self.errors_by_code: dict[str, int] = {}
+        self.error_samples = []
+        self.write_concern_errors = 0
+
+    def add(self, details: dict):
+        for key, name in _COUNTS.items():
+            self.counts[name] += details.get(key, 0)
+        for error in details.get("writeErrors", []):
+            self.error_count += 1
+            code = str(error.get("code"))
+            self.errors_by_code[code] = self.errors_by_code.get(code, 0) + 1
+            if len(self.error_samples) < MAX_ERROR_SAMPLES:
+                self.error_samples.append({
+                    "index": details["offset"] + error.get("index", 0),
+                    "code": error.get("code"),
+                    "message": str(error.get("errmsg", ""))[:200],
+                })
+        self.write_concern_errors += len(details.get("writeConcernErrors", []))
+
+    def to_dict(self) -> dict:
+        result = dict(self.counts)
+        if self.error_count or self.write_concern_errors:
+            result["errors"] = {
+                "count": self.error_count,
+                "by_code": self.errors_by_code,
+                "samples": self.error_samples,
+                "write_concern_errors": self.write_concern_errors,
+            }
+        return result
+
+def execute(coll, chunks: list[tuple[int, list]], ordered: bool, parallelism: int) -> tuple[BulkSummary, int]:
+    """Run chunks and return the summary plus the number of operations never attempted.
+
+    Ordered writes run chunk by chunk and stop at the first chunk with errors.
+    Unordered chunks are submitted concurrently, up to parallelism at a time,
+    each in a copy of the caller's context so the call's time limit and
+    operation tracking apply to them too.
+    """
+    summary = BulkSummary()
+    if ordered or parallelism <= 1 or len(chunks) == 1:
+        for position, (offset, models) in enumerate(chunks):
+            details = run_chunk(coll, offset, models, ordered)
+            summary.add(details)
+            if ordered and details.get("writeErrors"):
+                attempted = details["writeErrors"][0].get("index", 0) + 1
+                unprocessed = len(models) - attempted + sum(len(m) for _, m in chunks[position + 1:])
+                return summary, unprocessed
+        return summary, 0
+
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="mongodb-mcp-bulk") as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, run_chunk, coll, offset, models, False)
+            for offset, models in chunks
+        ]
+        for future in futures:
+            summary.add(future.result())
+    return summary, 0
@@ -0,0 +1,277 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from bson import json_util
+from mongodb_mcp.catalog import metadata_catalog
+from mongodb_mcp.connection import resolve_name
+from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.profiling import profile_cache
+from mongodb_mcp.writes import WriteLog
+
+logger = get_logger("cache")
+
+# Change events that alter the collection and database lists
+DDL_EVENTS = ("drop", "rename", "dropDatabase")
+
+def _parse_ttls(raw: str) -> dict[str, float]:
+    """Parse a "db.coll=ttl,db.*=ttl" string into a dict."""
+    ttls = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        namespace, value = item.split("=", 1)
+        ttls[namespace.strip()] = float(value)
+    return ttls
+
+def _sorted_top_level(value):
+    """Sort top-level keys of a filter or projection.
+
+    Field order is irrelevant at the top level, but nested documents may be
+    embedded-document equality matches where order matters, so only the
+    top level is normalised.
+    """
+    if isinstance(value, dict):
+        return dict(sorted(value.items()))
+    return value
+
+class _CacheEntry:
+    def __init__(self, value: str, namespaces: set[str], expires_at: float):
+        self.value = value
+        self.size = len(value)
+        self.namespaces = namespaces
+        self.expires_at = expires_at
+
+class ResultCache:
+    """Byte-bounded LRU cache of serialized read-tool responses.
+
+    Entries expire after a per-namespace TTL and are dropped whenever a write
+    goes through one of the namespaces they were computed from. Responses are
+    ASCII JSON, so their length is their size in bytes.
+
+    Keys carry the write sequence number at lookup time, and each namespace
+    remembers the sequence number of its last write, so a result read while
+    a write to one of its namespaces was in flight is never stored. Writes
+    elsewhere don't keep it from being cached. Only the most recently written
+    namespaces are remembered; a read older than the ones forgotten is not stored.
+    """
+
+    def __init__(self, enabled: bool = False, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: float = 60, namespace_ttls: dict[str, float] = None):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.namespace_ttls = namespace_ttls or {}
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._by_namespace: dict[str, set[str]] = {}
+        self._bytes = 0
+        # Last write per "connection/", "connection/db." and "connection/db.coll"
+        self._writes = WriteLog()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def ttl_for(self, database: str, collection: str) -> float:
+        namespace = f"{database}.{collection}"
+        if namespace in self.namespace_ttls:
+            return self.namespace_ttls[namespace]
+        return self.namespace_ttls.get(f"{database}.*", self.default_ttl)
+
+    def make_key(self, database: str, collection: str, operation: str,
+                 connection: str = None, **params) -> tuple | None:
+        """Build an opaque canonical key for a read, or None when caching is disabled."""
+        if not self.enabled:
+            return None
+        for name in ("filter", "projection"):
+            if name in params:
+                params[name] = _sorted_top_level(params[name] or {})
+        raw = json_util.dumps([resolve_name(connection), database, collection, operation, sorted(params.items())])
+        digest = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+        return digest, self._writes.seq
+
+    def get(self, key: tuple | None) -> str | None:
+        if key is None:
+            return None
+        digest = key[0]
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(digest)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: tuple | None, value: str, database: str, collection: str,
+            namespaces: set[str] = None, connection: str = None):
+        """Store a response computed from database.collection (plus any other namespaces read)."""
+        if key is None:
+            return
+        digest, read_seq = key
+        ttl = self.ttl_for(database, collection)
+        if ttl <= 0 or len(value) > self.max_bytes:
+            return
+        prefix = f"{resolve_name(connection)}/"
+        namespaces = {prefix + ns for ns in namespaces or {f"{database}.{collection}"}}
+        with self._lock:
+            if self._writes.written_since(read_seq, self._scopes(namespaces)):
+                return
+            if digest in self._entries:
+                self._remove(digest)
+            self._entries[digest] = _CacheEntry(value, namespaces, time.monotonic() + ttl)
+            self._bytes += len(value)
+            for namespace in namespaces:
+                self._by_namespace.setdefault(namespace, set()).add(digest)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    @staticmethod
+    def _scopes(namespaces):
+        """The namespaces with their databases and connections, as write scopes."""
+        for namespace in namespaces:
+            connection, _, qualified = namespace.partition("/")
+            database = qualified.split(".", 1)[0]
+            yield from (namespace, f"{connection}/{database}.", f"{connection}/")
+
+    def _remove(self, key: str):
+        """Drop an entry. Caller must hold self._lock."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for namespace in entry.namespaces:
+            keys = self._by_namespace.get(namespace)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_namespace[namespace]
+
+    def invalidate(self, database: str = None, collection: str = None, connection: str = None):
+        """Drop entries that read from a collection.
+
+        Without a collection, everything read from the database is dropped;
+        without a database, everything read through the connection.
+        """
+        if not self.enabled:
+            return
+        prefix = f"{resolve_name(connection)}/"
+        if database is not None:
+            prefix += f"{database}."
+        with self._lock:
+            if collection is not None:
+                self._writes.record(prefix + collection)
+                namespaces = [prefix + collection]
+            else:
+                self._writes.record(prefix)
+                namespaces = [ns for ns in self._by_namespace if ns.startswith(prefix)]
+            keys = set()
+            for namespace in namespaces:
+                keys |= self._by_namespace.get(namespace, set())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+        if keys:
+            logger.debug("Invalidated %s cached results for %s%s", len(keys), prefix, collection or '*')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_namespace.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "watching_changes": sorted(_watchers),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+class _ChangeStreamInvalidator(threading.Thread):
+    """Invalidates cached results and profiles for writes made outside this server.
+
+    Tails a cluster-wide change stream (replica sets and sharded clusters only)
+    and resumes from the last seen token after transient errors.
+    """
+
+    def __init__(self, client, cache: ResultCache, connection: str):
+        super().__init__(name=f"mongodb-mcp-cache-watch-{connection}", daemon=True)
+        self.client = client
+        self.cache = cache
+        self.connection = connection
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        from pymongo.errors import OperationFailure, PyMongoError
+
+        resume_token = None
+        pipeline = [{"$project": {"ns": 1, "operationType": 1}}]
+        while not self._stop_event.is_set():
+            try:
+                with self.client.watch(pipeline, resume_after=resume_token, max_await_time_ms=1000) as stream:
+                    while not self._stop_event.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        resume_token = stream.resume_token
+                        ns = change.get("ns") or {}
+                        if ns.get("db"):
+                            self.cache.invalidate(ns["db"], ns.get("coll"), self.connection)
+                            profile_cache.invalidate(ns["db"], ns.get("coll"), self.connection)
+                            if change.get("operationType") in DDL_EVENTS:
+                                metadata_catalog.invalidate(ns["db"], ns.get("coll"), self.connection)
+                        if change.get("operationType") == "invalidate":
+                            resume_token = None
+            except OperationFailure as e:
+                if e.code == 40573:
+                    logger.warning("Change streams are not supported by this deployment; cache watch disabled")
+                    return
+                logger.warning("Cache change stream failed: %s", e)
+                self._stop_event.wait(5)
+            except PyMongoError as e:
+                logger.warning("Cache change stream interrupted: %s", e)
+                self._stop_event.wait(5)
+
+_watchers: dict[str, _ChangeStreamInvalidator] = {}
+
+def start_watcher(client, connection: str = None):
+    """Start change-stream invalidation for a connection if RESULT_CACHE_WATCH is enabled."""
+    if not result_cache.enabled or os.getenv("RESULT_CACHE_WATCH", "false").lower() != "true":
+        return
+    connection = resolve_name(connection)
+    stop_watcher(connection)
+    watcher = _watchers[connection] = _ChangeStreamInvalidator(client, result_cache, connection)
+    watcher.start()
+    logger.info("Result cache is watching the change stream of '%s' for external writes", connection)
+
+def stop_watcher(connection: str = None):
+    watcher = _watchers.pop(resolve_name(connection), None)
+    if watcher is not None:
+        watcher.stop()
+
+result_cache = ResultCache(
+    enabled=os.getenv("RESULT_CACHE_ENABLED", "false").lower() == "true",
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    default_ttl=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "60")),
+    namespace_ttls=_parse_ttls(os.getenv("RESULT_CACHE_TTLS", ""))
+)
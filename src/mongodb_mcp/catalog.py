@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from mongodb_mcp import executor
+from mongodb_mcp.connection import resolve_name
+from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.metrics import catalog_lookups
+
+logger = get_logger("catalog")
+
+DATABASES = "databases"
+COLLECTIONS = "collections"
+STATS = "stats"
+
+# collStats fields reported by collection_stats and database_overview
+STATS_FIELDS = ("ns", "count", "size", "avgObjSize", "storageSize", "nindexes", "totalIndexSize")
+
+def fetch_databases(client) -> list[str]:
+    return client.list_database_names()
+
+def fetch_collections(client, database: str) -> list[dict]:
+    from pymongo.errors import OperationFailure
+
+    db = client[database]
+    try:
+        infos = list(db.list_collections(authorizedCollections=True, nameOnly=True))
+    except OperationFailure:
+        # Servers that reject the options
+        infos = list(db.list_collections())
+    except (TypeError, NotImplementedError):
+        # Clients without list_collections options, such as mongomock in the load test
+        return [{"name": name, "type": "collection"} for name in db.list_collection_names()]
+    return [{"name": info["name"], "type": info.get("type", "collection")} for info in infos]
+
+def fetch_stats(client, database: str, collection: str) -> dict:
+    stats = client[database].command("collStats", collection)
+    return {field: stats.get(field) for field in STATS_FIELDS}
+
+class _CatalogEntry:
+    def __init__(self):
+        self.value = None
+        self.fetched_at = None
+        self.refreshing = False
+        # Held while fetching, so concurrent misses wait for one round trip
+        self.lock = threading.Lock()
+
+class MetadataCatalog:
+    """Cached cluster metadata: database names, collection lists and collection stats.
+
+    Entries younger than the TTL are served as is. Older entries are still
+    served for up to stale_seconds more while a worker refreshes them in the
+    background; past that, the caller fetches. Write tools drop the entries a
+    write can change, and a write to a namespace the catalog has not seen
+    also drops the lists it may have just been created in.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, stale_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: dict[tuple, _CatalogEntry] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key: tuple) -> _CatalogEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _CatalogEntry()
+            return entry
+
+    def _fetch(self, key: tuple, entry: _CatalogEntry, fetch, *args):
+        value = fetch(*args)
+        with self._lock:
+            # An invalidation during the fetch replaced the entry; don't resurrect it
+            if self._entries.get(key) is entry:
+                entry.value = value
+                entry.fetched_at = time.monotonic()
+        return value
+
+    def _refresh(self, key: tuple, entry: _CatalogEntry, fetch, *args):
+        try:
+            with entry.lock:
+                self._fetch(key, entry, fetch, *args)
+        except Exception as e:
+            logger.warning("Background refresh of %s %s failed: %s", key[1], '.'.join(key[2:]), e)
+        finally:
+            entry.refreshing = False
+
+    def lookup(self, key: tuple, fetch, *args, refresh: bool = False):
+        """Cached value for key, calling fetch(*args) when it is missing or too old."""
+        entry = self._entry(key)
+        age = None if entry.fetched_at is None else time.monotonic() - entry.fetched_at
+        if not refresh and age is not None:
+            if age < self.ttl_seconds:
+                catalog_lookups.inc(key[1], "fresh")
+                return entry.value
+            if age < self.ttl_seconds + self.stale_seconds:
+                catalog_lookups.inc(key[1], "stale")
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    executor.get_executor().submit(self._refresh, key, entry, fetch, *args)
+                return entry.value
+
+        catalog_lookups.inc(key[1], "miss")
+        fetched_at = entry.fetched_at
+        with entry.lock:
+            # Another caller may have fetched while we waited for the lock
+            if entry.fetched_at is not None and entry.fetched_at != fetched_at:
+                return entry.value
+            return self._fetch(key, entry, fetch, *args)
+
+    def databases(self, client, connection: str = None, refresh: bool = False) -> list[str]:
+        return self.lookup((resolve_name(connection), DATABASES), fetch_databases, client, refresh=refresh)
+
+    def collections(self, client, database: str, connection: str = None, refresh: bool = False) -> list[dict]:
+        key = (resolve_name(connection), COLLECTIONS, database)
+        return self.lookup(key, fetch_collections, client, database, refresh=refresh)
+
+    def stats(self, client, database: str, collection: str, connection: str = None, refresh: bool = False) -> dict:
+        key = (resolve_name(connection), STATS, database, collection)
+        return self.lookup(key, fetch_stats, client, database, collection, refresh=refresh)
+
+    def _cached(self, key: tuple):
+        entry = self._entries.get(key)
+        return None if entry is None else entry.value
+
+    def note_write(self, database: str, collection: str, connection: str = None):
+        """Drop metadata a write to database.collection may have changed.
+
+        Stats always change. The collection and database lists only change if
+        the write created the collection, which can only be the case if the
+        cached lists don't have it yet.
+        """
+        connection = resolve_name(connection)
+        with self._lock:
+            self._entries.pop((connection, STATS, database, collection), None)
+            collections = self._cached((connection, COLLECTIONS, database))
+            if collections is not None and not any(info["name"] == collection for info in collections):
+                del self._entries[(connection, COLLECTIONS, database)]
+            databases = self._cached((connection, DATABASES))
+            if databases is not None and database not in databases:
+                del self._entries[(connection, DATABASES)]
+
+    def invalidate(self, database: str = None, collection: str = None, connection: str = None):
+        """Drop cached metadata of a collection, a database, or everything for the connection.
+
+        Used when collections are dropped or renamed, which changes the lists as well.
+        """
+        connection = resolve_name(connection)
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != connection:
+                    continue
+                if database is not None and key[1] != DATABASES:
+                    if key[2] != database:
+                        continue
+                    if collection is not None and key[1] == STATS and key[3] != collection:
+                        continue
+                del self._entries[key]
+
+metadata_catalog = MetadataCatalog(
+    ttl_seconds=float(os.getenv("CATALOG_TTL_SECONDS", "60")),
+    stale_seconds=float(os.getenv("CATALOG_STALE_SECONDS", "300"))
+)
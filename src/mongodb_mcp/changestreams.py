@@ -0,0 +1,261 @@
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from mongodb_mcp.connection import resolve_name
+from mongodb_mcp.logging_config import get_logger
+
+logger = get_logger("changestreams")
+
+PAUSE = "pause"
+DROP_OLDEST = "drop_oldest"
+OVERFLOW_POLICIES = (PAUSE, DROP_OLDEST)
+
+# Event fields returned to callers; _id (the resume token) is reported separately
+EVENT_FIELDS = (
+    "operationType", "ns", "to", "documentKey", "fullDocument",
+    "updateDescription", "clusterTime", "wallTime",
+)
+
+def get_buffer_size() -> int:
+    return int(os.getenv("WATCH_BUFFER_SIZE", "1000"))
+
+class Subscription(threading.Thread):
+    """A change stream tailed into a bounded buffer until it is polled.
+
+    The thread keeps the resume token of the last event it buffered (or the
+    stream's post-batch token while idle) and resumes from it after
+    transient errors, so a reconnect neither replays nor skips events. When
+    the buffer is full it either stops reading until the next poll (pause,
+    lossless while the oplog still holds the events) or drops the oldest
+    event (drop_oldest).
+    """
+
+    def __init__(self, target, stream, connection: str, description: str, pipeline: list,
+                 full_document: str | None, buffer_size: int, overflow: str):
+        self.id = secrets.token_urlsafe(12)
+        super().__init__(name=f"mongodb-mcp-watch-{self.id}", daemon=True)
+        self.target = target
+        self.stream = stream
+        self.connection = connection
+        self.description = description
+        self.pipeline = pipeline
+        self.full_document = full_document
+        self.overflow = overflow
+        self.buffer: deque = deque(maxlen=buffer_size if overflow == DROP_OLDEST else None)
+        self.buffer_size = buffer_size
+        self.resume_token = stream.resume_token
+        self.delivered_token = self.resume_token
+        self.received = 0
+        self.dropped = 0
+        self.ended = None
+        self.created_at = time.time()
+        self.last_polled = time.monotonic()
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+
+    def _open(self):
+        options = {"resume_after": self.resume_token, "max_await_time_ms": 1000}
+        if self.full_document:
+            options["full_document"] = self.full_document
+        return self.target.watch(self.pipeline, **options)
+
+    def _buffer(self, change):
+        with self._lock:
+            while self.overflow == PAUSE and len(self.buffer) >= self.buffer_size:
+                if self._stop_event.is_set():
+                    return
+                self._space.wait(1)
+            if self.buffer.maxlen is not None and len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(change)
+            self.received += 1
+            self.resume_token = change["_id"]
+
+    def run(self):
+        from pymongo.errors import OperationFailure, PyMongoError
+
+        stream = self.stream
+        while not self._stop_event.is_set():
+            try:
+                if stream is None:
+                    stream = self._open()
+                    logger.info("Subscription %s on %s resumed", self.id, self.description)
+                while not self._stop_event.is_set() and stream.alive:
+                    change = stream.try_next()
+                    if change is None:
+                        # The post-batch token moves past idle stretches of the oplog
+                        with self._lock:
+                            self.resume_token = stream.resume_token or self.resume_token
+                        continue
+                    self._buffer(change)
+                    if change.get("operationType") == "invalidate":
+                        self.ended = "invalidated: the watched collection or database was dropped or renamed"
+                        return
+                if not stream.alive and not self._stop_event.is_set():
+                    stream.close()
+                    stream = None
+            except OperationFailure as e:
+                if e.code in (40573, 286, 280):
+                    # Not supported, history lost, or not resumable
+                    self.ended = f"failed: {str(e)}"
+                    logger.warning("Subscription %s on %s ended: %s", self.id, self.description, e)
+                    return
+                logger.warning("Subscription %s on %s interrupted: %s", self.id, self.description, e)
+                stream = None
+                self._stop_event.wait(1)
+            except PyMongoError as e:
+                logger.warning("Subscription %s on %s interrupted: %s", self.id, self.description, e)
+                stream = None
+                self._stop_event.wait(1)
+            finally:
+                if stream is not None and (self._stop_event.is_set() or self.ended):
+                    stream.close()
+
+    def stop(self):
+        self._stop_event.set()
+        with self._lock:
+            self._space.notify_all()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self.buffer)
+
+    def poll(self, max_events: int, budget) -> tuple[list, dict]:
+        """Remove and return up to max_events buffered events that fit the budget."""
+        events = []
+        with self._lock:
+            self.last_polled = time.monotonic()
+            while self.buffer and len(events) < max_events:
+                change = self.buffer[0]
+                fitted = budget.fit({field: change[field] for field in EVENT_FIELDS if field in change})
+                if fitted is None:
+                    break
+                self.buffer.popleft()
+                events.append(fitted)
+                self.delivered_token = change["_id"]
+            dropped, self.dropped = self.dropped, 0
+            remaining = len(self.buffer)
+            self._space.notify_all()
+        status = {"pending": remaining, "resume_token": self.delivered_token}
+        if dropped:
+            status["events_dropped"] = dropped
+        if self.ended and not remaining:
+            status["ended"] = self.ended
+        return events, status
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "subscription": self.id,
+                "connection": self.connection,
+                "target": self.description,
+                "pending": len(self.buffer),
+                "received": self.received,
+                "overflow": self.overflow,
+                "idle_s": round(time.monotonic() - self.last_polled, 1),
+                **({"ended": self.ended} if self.ended else {}),
+            }
+
+class SubscriptionRegistry:
+    """Open subscriptions by id. Subscriptions not polled within the TTL are closed."""
+
+    def __init__(self, max_subscriptions: int = 20, ttl_seconds: float = 600):
+        self.max_subscriptions = max_subscriptions
+        self.ttl_seconds = ttl_seconds
+        self._subscriptions: dict[str, Subscription] = {}
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl_seconds
+        with self._lock:
+            expired = [s for s in self._subscriptions.values() if s.last_polled < deadline]
+            for subscription in expired:
+                del self._subscriptions[subscription.id]
+        for subscription in expired:
+            subscription.stop()
+            logger.info(
+                "Closed subscription %s on %s: not polled for %.0fs",
+                subscription.id, subscription.description, self.ttl_seconds
+            )
+
+    def open(self, client, database: str = None, collection: str = None, pipeline: list = None,
+             full_document: str = None, resume_after: dict = None, overflow: str = PAUSE,
+             connection: str = None) -> Subscription:
+        """Open a change stream on a collection, a database or the whole cluster and start tailing it.
+
+        The stream is opened before returning, so an unsupported deployment or
+        an expired resume token is reported to the caller.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Use one of {list(OVERFLOW_POLICIES)}")
+        if collection and not database:
+            raise ValueError("A collection can only be watched together with its database")
+        self._expire()
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscriptions:
+                raise RuntimeError(f"Too many open subscriptions ({self.max_subscriptions}). Use unwatch first.")
+
+        if collection:
+            target, description = client[database][collection], f"{database}.{collection}"
+        elif database:
+            target, description = client[database], database
+        else:
+            target, description = client, "cluster"
+        pipeline = pipeline or []
+        options = {"max_await_time_ms": 1000}
+        if full_document:
+            options["full_document"] = full_document
+        if resume_after:
+            options["start_after"] = resume_after
+        stream = target.watch(pipeline, **options)
+
+        subscription = Subscription(
+            target, stream, resolve_name(connection), description, pipeline,
+            full_document, get_buffer_size(), overflow
+        )
+        with self._lock:
+            self._subscriptions[subscription.id] = subscription
+        subscription.start()
+        logger.info("Subscription %s watching %s on '%s'", subscription.id, description, subscription.connection)
+        return subscription
+
+    def get(self, subscription_id: str) -> Subscription:
+        self._expire()
+        subscription = self._subscriptions.get(subscription_id)
+        if subscription is None:
+            raise KeyError(f"Unknown or expired subscription '{subscription_id}'")
+        return subscription
+
+    def close(self, subscription_id: str) -> bool:
+        with self._lock:
+            subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return False
+        subscription.stop()
+        return True
+
+    def close_all(self, connection: str = None):
+        """Close every subscription, or only those opened through one connection."""
+        with self._lock:
+            closing = [
+                s for s in self._subscriptions.values()
+                if connection is None or s.connection == resolve_name(connection)
+            ]
+            for subscription in closing:
+                del self._subscriptions[subscription.id]
+        for subscription in closing:
+            subscription.stop()
+
+    def list(self) -> list[dict]:
+        self._expire()
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        return [subscription.info() for subscription in subscriptions]
+
+subscriptions = SubscriptionRegistry(
+    max_subscriptions=int(os.getenv("WATCH_MAX_SUBSCRIPTIONS", "20")),
+    ttl_seconds=float(os.getenv("WATCH_IDLE_TTL_SECONDS", "600"))
+)
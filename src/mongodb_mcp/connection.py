@@ -1,11 +1,170 @@
-from pymongo import MongoClient
-from typing import Optional
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+from mongodb_mcp.health import ConnectionHealth, health_monitor
+from mongodb_mcp.logging_config import get_logger
 
-_client: Optional[MongoClient] = None
+if TYPE_CHECKING:
+    from pymongo import MongoClient
 
-def get_client() -> Optional[MongoClient]:
-    return _client
+logger = get_logger("connection")
 
-def set_client(client: Optional[MongoClient]):
-    global _client
-    _client = client
+DEFAULT_CONNECTION = "default"
+
+# Pool settings that can be configured per connection, with their env var defaults
+POOL_OPTIONS = {
+    "maxPoolSize": ("MONGODB_MAX_POOL_SIZE", int),
+    "minPoolSize": ("MONGODB_MIN_POOL_SIZE", int),
+    "maxIdleTimeMS": ("MONGODB_MAX_IDLE_TIME_MS", int),
+    "compressors": ("MONGODB_COMPRESSORS", str),
+    "readPreference": ("MONGODB_READ_PREFERENCE", str),
+    "socketTimeoutMS": ("MONGODB_SOCKET_TIMEOUT_MS", int),
+}
+
+class _Connection:
+    def __init__(self, client: "MongoClient", uri: str, options: dict):
+        self.client = client
+        self.uri = uri
+        self.options = options
+
+_connections: dict[str, _Connection] = {}
+_lock = threading.Lock()
+
+def resolve_name(name: Optional[str]) -> str:
+    return name or DEFAULT_CONNECTION
+
+def mask_uri(uri: str) -> str:
+    """Strip credentials from a URI for logging."""
+    return uri.split("@")[-1] if "@" in uri else uri
+
+def get_client(name: Optional[str] = None) -> Optional["MongoClient"]:
+    connection = _connections.get(resolve_name(name))
+    return connection.client if connection else None
+
+def set_client(client: Optional["MongoClient"], name: Optional[str] = None):
+    """Register (or with None, forget) a client without pool bookkeeping."""
+    name = resolve_name(name)
+    with _lock:
+        if client is None:
+            _connections.pop(name, None)
+        else:
+            _connections[name] = _Connection(client, "", {})
+    health_monitor.forget(name)
+
+def get_active_client(name: Optional[str] = None) -> "MongoClient":
+    """The named client, failing fast while its circuit breaker is open."""
+    client = get_client(name)
+    if not client:
+        if resolve_name(name) == DEFAULT_CONNECTION:
+            raise RuntimeError("Not connected to MongoDB. Please use 'connect' tool first.")
+        raise RuntimeError(f"No connection named '{name}'. Please use 'connect' with connection='{name}' first.")
+    health_monitor.check(resolve_name(name))
+    return client
+
+def list_connections() -> dict[str, dict]:
+    return {
+        name: {"host": mask_uri(connection.uri), **connection.options}
+        for name, connection in _connections.items()
+    }
+
+def pool_options(**overrides) -> dict:
+    """Pool settings from the environment, with non-None overrides applied."""
+    options = {}
+    for option, (env_var, cast) in POOL_OPTIONS.items():
+        value = overrides.get(option)
+        if value is None and os.getenv(env_var):
+            value = cast(os.getenv(env_var))
+        if value is not None:
+            options[option] = value
+    return options
+
+def warm_pool(client: "MongoClient", connections: int):
+    """Open pooled connections up front with concurrent pings."""
+    if connections <= 1:
+        client.admin.command("ping")
+        return
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        for future in [pool.submit(client.admin.command, "ping") for _ in range(connections)]:
+            future.result()
+
+def open_client(name: Optional[str], uri: str, **overrides) -> tuple["MongoClient", bool]:
+    """Connect a named client, reusing the existing pool if nothing changed.
+
+    Returns the client and whether an existing pool was reused. A client
+    replaced by a different URI or different pool settings is closed.
+    """
+    name = resolve_name(name)
+    options = pool_options(**overrides)
+    existing = _connections.get(name)
+    if existing and existing.uri == uri and existing.options == options:
+        return existing.client, True
+
+    # Imported here so that starting the server does not load the driver
+    from pymongo import MongoClient
+    from mongodb_mcp.listeners import DriverListener, HealthListener
+
+    health = ConnectionHealth(name)
+    client = MongoClient(
+        uri,
+        serverSelectionTimeoutMS=5000,
+        event_listeners=[DriverListener(name), HealthListener(health)],
+        **options
+    )
+    try:
+        warm_pool(client, options.get("minPoolSize", 1))
+    except Exception:
+        client.close()
+        raise
+
+    with _lock:
+        previous = _connections.get(name)
+        _connections[name] = _Connection(client, uri, options)
+    health_monitor.register(health, client)
+    if previous:
+        previous.client.close()
+    logger.info("Connection '%s' ready: %s %s", name, mask_uri(uri), options)
+    return client, False
+
+def close_client(name: Optional[str] = None) -> bool:
+    """Close and forget a named client. Returns False if it does not exist."""
+    with _lock:
+        connection = _connections.pop(resolve_name(name), None)
+    if connection is None:
+        return False
+    health_monitor.forget(resolve_name(name))
+    connection.client.close()
+    return True
+
+def configured_connections() -> dict[str, dict]:
+    """Connections declared in the environment.
+
+    MONGODB_URI becomes the default connection. MONGODB_CONNECTIONS is a JSON
+    object mapping names to a URI or to {"uri": ..., <pool options>}.
+    """
+    configured = {}
+    if os.getenv("MONGODB_URI"):
+        configured[DEFAULT_CONNECTION] = {"uri": os.getenv("MONGODB_URI")}
+    for name, spec in json.loads(os.getenv("MONGODB_CONNECTIONS", "{}")).items():
+        configured[name] = {"uri": spec} if isinstance(spec, str) else dict(spec)
+    return configured
+
+def warm_up(include_default: bool = False) -> list[str]:
+    """Open and pre-warm the pools of configured connections.
+
+    Failures are logged rather than raised so a down cluster does not stop
+    the server from starting. Returns the names of the connections opened.
+    """
+    opened = []
+    for name, spec in configured_connections().items():
+        if name == DEFAULT_CONNECTION and not include_default:
+            continue
+        spec = dict(spec)
+        uri = spec.pop("uri")
+        try:
+            open_client(name, uri, **spec)
+            opened.append(name)
+        except Exception as e:
+            logger.error("Failed to warm up connection '%s': %s", name, e)
+    return opened
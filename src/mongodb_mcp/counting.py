@@ -0,0 +1,91 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+EXACT = "exact"
+ESTIMATED = "estimated"
+APPROXIMATE = "approximate"
+AUTO = "auto"
+MODES = (EXACT, ESTIMATED, APPROXIMATE, AUTO)
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+
+def get_sample_size() -> int:
+    return int(os.getenv("COUNT_SAMPLE_SIZE", "1000"))
+
+def get_latency_budget_ms() -> int:
+    return int(os.getenv("COUNT_LATENCY_BUDGET_MS", "500"))
+
+def wilson_interval(hits: int, sampled: int, population: int, z: float = Z_95) -> tuple[float, float]:
+    """Wilson score interval for a proportion, with finite population correction."""
+    if sampled == 0:
+        return 0.0, 1.0
+    if population > 1 and sampled < population:
+        z *= math.sqrt((population - sampled) / (population - 1))
+    elif sampled >= population:
+        p = hits / sampled
+        return p, p
+    p = hits / sampled
+    denominator = 1 + z * z / sampled
+    centre = (p + z * z / (2 * sampled)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / sampled + z * z / (4 * sampled * sampled)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+def approximate_count(coll, filter: dict, sample_size: int, total: int = None) -> dict:
+    """Estimate a filtered count from a random sample of the collection.
+
+    $sample uses a random cursor (no collection scan) when the sample is
+    under 5% of the collection. Matching happens inside a $facet so the
+    sample is drawn once.
+    """
+    total = coll.estimated_document_count() if total is None else total
+    pipeline = [
+        {"$sample": {"size": sample_size}},
+        {"$facet": {
+            "sampled": [{"$count": "n"}],
+            "matched": [{"$match": filter}, {"$count": "n"}],
+        }},
+    ]
+    result = next(coll.aggregate(pipeline), {})
+    sampled = (result.get("sampled") or [{"n": 0}])[0]["n"]
+    hits = (result.get("matched") or [{"n": 0}])[0]["n"]
+    low, high = wilson_interval(hits, sampled, total)
+    return {
+        "count": round(hits / sampled * total) if sampled else 0,
+        "confidence_interval": [math.floor(low * total), math.ceil(high * total)],
+        "confidence": 0.95,
+        "sampled": sampled,
+        "matched_in_sample": hits,
+        "collection_size": total,
+    }
+
+class SlowCountMemo:
+    """Remembers query shapes whose exact count recently overran its budget."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: tuple):
+        with self._lock:
+            self._entries[key] = time.monotonic()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            added = self._entries.get(key)
+            if added is None:
+                return False
+            if time.monotonic() - added > self.ttl_seconds:
+                del self._entries[key]
+                return False
+            return True
+
+slow_counts = SlowCountMemo()
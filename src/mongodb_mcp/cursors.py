@@ -0,0 +1,131 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from mongodb_mcp.connection import resolve_name
+from mongodb_mcp.logging_config import get_logger
+
+logger = get_logger("cursors")
+
+class _CursorEntry:
+    def __init__(self, cursor, namespace: str, connection: str, pending: list = None,
+                 sliced: frozenset = frozenset()):
+        self.cursor = cursor
+        self.namespace = namespace
+        self.connection = connection
+        # Documents already read from the cursor but not yet returned
+        self.pending = pending or []
+        self.sliced = sliced
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+class CursorRegistry:
+    """Live server-side cursors addressed by opaque continuation tokens.
+
+    Entries are kept in LRU order. Cursors idle for longer than the TTL are
+    closed, and the least recently used cursor is closed once the registry is
+    full. Each cursor has its own lock because PyMongo cursors are not
+    thread-safe.
+    """
+
+    def __init__(self, max_cursors: int = 100, ttl_seconds: float = 300):
+        self.max_cursors = max_cursors
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _CursorEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pop_expired(self) -> list[_CursorEntry]:
+        """Remove expired and overflowing entries. Caller must hold self._lock."""
+        removed = []
+        deadline = time.monotonic() - self.ttl_seconds
+        while self._entries:
+            token, entry = next(iter(self._entries.items()))
+            if entry.last_used >= deadline and len(self._entries) <= self.max_cursors:
+                break
+            del self._entries[token]
+            removed.append(entry)
+        return removed
+
+    def _close(self, entries: list[_CursorEntry]):
+        for entry in entries:
+            with entry.lock:
+                try:
+                    entry.cursor.close()
+                except Exception as e:
+                    logger.warning("Failed to close cursor on %s: %s", entry.namespace, e)
+        if entries:
+            logger.debug("Closed %s expired or evicted cursors", len(entries))
+
+    def register(self, cursor, namespace: str, connection: str = None, pending: list = None,
+                 sliced: frozenset = frozenset()) -> str:
+        """Store a live cursor and return its continuation token.
+
+        pending holds documents read past the end of the current page, which
+        the next page returns first. sliced lists array paths cut short by a
+        server-side $slice.
+        """
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._entries[token] = _CursorEntry(cursor, namespace, resolve_name(connection), pending, sliced)
+            removed = self._pop_expired()
+        self._close(removed)
+        logger.debug("Registered cursor on %s (%s open)", namespace, len(self._entries))
+        return token
+
+    @contextmanager
+    def lease(self, token: str):
+        """Borrow a registered cursor exclusively.
+
+        Raises KeyError if the token is unknown or has expired. The cursor is
+        dropped from the registry once it is exhausted or fails.
+        """
+        with self._lock:
+            removed = self._pop_expired()
+            entry = self._entries.get(token)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(token)
+        self._close(removed)
+        if entry is None:
+            raise KeyError("Unknown or expired continuation token")
+
+        try:
+            with entry.lock:
+                yield entry
+                entry.last_used = time.monotonic()
+                exhausted = not entry.cursor.alive and not entry.pending
+        except Exception:
+            self.discard(token)
+            raise
+
+        if exhausted:
+            self.discard(token)
+
+    def discard(self, token: str) -> bool:
+        """Close and forget a cursor. Returns False if the token is unknown."""
+        with self._lock:
+            entry = self._entries.pop(token, None)
+        if entry is None:
+            return False
+        self._close([entry])
+        return True
+
+    def close_all(self, connection: str = None):
+        """Close every cursor, or only those opened through one connection."""
+        with self._lock:
+            tokens = [
+                token for token, entry in self._entries.items()
+                if connection is None or entry.connection == resolve_name(connection)
+            ]
+            entries = [self._entries.pop(token) for token in tokens]
+        self._close(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+cursor_registry = CursorRegistry(
+    max_cursors=int(os.getenv("MAX_OPEN_CURSORS", "100")),
+    ttl_seconds=float(os.getenv("CURSOR_TTL_SECONDS", "300"))
+)
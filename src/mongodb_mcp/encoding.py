@@ -0,0 +1,124 @@
+import base64
+import datetime
+import json
+import os
+from functools import partial
+from bson import Binary, Decimal128, ObjectId, json_util
+from bson.json_util import CANONICAL_JSON_OPTIONS, RELAXED_JSON_OPTIONS
+
+RELAXED = "relaxed"
+CANONICAL = "canonical"
+
+_relaxed_default = partial(json_util.default, json_options=RELAXED_JSON_OPTIONS)
+
+def _encode_datetime(value: datetime.datetime):
+    # PyMongo decodes dates as naive UTC; anything else goes through json_util
+    if value.tzinfo is not None or value.year < 1970:
+        return _relaxed_default(value)
+    # json_util keeps milliseconds only, so sub-millisecond values print as whole seconds
+    if value.microsecond >= 1000:
+        return {"$date": value.isoformat(timespec="milliseconds") + "Z"}
+    return {"$date": value.isoformat(timespec="seconds") + "Z"}
+
+def _encode_binary(value: bytes, subtype: int = 0):
+    return {"$binary": {"base64": base64.b64encode(value).decode(), "subType": f"{subtype:02x}"}}
+
+class Encoded:
+    """A document together with its compact JSON encoding.
+
+    Responses built from Encoded items reuse the text when they are encoded
+    compactly in the same mode, so a document measured for the response
+    budget is not encoded twice. Otherwise the document is encoded again.
+    """
+
+    __slots__ = ("document", "text", "mode")
+
+    def __init__(self, document, mode: str = None):
+        self.mode = mode or get_json_mode()
+        self.document = document
+        self.text = encode(document, self.mode, pretty=False)
+
+# Fast paths for the most common BSON types, keyed by exact type
+_FAST_ENCODERS = {
+    ObjectId: lambda value: {"$oid": str(value)},
+    Encoded: lambda value: value.document,
+    datetime.datetime: _encode_datetime,
+    Decimal128: lambda value: {"$numberDecimal": str(value)},
+    Binary: lambda value: _encode_binary(value, value.subtype),
+    bytes: _encode_binary,
+}
+
+def _bson_default(value):
+    """json.JSONEncoder hook producing relaxed Extended JSON for BSON types."""
+    encoder = _FAST_ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    return _relaxed_default(value)
+
+_compact_encoder = json.JSONEncoder(
+    default=_bson_default, separators=(",", ":"), check_circular=False
+)
+_pretty_encoder = json.JSONEncoder(default=_bson_default, indent=2, check_circular=False)
+
+def get_json_mode() -> str:
+    return os.getenv("JSON_MODE", RELAXED).lower()
+
+def is_pretty() -> bool:
+    return os.getenv("JSON_PRETTY", "false").lower() == "true"
+
+def _has_encoded(value) -> bool:
+    # Budgeted lists are Encoded throughout, so the first item tells
+    return isinstance(value, list) and bool(value) and isinstance(value[0], Encoded)
+
+def _unwrap(data):
+    """Replace Encoded items in the top-level lists of a response with their documents."""
+    return {
+        key: [item.document if isinstance(item, Encoded) else item for item in value] if _has_encoded(value) else value
+        for key, value in data.items()
+    }
+
+def _compact(data, mode: str) -> str:
+    if mode == CANONICAL:
+        return json_util.dumps(data, json_options=CANONICAL_JSON_OPTIONS, separators=(",", ":"))
+    return _compact_encoder.encode(data)
+
+def _splice(data: dict, mode: str) -> str:
+    """Compact encoding of a response that reuses the text of Encoded items in its top-level lists."""
+    parts = []
+    for key, value in data.items():
+        if _has_encoded(value):
+            items = (
+                item.text if isinstance(item, Encoded) and item.mode == mode
+                else _compact(item.document if isinstance(item, Encoded) else item, mode)
+                for item in value
+            )
+            text = "[" + ",".join(items) + "]"
+        else:
+            text = _compact(value, mode)
+        parts.append(f"{_compact(str(key), mode)}:{text}")
+    return "{" + ",".join(parts) + "}"
+
+def encode(data, mode: str = None, pretty: bool = None) -> str:
+    """Encode a tool response, including BSON values, to JSON text in one pass.
+
+    Documents wrapped in Encoded are emitted from their existing encoding
+    when the output is compact.
+
+    Args:
+        data: Response object; may contain ObjectId, datetime, Decimal128, Binary etc.
+        mode: "relaxed" or "canonical" Extended JSON (default: JSON_MODE env var)
+        pretty: Indent the output (default: JSON_PRETTY env var)
+    """
+    mode = mode or get_json_mode()
+    pretty = is_pretty() if pretty is None else pretty
+    spliced = isinstance(data, dict) and any(_has_encoded(value) for value in data.values())
+
+    if pretty:
+        if spliced:
+            data = _unwrap(data)
+        if mode == CANONICAL:
+            return json_util.dumps(data, json_options=CANONICAL_JSON_OPTIONS, indent=2)
+        return _pretty_encoder.encode(data)
+    if spliced:
+        return _splice(data, mode)
+    return _compact(data, mode)
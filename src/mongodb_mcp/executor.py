@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+def _parse_limits(raw: str) -> dict[str, int]:
+    """Parse a "tool=limit,tool=limit" string into a dict."""
+    limits = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        limits[name.strip()] = int(value)
+    return limits
+
+def get_worker_count() -> int:
+    """Number of threads available for blocking tool calls."""
+    return int(os.getenv("TOOL_WORKERS", "32"))
+
+def get_tool_limit(tool_name: str) -> int:
+    """Maximum number of concurrent calls allowed for a tool.
+
+    Per-tool limits come from TOOL_CONCURRENCY_LIMITS (e.g. "aggregate=4,collection_stats=4"),
+    everything else falls back to TOOL_CONCURRENCY, which defaults to the worker count.
+    """
+    limits = _parse_limits(os.getenv("TOOL_CONCURRENCY_LIMITS", ""))
+    if tool_name in limits:
+        return limits[tool_name]
+    return int(os.getenv("TOOL_CONCURRENCY", str(get_worker_count())))
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_worker_count(),
+            thread_name_prefix="mongodb-mcp-tool"
+        )
+    return _executor
+
+def _get_semaphore(tool_name: str) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(tool_name)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(get_tool_limit(tool_name))
+        _semaphores[tool_name] = semaphore
+    return semaphore
+
+async def run_blocking(tool_name: str, func, *args, **kwargs):
+    """Run a blocking function on the worker pool, honouring the tool's concurrency limit.
+
+    The caller's context variables are copied into the worker thread.
+    """
+    async with _get_semaphore(tool_name):
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await loop.run_in_executor(get_executor(), call)
+
+def offload(func):
+    """Wrap a blocking tool function in a coroutine that runs it on the worker pool."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func.__name__, func, *args, **kwargs)
+    return wrapper
+
+def shutdown(wait: bool = True):
+    """Stop the worker pool. A new pool is created on next use."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
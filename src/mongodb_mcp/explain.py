@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from mongodb_mcp.connection import resolve_name
+from mongodb_mcp.logging_config import get_logger
+
+logger = get_logger("explain")
+
+GUARD_OFF = "off"
+GUARD_WARN = "warn"
+GUARD_BLOCK = "block"
+
+# Examined-to-returned ratio above which a plan is flagged as unselective
+UNSELECTIVE_RATIO = 100
+
+@dataclass
+class PlanSummary:
+    """The parts of an explain result that matter when judging a query."""
+    stages: list[str] = field(default_factory=list)
+    indexes: list[str] = field(default_factory=list)
+    collscan: bool = False
+    blocking_sort: bool = False
+    rejected_plans: int = 0
+    returned: int | None = None
+    docs_examined: int | None = None
+    keys_examined: int | None = None
+    execution_time_ms: int | None = None
+
+    def warnings(self) -> list[str]:
+        warnings = []
+        if self.collscan:
+            warnings.append("Collection scan (COLLSCAN): no index supports this filter")
+        if self.blocking_sort:
+            warnings.append("In-memory sort (SORT): no index provides the requested order")
+        if self.docs_examined and self.docs_examined > UNSELECTIVE_RATIO * max(self.returned or 0, 1):
+            warnings.append(f"Examined {self.docs_examined} documents to return {self.returned}")
+        return warnings
+
+    def to_dict(self) -> dict:
+        result = {
+            "winning_plan": " <- ".join(self.stages),
+            "indexes_used": self.indexes,
+            "collscan": self.collscan,
+            "rejected_plans": self.rejected_plans,
+        }
+        if self.returned is not None:
+            result.update({
+                "returned": self.returned,
+                "docs_examined": self.docs_examined,
+                "keys_examined": self.keys_examined,
+                "execution_time_ms": self.execution_time_ms,
+            })
+        warnings = self.warnings()
+        if warnings:
+            result["warnings"] = warnings
+        return result
+
+def build_command(collection: str, operation: str, filter: dict = None, projection: dict = None,
+                  sort: dict = None, limit: int = None, pipeline: list = None, field: str = None) -> dict:
+    """The command document an operation would send, for wrapping in explain."""
+    filter = filter or {}
+    if operation == "find":
+        command = {"find": collection, "filter": filter}
+        if projection:
+            command["projection"] = projection
+        if sort:
+            command["sort"] = sort
+        if limit:
+            command["limit"] = limit
+        return command
+    if operation == "count":
+        return {"count": collection, "query": filter}
+    if operation == "distinct":
+        return {"distinct": collection, "key": field, "query": filter}
+    if operation == "aggregate":
+        return {"aggregate": collection, "pipeline": pipeline or [], "cursor": {}}
+    raise ValueError(f"Unsupported operation '{operation}'. Use find, count, distinct or aggregate")
+
+def explain(db, command: dict, verbosity: str = "queryPlanner") -> dict:
+    return db.command({"explain": command, "verbosity": verbosity})
+
+def _find_key(document, key: str):
+    """First value stored under key anywhere in a nested explain document."""
+    pending = [document]
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, dict):
+            if key in node:
+                return node[key]
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return None
+
+def _walk_plan(plan: dict, summary: PlanSummary):
+    """Collect stage names and index names from a plan tree, root first."""
+    pending = [plan]
+    while pending:
+        node = pending.pop(0)
+        if not isinstance(node, dict):
+            continue
+        stage = node.get("stage")
+        if stage:
+            summary.stages.append(stage)
+            if stage == "COLLSCAN":
+                summary.collscan = True
+            elif stage == "SORT":
+                summary.blocking_sort = True
+        if node.get("indexName") and node["indexName"] not in summary.indexes:
+            summary.indexes.append(node["indexName"])
+        # Classic plans nest through inputStage(s); SBE wraps the tree in queryPlan;
+        # sharded plans list one winning plan per shard
+        for key in ("queryPlan", "inputStage"):
+            if isinstance(node.get(key), dict):
+                pending.append(node[key])
+        for key in ("inputStages", "shards"):
+            if isinstance(node.get(key), list):
+                pending.extend(node[key])
+        if isinstance(node.get("winningPlan"), dict):
+            pending.append(node["winningPlan"])
+
+def summarize(explain_output: dict) -> PlanSummary:
+    """Condense find, count, distinct or aggregate explain output.
+
+    Handles classic and SBE plans, aggregations whose first stage is a
+    $cursor, and sharded clusters.
+    """
+    summary = PlanSummary()
+    planner = _find_key(explain_output, "queryPlanner") or {}
+    _walk_plan(planner.get("winningPlan", {}), summary)
+    rejected = _find_key(planner, "rejectedPlans")
+    summary.rejected_plans = len(rejected) if isinstance(rejected, list) else 0
+
+    stats = _find_key(explain_output, "executionStats")
+    if isinstance(stats, dict):
+        summary.returned = stats.get("nReturned")
+        summary.docs_examined = stats.get("totalDocsExamined")
+        summary.keys_examined = stats.get("totalKeysExamined")
+        summary.execution_time_ms = stats.get("executionTimeMillis")
+    return summary
+
+def get_guard_mode() -> str:
+    return os.getenv("QUERY_GUARD", GUARD_OFF).lower()
+
+def get_guard_threshold() -> int:
+    return int(os.getenv("QUERY_GUARD_COLLSCAN_THRESHOLD", "100000"))
+
+class _CountCache:
+    """Estimated collection sizes, refreshed at most once a minute per namespace."""
+
+    def __init__(self, ttl_seconds: float = 60):
+        self.ttl_seconds = ttl_seconds
+        self._counts: dict[tuple, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, coll) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._counts.get(key)
+        if cached and now - cached[1] < self.ttl_seconds:
+            return cached[0]
+        count = coll.estimated_document_count()
+        with self._lock:
+            self._counts[key] = (count, now)
+        return count
+
+_collection_sizes = _CountCache()
+
+class QueryGuardError(Exception):
+    """Raised when the guard blocks a query."""
+    pass
+
+def check_query(client, database: str, collection: str, operation: str, connection: str = None, **params) -> str | None:
+    """Run a planner-only explain and judge the query before it executes.
+
+    Returns a warning when the winning plan scans a collection larger than
+    QUERY_GUARD_COLLSCAN_THRESHOLD, and raises QueryGuardError instead when
+    QUERY_GUARD=block. Finds with an empty filter and no sort are exempt
+    since they stop after limit documents.
+    """
+    mode = get_guard_mode()
+    if mode not in (GUARD_WARN, GUARD_BLOCK):
+        return None
+    if operation == "find" and not params.get("filter") and not params.get("sort"):
+        return None
+
+    db = client[database]
+    try:
+        summary = summarize(explain(db, build_command(collection, operation, **params)))
+    except Exception as e:
+        # The guard is advisory; a server that cannot explain still runs the query
+        logger.warning("Query guard skipped, explain failed: %s", e)
+        return None
+    if not summary.collscan:
+        return None
+    size = _collection_sizes.get((resolve_name(connection), database, collection), db[collection])
+    if size < get_guard_threshold():
+        return None
+
+    message = (
+        f"Query guard: {operation} on {database}.{collection} would scan the whole collection "
+        f"(~{size} documents, threshold {get_guard_threshold()}). Add an index or a more selective filter."
+    )
+    if mode == GUARD_BLOCK:
+        raise QueryGuardError(message)
+    return message
@@ -0,0 +1,91 @@
+import math
+import os
+
+EXACT = "exact"
+APPROXIMATE = "approximate"
+NONE = "none"
+DISTINCT_COUNT_MODES = (EXACT, APPROXIMATE, NONE)
+
+def get_distinct_max_values() -> int:
+    return int(os.getenv("DISTINCT_MAX_VALUES", "1000"))
+
+def values_pipeline(field: str, filter: dict = None) -> list[dict]:
+    """Stages yielding one {"v": value} document per value of field, as distinct counts them.
+
+    Documents without the field are skipped and array values are unwound,
+    matching the distinct command. Empty arrays count as null.
+    """
+    match = {field: {"$exists": True}}
+    if filter:
+        match = {"$and": [filter, match]}
+    return [
+        {"$match": match},
+        {"$project": {"_id": 0, "v": f"${field}"}},
+        {"$unwind": {"path": "$v", "preserveNullAndEmptyArrays": True}},
+    ]
+
+def top_values_pipeline(field: str, filter: dict = None) -> list[dict]:
+    """Values of field with their counts, most frequent first (ties by value)."""
+    return values_pipeline(field, filter) + [
+        {"$group": {"_id": "$v", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$project": {"_id": 0, "value": "$_id", "count": "$count"}},
+    ]
+
+def exact_distinct_count(coll, field: str, filter: dict = None) -> int:
+    pipeline = values_pipeline(field, filter) + [{"$group": {"_id": "$v"}}, {"$count": "n"}]
+    result = next(coll.aggregate(pipeline), None)
+    return result["n"] if result else 0
+
+def gee_estimate(frequencies: dict[int, int], sampled: int, population: int) -> float:
+    """Guaranteed-Error Estimator of the number of distinct values in a population.
+
+    frequencies maps j to the number of values seen exactly j times in a
+    uniform sample of sampled values out of population. Values seen once
+    stand in for the unseen ones, scaled by sqrt(population / sampled); the
+    estimate is within a factor of that square root of the truth in
+    expectation (Charikar et al., 2000).
+    """
+    if not sampled:
+        return 0.0
+    seen_more = sum(count for times, count in frequencies.items() if times > 1)
+    singletons = frequencies.get(1, 0)
+    if sampled >= population:
+        return float(singletons + seen_more)
+    return math.sqrt(population / sampled) * singletons + seen_more
+
+def approximate_distinct_count(coll, field: str, filter: dict, sample_size: int, total: int = None) -> dict:
+    """Estimate the number of distinct values of field from a random sample of the collection.
+
+    The sample is drawn once; a $facet counts it and reduces its values to
+    a frequency-of-frequencies table, so only a few numbers come back.
+    """
+    total = coll.estimated_document_count() if total is None else total
+    pipeline = [
+        {"$sample": {"size": sample_size}},
+        {"$facet": {
+            "sampled": [{"$count": "n"}],
+            "frequencies": values_pipeline(field, filter) + [
+                {"$group": {"_id": "$v", "times": {"$sum": 1}}},
+                {"$group": {"_id": "$times", "values": {"$sum": 1}}},
+            ],
+        }},
+    ]
+    result = next(coll.aggregate(pipeline), {})
+    sampled_docs = (result.get("sampled") or [{"n": 0}])[0]["n"]
+    frequencies = {row["_id"]: row["values"] for row in result.get("frequencies") or []}
+    sampled_values = sum(times * count for times, count in frequencies.items())
+    seen = sum(frequencies.values())
+    # Values per document in the sample, scaled up to the collection
+    population = round(sampled_values * total / sampled_docs) if sampled_docs else 0
+    estimate = gee_estimate(frequencies, sampled_values, population)
+    response = {
+        "estimate": max(seen, round(estimate)),
+        "lower_bound": seen,
+        "sampled_documents": sampled_docs,
+        "sampled_values": sampled_values,
+        "collection_size": total,
+    }
+    if sampled_values and sampled_values < population:
+        response["max_ratio_error"] = round(math.sqrt(population / sampled_values), 2)
+    return response
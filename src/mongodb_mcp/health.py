@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.metrics import circuit_open
+
+logger = get_logger("health")
+
+CLOSED = "closed"
+OPEN = "open"
+
+def get_failure_threshold() -> int:
+    return int(os.getenv("CIRCUIT_BREAKER_FAILURES", "2"))
+
+def get_probe_interval() -> float:
+    return float(os.getenv("CIRCUIT_BREAKER_PROBE_SECONDS", "5"))
+
+def get_probe_timeout_ms() -> int:
+    return int(os.getenv("HEALTH_PROBE_TIMEOUT_MS", "2000"))
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of waiting for server selection while a connection's circuit is open."""
+    pass
+
+class ConnectionHealth:
+    """Topology and health of one named connection, as reported by the driver.
+
+    PyMongo's monitor threads already heartbeat every server; their events
+    keep this state current without extra round trips. The circuit opens
+    once CIRCUIT_BREAKER_FAILURES heartbeats in a row have failed and no
+    server is readable, and closes on the next successful heartbeat or probe.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.client = None
+        self.topology_type = "Unknown"
+        self.servers: dict[str, dict] = {}
+        self.readable = False
+        self.writable = False
+        self.consecutive_failures = 0
+        self.last_heartbeat = None
+        self.last_error = None
+        self.breaker = CLOSED
+        self.opened_at = None
+        self.last_probe = None
+        self._lock = threading.Lock()
+
+    def heartbeat_succeeded(self, address: str, duration: float):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.last_heartbeat = time.time()
+            self.servers.setdefault(address, {})["rtt_ms"] = round(duration * 1000, 2)
+        self._close(f"heartbeat from {address} succeeded")
+
+    def heartbeat_failed(self, address: str, error: Exception):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_heartbeat = time.time()
+            self.last_error = str(error)
+            self.servers.setdefault(address, {})["error"] = self.last_error
+        self._evaluate()
+
+    def topology_changed(self, description):
+        servers = {}
+        for (host, port), server in description.server_descriptions().items():
+            address = f"{host}:{port}"
+            servers[address] = {"type": server.server_type_name}
+            if server.round_trip_time is not None:
+                servers[address]["rtt_ms"] = round(server.round_trip_time * 1000, 2)
+            if server.error is not None:
+                servers[address]["error"] = str(server.error)
+        with self._lock:
+            self.topology_type = description.topology_type_name
+            self.servers = servers
+            self.readable = description.has_readable_server()
+            self.writable = description.has_writable_server()
+        if self.readable:
+            self._close("a server became readable")
+        else:
+            self._evaluate()
+
+    def _evaluate(self):
+        with self._lock:
+            if self.breaker == OPEN or self.readable or self.consecutive_failures < get_failure_threshold():
+                return
+            self.breaker = OPEN
+            self.opened_at = time.time()
+        circuit_open.set(self.name, value=1)
+        logger.warning("Circuit for '%s' opened: no reachable server (%s)", self.name, self.last_error)
+
+    def _close(self, reason: str):
+        with self._lock:
+            if self.breaker == CLOSED:
+                return
+            self.breaker = CLOSED
+            self.consecutive_failures = 0
+            down_for = time.time() - self.opened_at
+        circuit_open.set(self.name, value=0)
+        logger.info("Circuit for '%s' closed after %.1fs: %s", self.name, down_for, reason)
+
+    def probe(self):
+        """Ping the cluster with a short deadline; close the circuit if it answers."""
+        import pymongo
+
+        self.last_probe = time.time()
+        try:
+            with pymongo.timeout(get_probe_timeout_ms() / 1000):
+                self.client.admin.command("ping")
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+            logger.debug("Probe of '%s' failed: %s", self.name, e)
+            return
+        self._close("probe succeeded")
+
+    def check(self):
+        """Raise CircuitOpenError if the circuit is open."""
+        if self.breaker != OPEN:
+            return
+        retry_in = max(0.0, (self.last_probe or self.opened_at) + get_probe_interval() - time.time())
+        raise CircuitOpenError(
+            f"Connection '{self.name}' is unavailable (no reachable server for "
+            f"{time.time() - self.opened_at:.0f}s, last error: {self.last_error}). "
+            f"Retrying in {retry_in:.0f}s."
+        )
+
+    def to_dict(self) -> dict:
+        now = time.time()
+        with self._lock:
+            status = "healthy" if self.writable else "degraded" if self.readable else "unreachable"
+            if self.last_heartbeat is None and not self.readable:
+                status = "unknown"
+            result = {
+                "connection": self.name,
+                "status": status,
+                "circuit": self.breaker,
+                "topology": self.topology_type,
+                "servers": dict(self.servers),
+            }
+            if self.last_heartbeat is not None:
+                result["last_heartbeat_age_s"] = round(now - self.last_heartbeat, 1)
+            if self.breaker == OPEN:
+                result["open_for_s"] = round(now - self.opened_at, 1)
+            if self.last_error and status != "healthy":
+                result["last_error"] = self.last_error
+        return result
+
+class HealthMonitor:
+    """Health of every open connection, plus a thread probing open circuits."""
+
+    def __init__(self):
+        self._connections: dict[str, ConnectionHealth] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def register(self, health: ConnectionHealth, client):
+        health.client = client
+        with self._lock:
+            self._connections[health.name] = health
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mongodb-mcp-health", daemon=True)
+                self._thread.start()
+
+    def forget(self, name: str):
+        with self._lock:
+            health = self._connections.pop(name, None)
+        if health is not None:
+            circuit_open.set(name, value=0)
+
+    def get(self, name: str) -> ConnectionHealth | None:
+        return self._connections.get(name)
+
+    def check(self, name: str):
+        health = self._connections.get(name)
+        if health is not None:
+            health.check()
+
+    def _run(self):
+        while not self._stop_event.wait(get_probe_interval()):
+            with self._lock:
+                tripped = [health for health in self._connections.values() if health.breaker == OPEN]
+            for health in tripped:
+                health.probe()
+
+    def stop(self):
+        self._stop_event.set()
+
+health_monitor = HealthMonitor()
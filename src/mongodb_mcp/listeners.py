@@ -0,0 +1,106 @@
+import threading
+import time
+from pymongo import monitoring
+from mongodb_mcp import operations
+from mongodb_mcp.health import ConnectionHealth
+from mongodb_mcp.metrics import (
+    Gauge, checkout_failures, checkout_wait, command_failures, command_latency, pool_in_use, pool_size
+)
+
+class DriverListener(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Feeds PyMongo command and pool events for one named connection into the registry.
+
+    Commands run on behalf of a tool call are also reported to the call's
+    operation, so they can be killed if the call is cancelled.
+    """
+
+    def __init__(self, connection: str):
+        self.connection = connection
+        self._checkout_started = threading.local()
+
+    def started(self, event):
+        operation = operations.current()
+        if operation is not None:
+            operation.command_started(self.connection, event)
+
+    def succeeded(self, event):
+        command_latency.observe(self.connection, event.command_name, value=event.duration_micros / 1e6)
+        operation = operations.current()
+        if operation is not None:
+            operation.command_finished(self.connection, event, event.reply)
+
+    def failed(self, event):
+        command_latency.observe(self.connection, event.command_name, value=event.duration_micros / 1e6)
+        command_failures.inc(self.connection, event.command_name)
+        operation = operations.current()
+        if operation is not None:
+            operation.command_finished(self.connection, event)
+
+    def _adjust(self, gauge: Gauge, address, delta: int):
+        gauge.inc(self.connection, f"{address[0]}:{address[1]}", amount=delta)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        key = (self.connection, f"{event.address[0]}:{event.address[1]}")
+        pool_size.set(*key, value=0)
+        pool_in_use.set(*key, value=0)
+
+    def connection_created(self, event):
+        self._adjust(pool_size, event.address, 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._adjust(pool_size, event.address, -1)
+
+    def connection_check_out_started(self, event):
+        self._checkout_started.value = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        checkout_failures.inc(self.connection, str(event.reason))
+
+    def connection_checked_out(self, event):
+        # PyMongo 4.7+ reports the wait itself; older versions need the start event
+        duration = getattr(event, "duration", None)
+        if duration is None:
+            started = getattr(self._checkout_started, "value", None)
+            duration = time.perf_counter() - started if started else None
+        if duration is not None:
+            checkout_wait.observe(self.connection, value=duration)
+        self._adjust(pool_in_use, event.address, 1)
+
+    def connection_checked_in(self, event):
+        self._adjust(pool_in_use, event.address, -1)
+
+class HealthListener(monitoring.ServerHeartbeatListener, monitoring.TopologyListener):
+    """Feeds heartbeat and topology events for one connection into its ConnectionHealth."""
+
+    def __init__(self, health: ConnectionHealth):
+        self.health = health
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.health.heartbeat_succeeded(f"{event.connection_id[0]}:{event.connection_id[1]}", event.duration)
+
+    def failed(self, event):
+        self.health.heartbeat_failed(f"{event.connection_id[0]}:{event.connection_id[1]}", event.reply)
+
+    def opened(self, event):
+        pass
+
+    def description_changed(self, event):
+        self.health.topology_changed(event.new_description)
+
+    def closed(self, event):
+        pass
@@ -1,38 +1,175 @@
+import atexit
+import contextvars
+import datetime
+import functools
+import json
 import logging
-import sys
+import logging.handlers
 import os
+import queue
+import random
+import secrets
+import sys
+
+# Set for the duration of each tool call and copied into worker threads with the context
+request_id: contextvars.ContextVar = contextvars.ContextVar("mongodb_mcp_request_id", default=None)
+tool_name: contextvars.ContextVar = contextvars.ContextVar("mongodb_mcp_tool", default=None)
+
+# Record attributes the JSON formatter emits when set, either from the
+# context or passed as extra={...} at the call site
+STRUCTURED_FIELDS = ("tool", "request_id", "namespace", "duration_ms", "docs", "status")
+
+_listener = None
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the current tool and request id, and samples routine ones.
+
+    Runs in the thread that logs, where the context is still available.
+    INFO and DEBUG records pass with probability sample_rate; warnings and
+    errors always pass.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.INFO and self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        if getattr(record, "tool", None) is None:
+            record.tool = tool_name.get()
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id.get()
+        return True
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for the writer thread without formatting them first.
+
+    The stock QueueHandler renders the message in the calling thread; here
+    the message and any traceback are rendered by the writer, so a tool only
+    pays for creating the record. Log arguments must therefore not be mutated
+    after the call. When the queue is full, records are dropped and counted
+    rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _WriterListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def _stop_listener():
+    """Flush the queue at exit, then report records dropped while it was full."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    handler = next((h for h in logging.getLogger("mongodb_mcp").handlers if isinstance(h, DeferredQueueHandler)), None)
+    if handler is not None and handler.dropped:
+        # The writer thread is gone, so the record goes straight to its handlers
+        record = logging.getLogger("mongodb_mcp.logging").makeRecord(
+            "mongodb_mcp.logging", logging.WARNING, __file__, 0,
+            "%s log records dropped (log queue full)", (handler.dropped,), None
+        )
+        for target in listener.handlers:
+            target.handle(record)
 
 def setup_logging():
     """Configure logging for the MCP server.
-    
+
     MCP servers MUST NOT write to stdout (reserved for protocol).
     All logs go to stderr.
+
+    Records are put on a bounded queue and written by a background thread
+    (LOG_ASYNC=false writes inline instead), as text or, with LOG_FORMAT=json,
+    one JSON object per line. LOG_SAMPLE_RATE keeps only a share of INFO and
+    DEBUG records.
+
+    Called from server startup rather than at import, so importing the package
+    has no side effects. Calling it again does not add a second handler.
     """
+    global _listener
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    
-    # Create stderr handler
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setFormatter(formatter)
-    
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level, logging.INFO))
-    root_logger.addHandler(handler)
-    
+
     # Create a specific logger for our app
     logger = logging.getLogger("mongodb_mcp")
     logger.setLevel(getattr(logging, log_level, logging.INFO))
-    
+    if any(getattr(h, "_mongodb_mcp", False) for h in logger.handlers):
+        return logger
+
+    # Create formatter
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+
+    # Create stderr handler
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    if os.getenv("LOG_ASYNC", "true").lower() == "true":
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        handler = DeferredQueueHandler(log_queue)
+        _listener = _WriterListener(log_queue, stream_handler)
+        _listener.start()
+        atexit.register(_stop_listener)
+    else:
+        handler = stream_handler
+    handler.addFilter(ContextFilter(float(os.getenv("LOG_SAMPLE_RATE", "1.0"))))
+    handler._mongodb_mcp = True
+
+    # Our records go to our handler only; FastMCP installs its own on the root logger
+    logger.addHandler(handler)
+    logger.propagate = False
+
     return logger
 
-# Initialize logger
-logger = setup_logging()
+def log_context(name: str, func):
+    """Wrap an async tool so its log records carry the tool name and a per-call request id."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        tool_token = tool_name.set(name)
+        request_token = request_id.set(secrets.token_hex(4))
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            request_id.reset(request_token)
+            tool_name.reset(tool_token)
+    return wrapper
 
 def get_logger(name: str = None) -> logging.Logger:
     """Get a logger instance."""
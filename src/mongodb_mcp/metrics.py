@@ -0,0 +1,205 @@
+import bisect
+import functools
+import threading
+import time
+from mongodb_mcp.logging_config import get_logger
+
+logger = get_logger("calls")
+
+# Upper bounds in seconds; chosen to separate cache hits, indexed reads and scans
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape_label_value(value) -> str:
+    """Escape a label value as the Prometheus text format requires."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter with label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def values(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in sorted(self.values().items())]
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, *label_values, value: float):
+        with self._lock:
+            self._values[label_values] = value
+
+class _HistogramSeries:
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+class Histogram:
+    """Fixed-bucket histogram with label values and quantile estimates."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *label_values, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def _snapshot(self) -> dict[tuple, tuple[list[int], float, int]]:
+        with self._lock:
+            return {key: (list(s.counts), s.sum, s.count) for key, s in self._series.items()}
+
+    def _quantile(self, counts: list[int], total: int, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self) -> dict[tuple, dict]:
+        result = {}
+        for key, (counts, total_sum, total) in self._snapshot().items():
+            result[key] = {
+                "count": total,
+                "mean_ms": round(total_sum / total * 1000, 3) if total else 0,
+                "p50_ms": round(self._quantile(counts, total, 0.50) * 1000, 3),
+                "p95_ms": round(self._quantile(counts, total, 0.95) * 1000, 3),
+                "p99_ms": round(self._quantile(counts, total, 0.99) * 1000, 3),
+            }
+        return result
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, (counts, total_sum, total) in sorted(self._snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {total}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total_sum}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {total}")
+        return lines
+
+tool_latency = Histogram("mcp_tool_duration_seconds", "Tool call latency, including time queued for a worker", ("tool",))
+tool_calls = Counter("mcp_tool_calls_total", "Tool calls by outcome", ("tool", "status"))
+tool_response_bytes = Counter("mcp_tool_response_bytes_total", "Bytes returned by tools", ("tool",))
+command_latency = Histogram("mongodb_command_duration_seconds", "Driver-reported command round trip time", ("connection", "command"))
+command_failures = Counter("mongodb_command_failures_total", "Failed commands", ("connection", "command"))
+checkout_wait = Histogram("mongodb_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("connection",))
+checkout_failures = Counter("mongodb_pool_checkout_failures_total", "Failed connection checkouts", ("connection", "reason"))
+pool_size = Gauge("mongodb_pool_connections", "Open pooled connections", ("connection", "address"))
+pool_in_use = Gauge("mongodb_pool_checked_out", "Pooled connections currently checked out", ("connection", "address"))
+admission_rejections = Counter("mcp_admission_rejections_total", "HTTP requests rejected by admission control", ("client", "reason"))
+admission_in_flight = Gauge("mcp_admission_in_flight", "Admitted tool calls in flight", ("client",))
+circuit_open = Gauge("mongodb_circuit_open", "1 while a connection's circuit breaker is open", ("connection",))
+catalog_lookups = Counter("mcp_catalog_lookups_total", "Metadata catalog lookups by kind and result (fresh, stale, miss)", ("kind", "result"))
+
+REGISTRY = (
+    tool_latency, tool_calls, tool_response_bytes, command_latency, command_failures,
+    checkout_wait, checkout_failures, pool_size, pool_in_use,
+    admission_rejections, admission_in_flight, circuit_open, catalog_lookups,
+)
+
+def is_error(result) -> bool:
+    # Tools report failures as "Error: ..." strings rather than raising
+    return isinstance(result, str) and result.startswith(("Error:", "Failed"))
+
+def instrument(tool_name: str, func):
+    """Wrap an async tool function to record latency, outcome and response size, and log the call at DEBUG."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = await func(*args, **kwargs)
+            status = "error" if is_error(result) else "ok"
+            if isinstance(result, str):
+                tool_response_bytes.inc(tool_name, amount=len(result.encode()))
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            tool_latency.observe(tool_name, value=elapsed)
+            tool_calls.inc(tool_name, status)
+            logger.debug(
+                "%s finished (%s) in %.1fms", tool_name, status, elapsed * 1000,
+                extra={"duration_ms": round(elapsed * 1000, 2), "status": status}
+            )
+    return wrapper
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def snapshot() -> dict:
+    """Metrics summarised as a JSON-friendly dict for the server_metrics tool."""
+    calls = tool_calls.values()
+    response_bytes = tool_response_bytes.values()
+    tools = {}
+    for (tool,), latency in tool_latency.summary().items():
+        tools[tool] = {
+            **latency,
+            "errors": calls.get((tool, "error"), 0),
+            "response_bytes": response_bytes.get((tool,), 0),
+        }
+
+    failures = command_failures.values()
+    commands = {}
+    for (connection, command), latency in command_latency.summary().items():
+        commands.setdefault(connection, {})[command] = {**latency, "failures": failures.get((connection, command), 0)}
+
+    pools = {}
+    in_use = pool_in_use.values()
+    for (connection, address), size in pool_size.values().items():
+        pools.setdefault(connection, {})[address] = {"connections": size, "checked_out": in_use.get((connection, address), 0)}
+    for (connection,), wait in checkout_wait.summary().items():
+        pools.setdefault(connection, {})["checkout_wait"] = wait
+
+    circuits = {connection: "open" if value else "closed" for (connection,), value in circuit_open.values().items()}
+    return {"tools": tools, "commands": commands, "pools": pools, "circuits": circuits}
@@ -0,0 +1,183 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from mongodb_mcp import executor
+from mongodb_mcp.connection import get_client
+from mongodb_mcp.logging_config import get_logger
+
+logger = get_logger("operations")
+
+# Tools that stream for as long as the data takes; TOOL_MAX_TIME_MS can still limit them
+DEFAULT_TOOL_LIMITS = {"export_collection": 0, "import_collection": 0}
+
+_current: contextvars.ContextVar = contextvars.ContextVar("mongodb_mcp_operation", default=None)
+# Limit for blocking work started from this context, applied once the work runs
+_limit_ms: contextvars.ContextVar = contextvars.ContextVar("mongodb_mcp_time_limit_ms", default=0)
+
+def get_time_limit_ms(tool_name: str, requested: int = None) -> int:
+    """Time limit for one call of a tool in milliseconds, 0 for none.
+
+    Per-tool limits come from TOOL_MAX_TIME_MS (e.g. "aggregate=120000,distinct=10000"),
+    everything else falls back to MAX_TIME_MS. A limit requested by the caller
+    can only lower it.
+    """
+    limits = {**DEFAULT_TOOL_LIMITS, **executor._parse_limits(os.getenv("TOOL_MAX_TIME_MS", ""))}
+    limit = limits.get(tool_name, int(os.getenv("MAX_TIME_MS", "60000")))
+    if requested and requested > 0:
+        limit = min(limit, requested) if limit else requested
+    return limit
+
+@contextmanager
+def time_limit(milliseconds: int):
+    """Bound every driver operation in the block, server selection included.
+
+    Uses PyMongo's client-side operation timeout: each command is sent with
+    maxTimeMS set to the time remaining, and socket reads give up at the
+    deadline. Nested limits keep the earliest deadline. The driver is only
+    imported when a limit applies.
+    """
+    if not milliseconds:
+        yield
+        return
+    import pymongo
+    with pymongo.timeout(milliseconds / 1000):
+        yield
+
+@contextmanager
+def deferred_time_limit(milliseconds: int):
+    """Time limit for blocking work started in the block, counted from when the work runs.
+
+    Functions wrapped with bounded apply it in the worker thread, so time
+    spent waiting for a concurrency slot or a free worker doesn't use up
+    the server's maxTimeMS. Nested limits keep the lower one.
+    """
+    current = _limit_ms.get()
+    if current and milliseconds:
+        milliseconds = min(current, milliseconds)
+    token = _limit_ms.set(milliseconds or current)
+    try:
+        yield
+    finally:
+        _limit_ms.reset(token)
+
+def bounded(func):
+    """Wrap a blocking function to run under the deferred time limit of its context."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with time_limit(_limit_ms.get()):
+            return func(*args, **kwargs)
+    return wrapper
+
+class Operation:
+    """The server-side work started by one tool call.
+
+    The driver listener reports commands and cursors opened while a call's
+    context is active. If the call is cancelled, commands still running are
+    killed (killOp) and cursors left open are closed (killCursors).
+    """
+
+    def __init__(self, tool_name: str):
+        self.tool_name = tool_name
+        self._running: dict[tuple, tuple] = {}
+        self._cursors: dict[tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def command_started(self, connection: str, event):
+        command = event.command
+        if event.command_name == "killCursors":
+            with self._lock:
+                for cursor_id in command.get("cursors", []):
+                    self._cursors.pop((connection, cursor_id), None)
+            return
+        cursor_id = command.get("getMore") if event.command_name == "getMore" else None
+        with self._lock:
+            self._running[(connection, event.request_id)] = (command.get("lsid"), cursor_id)
+
+    def command_finished(self, connection: str, event, reply: dict = None):
+        with self._lock:
+            started = self._running.pop((connection, event.request_id), None)
+            cursor = (reply or {}).get("cursor")
+            if not isinstance(cursor, dict):
+                return
+            if cursor.get("id"):
+                self._cursors[(connection, cursor["id"])] = cursor.get("ns", "")
+            elif started and started[1] is not None:
+                # getMore returned the last batch
+                self._cursors.pop((connection, started[1]), None)
+
+    def kill(self) -> tuple[int, int]:
+        """Kill the call's running commands and open cursors. Returns how many of each."""
+        with self._lock:
+            running = list(self._running.items())
+            cursors = list(self._cursors.items())
+            self._running.clear()
+            self._cursors.clear()
+
+        killed_ops = 0
+        for (connection, _), (lsid, _) in running:
+            client = get_client(connection)
+            if client is None or lsid is None:
+                continue
+            try:
+                # The session is still busy with this call's command, so any
+                # operation on it belongs to the call
+                in_progress = client.admin.aggregate([
+                    {"$currentOp": {}},
+                    {"$match": {"lsid.id": lsid["id"]}},
+                    {"$project": {"opid": 1}},
+                ])
+                for op in in_progress:
+                    client.admin.command("killOp", op=op["opid"])
+                    killed_ops += 1
+            except Exception as e:
+                logger.warning("killOp for cancelled %s on '%s' failed: %s", self.tool_name, connection, e)
+
+        killed_cursors = 0
+        for (connection, cursor_id), namespace in cursors:
+            client = get_client(connection)
+            if client is None or "." not in namespace:
+                continue
+            database, collection = namespace.split(".", 1)
+            try:
+                client[database].command("killCursors", collection, cursors=[cursor_id])
+                killed_cursors += 1
+            except Exception as e:
+                logger.warning("killCursors for cancelled %s on '%s' failed: %s", self.tool_name, namespace, e)
+        return killed_ops, killed_cursors
+
+def current() -> Operation | None:
+    """The operation of the tool call running in this context, if any."""
+    return _current.get()
+
+def _kill(operation: Operation):
+    killed_ops, killed_cursors = operation.kill()
+    if killed_ops or killed_cursors:
+        logger.info(
+            "Cancelled %s: killed %s operations and %s cursors", operation.tool_name, killed_ops, killed_cursors
+        )
+
+def tracked(tool_name: str, func):
+    """Wrap an async tool so its driver work is time-limited and killed on cancellation.
+
+    The limit and the operation are set in the caller's context, which
+    executor.run_blocking copies into the worker thread; the limit's
+    deadline starts there, in functions wrapped with bounded. A max_time_ms
+    argument, if the tool has one, lowers the limit for that call.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        operation = Operation(tool_name)
+        token = _current.set(operation)
+        try:
+            with deferred_time_limit(get_time_limit_ms(tool_name, kwargs.get("max_time_ms"))):
+                return await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # The worker thread keeps running; stop its work on the server
+            executor.get_executor().submit(_kill, operation)
+            raise
+        finally:
+            _current.reset(token)
+    return wrapper
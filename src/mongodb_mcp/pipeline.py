@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+
+WRITE_STAGES = {"$out", "$merge"}
+
+# Stages whose output is non-deterministic or reflects server state
+VOLATILE_STAGES = {
+    "$sample", "$currentOp", "$collStats", "$indexStats", "$listSessions",
+    "$listLocalSessions", "$planCacheStats", "$changeStream",
+}
+
+@dataclass
+class PipelineAnalysis:
+    """Structural facts about an aggregation pipeline."""
+    write_stages: list[str] = field(default_factory=list)
+    reads: set[str] = field(default_factory=set)
+    writes: set[str] = field(default_factory=set)
+    volatile: bool = False
+
+    @property
+    def cacheable(self) -> bool:
+        return not self.write_stages and not self.volatile
+
+def _write_target(database: str, name: str, spec) -> str | None:
+    """Namespace written by a $out or $merge stage."""
+    if name == "$merge" and isinstance(spec, dict):
+        spec = spec.get("into")
+    if isinstance(spec, str):
+        return f"{database}.{spec}"
+    if isinstance(spec, dict) and "coll" in spec:
+        return f"{spec.get('db', database)}.{spec['coll']}"
+    return None
+
+def analyze_pipeline(database: str, collection: str, pipeline: list) -> PipelineAnalysis:
+    """Walk a pipeline, including $facet, $lookup and $unionWith sub-pipelines.
+
+    Only stage names are inspected, so string values that happen to contain
+    "$out" or "$merge" are not mistaken for write stages.
+    """
+    analysis = PipelineAnalysis(reads={f"{database}.{collection}"})
+    pending = [("", pipeline)]
+    while pending:
+        prefix, stages = pending.pop()
+        for index, stage in enumerate(stages):
+            if not isinstance(stage, dict):
+                continue
+            for name, spec in stage.items():
+                location = f"{prefix}[{index}].{name}"
+                if name in WRITE_STAGES:
+                    analysis.write_stages.append(location)
+                    target = _write_target(database, name, spec)
+                    if target:
+                        analysis.writes.add(target)
+                elif name in VOLATILE_STAGES:
+                    analysis.volatile = True
+                elif name in ("$lookup", "$graphLookup") and isinstance(spec, dict):
+                    if "from" in spec:
+                        analysis.reads.add(f"{database}.{spec['from']}")
+                    if isinstance(spec.get("pipeline"), list):
+                        pending.append((f"{location}.pipeline", spec["pipeline"]))
+                elif name == "$unionWith":
+                    if isinstance(spec, str):
+                        analysis.reads.add(f"{database}.{spec}")
+                    elif isinstance(spec, dict):
+                        if "coll" in spec:
+                            analysis.reads.add(f"{database}.{spec['coll']}")
+                        if isinstance(spec.get("pipeline"), list):
+                            pending.append((f"{location}.pipeline", spec["pipeline"]))
+                elif name == "$facet" and isinstance(spec, dict):
+                    for facet_name, sub_pipeline in spec.items():
+                        if isinstance(sub_pipeline, list):
+                            pending.append((f"{location}.{facet_name}", sub_pipeline))
+    return analysis
+
+def limit_pipeline(pipeline: list, max_docs: int) -> tuple[list, int, list[str]]:
+    """Push the result cap to the server.
+
+    Returns the rewritten pipeline, the batch size to request and a list of
+    human-readable rewrites. The limit is one above the cap so the caller can
+    tell whether results were truncated. Pipelines ending in $out or $merge are
+    left alone, since a write stage must be last.
+    """
+    cap = max_docs + 1
+    if pipeline and isinstance(pipeline[-1], dict) and WRITE_STAGES & pipeline[-1].keys():
+        return pipeline, max_docs, []
+
+    last = pipeline[-1] if pipeline else None
+    if isinstance(last, dict) and list(last) == ["$limit"] and isinstance(last["$limit"], int):
+        if last["$limit"] <= cap:
+            return pipeline, last["$limit"], [f"set batchSize {last['$limit']}"]
+        rewritten = pipeline[:-1] + [{"$limit": cap}]
+        return rewritten, cap, [f"tightened trailing $limit from {last['$limit']} to {cap}", f"set batchSize {cap}"]
+
+    return pipeline + [{"$limit": cap}], cap, [f"appended $limit {cap}", f"set batchSize {cap}"]
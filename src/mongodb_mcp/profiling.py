@@ -0,0 +1,253 @@
+import datetime
+import math
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from bson import Decimal128, Int64
+from mongodb_mcp.connection import resolve_name
+from mongodb_mcp.schema import DEFAULT_MAX_DEPTH, _example, bson_type, iter_fields
+from mongodb_mcp.sketches import HyperLogLog, KLLSketch, SpaceSaving
+from mongodb_mcp.writes import WriteLog
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Values buffered per column before they are reduced as one batch
+CHUNK_SIZE = 1024
+
+_NUMERIC = (int, float, Int64, Decimal128)
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+def get_sample_size() -> int:
+    return int(os.getenv("PROFILE_SAMPLE_SIZE", "10000"))
+
+def _to_datetime(milliseconds: float) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(milliseconds=milliseconds)
+
+def _from_datetime(value: datetime.datetime) -> float:
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return (value - _EPOCH) / datetime.timedelta(milliseconds=1)
+
+class _Column:
+    """Numbers (or dates as epoch milliseconds) of one path, reduced a chunk at a time.
+
+    Values are appended to a flat double array; every CHUNK_SIZE values the
+    chunk's min, max and sum are taken with the C builtins and the chunk is
+    fed to the quantile sketch in one call.
+    """
+
+    def __init__(self, k: int):
+        self.buffer = array("d")
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.total = 0.0
+        self.sketch = KLLSketch(k)
+
+    def append(self, value: float):
+        self.buffer.append(value)
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        chunk = self.buffer
+        if not chunk:
+            return
+        self.buffer = array("d")
+        self.count += len(chunk)
+        self.minimum = min(self.minimum, min(chunk))
+        self.maximum = max(self.maximum, max(chunk))
+        self.total += math.fsum(chunk)
+        self.sketch.update_many(chunk)
+
+    def summary(self, convert) -> dict:
+        self.flush()
+        quantiles = self.sketch.quantiles(QUANTILES)
+        result = {
+            "min": convert(self.minimum),
+            "max": convert(self.maximum),
+            "quantiles": {f"p{round(q * 100)}": convert(value) for q, value in zip(QUANTILES, quantiles)},
+        }
+        if convert is float:
+            result["mean"] = self.total / self.count
+        return result
+
+class _FieldProfile:
+    __slots__ = ("docs", "occurrences", "types", "distinct", "top", "numbers", "dates",
+                 "min_length", "max_length", "total_length", "strings", "k")
+
+    def __init__(self, precision: int, top_capacity: int, k: int):
+        self.docs = 0
+        self.occurrences = 0
+        self.types: dict[str, int] = {}
+        self.distinct = HyperLogLog(precision)
+        self.top = SpaceSaving(top_capacity)
+        self.numbers = None
+        self.dates = None
+        self.strings = 0
+        self.min_length = None
+        self.max_length = 0
+        self.total_length = 0
+        self.k = k
+
+    def add(self, value):
+        self.occurrences += 1
+        type_name = bson_type(value)
+        self.types[type_name] = self.types.get(type_name, 0) + 1
+        if type_name in ("object", "array", "null") or (type_name == "double" and math.isnan(value)):
+            return
+        self.distinct.add(value)
+        if type_name not in ("binData", "javascript"):
+            try:
+                self.top.add((type_name, value), value)
+            except TypeError:
+                pass
+        if isinstance(value, _NUMERIC) and not isinstance(value, bool):
+            number = float(value.to_decimal()) if isinstance(value, Decimal128) else float(value)
+            if math.isnan(number):
+                return
+            if self.numbers is None:
+                self.numbers = _Column(self.k)
+            self.numbers.append(number)
+        elif isinstance(value, datetime.datetime):
+            if self.dates is None:
+                self.dates = _Column(self.k)
+            self.dates.append(_from_datetime(value))
+        elif isinstance(value, str):
+            length = len(value)
+            self.strings += 1
+            self.min_length = length if self.min_length is None else min(self.min_length, length)
+            self.max_length = max(self.max_length, length)
+            self.total_length += length
+
+    def summary(self, doc_count: int, top_n: int) -> dict:
+        result = {
+            "types": dict(sorted(self.types.items(), key=lambda item: -item[1])),
+            "presence": round(self.docs / doc_count, 4),
+            "null_ratio": round(self.types.get("null", 0) / self.occurrences, 4),
+        }
+        if self.top.counters:
+            result["distinct_estimate"] = max(self.distinct.estimate(), len(self.top.counters))
+            # After evictions, only values guaranteed to repeat are worth reporting
+            top = [entry for entry in self.top.top(top_n) if not self.top.evicted or entry[1] - entry[2] > 1]
+            if top:
+                result["top_values"] = [
+                    {"value": _example(value), "count": count, **({"max_error": error} if error else {})}
+                    for value, count, error in top
+                ]
+            if not self.top.evicted:
+                result["top_values_exact"] = True
+        if self.numbers is not None:
+            result["numeric"] = self.numbers.summary(float)
+        if self.dates is not None:
+            result["date"] = self.dates.summary(_to_datetime)
+        if self.strings:
+            result["string_length"] = {
+                "min": self.min_length,
+                "max": self.max_length,
+                "avg": round(self.total_length / self.strings, 2),
+            }
+        return result
+
+class CollectionProfile:
+    """Value distributions per field path, built from streamed documents in bounded memory.
+
+    Each path keeps a HyperLogLog for distinct counts, a Space-Saving
+    summary for top values and KLL sketches for numeric and date
+    quantiles, so memory depends on the number of paths, not documents.
+    """
+
+    def __init__(self, max_paths: int = 200, max_depth: int = DEFAULT_MAX_DEPTH, fields: list[str] = None,
+                 precision: int = 11, top_capacity: int = 64, k: int = 200):
+        self.max_paths = max_paths
+        self.max_depth = max_depth
+        self.fields = tuple(fields) if fields else None
+        self.precision = precision
+        self.top_capacity = top_capacity
+        self.k = k
+        self.doc_count = 0
+        self.paths_truncated = False
+        self._paths: dict[str, _FieldProfile] = {}
+
+    def _wanted(self, path: str) -> bool:
+        return self.fields is None or any(
+            path == field or path.startswith((f"{field}.", f"{field}[]")) for field in self.fields
+        )
+
+    def add(self, document: dict):
+        self.doc_count += 1
+        seen = set()
+        for path, value in iter_fields(document, self.max_depth):
+            profile = self._paths.get(path)
+            if profile is None:
+                if not self._wanted(path):
+                    continue
+                if len(self._paths) >= self.max_paths:
+                    self.paths_truncated = True
+                    continue
+                profile = self._paths[path] = _FieldProfile(self.precision, self.top_capacity, self.k)
+            profile.add(value)
+            if path not in seen:
+                seen.add(path)
+                profile.docs += 1
+
+    def summary(self, top_n: int = 5) -> dict:
+        return {
+            path: self._paths[path].summary(self.doc_count, top_n)
+            for path in sorted(self._paths)
+        }
+
+class ProfileCache:
+    """Finished profile responses per collection, kept for a TTL and evicted least recently used.
+
+    Keys start with (connection, database, collection). Writes drop the
+    profiles of the collections they touch, and a profile sampled while
+    one of those writes happened is not stored: callers take write_seq()
+    before sampling and pass it to put.
+    """
+
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 100):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        # Last write per (connection,), (connection, db) and (connection, db, coll)
+        self._writes = WriteLog()
+        self._lock = threading.Lock()
+
+    def write_seq(self) -> int:
+        return self._writes.seq
+
+    def get(self, key: tuple) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, profile: dict, seq: int):
+        with self._lock:
+            if self._writes.written_since(seq, (key[:1], key[:2], key[:3])):
+                return
+            self._entries[key] = (time.monotonic(), profile)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, database: str = None, collection: str = None, connection: str = None):
+        """Drop profiles of a collection, a database, or everything for the connection."""
+        scope = tuple(part for part in (resolve_name(connection), database, collection) if part is not None)
+        with self._lock:
+            self._writes.record(scope)
+            for key in [key for key in self._entries if key[:len(scope)] == scope]:
+                del self._entries[key]
+
+profile_cache = ProfileCache(
+    ttl_seconds=float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "600")),
+    max_entries=int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "100"))
+)
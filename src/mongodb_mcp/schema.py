@@ -0,0 +1,225 @@
+import datetime
+import os
+import re
+import threading
+import time
+import uuid
+from bson import (
+    Binary, Code, DBRef, Decimal128, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp
+)
+
+DEFAULT_MAX_DEPTH = 8
+MAX_ARRAY_ITEMS = 100
+MAX_EXAMPLES = 3
+MAX_EXAMPLE_LENGTH = 80
+
+_BSON_TYPES = {
+    bool: "bool",
+    Int64: "long",
+    float: "double",
+    str: "string",
+    dict: "object",
+    list: "array",
+    type(None): "null",
+    ObjectId: "objectId",
+    datetime.datetime: "date",
+    Decimal128: "decimal",
+    Binary: "binData",
+    bytes: "binData",
+    uuid.UUID: "binData",
+    Regex: "regex",
+    re.Pattern: "regex",
+    Timestamp: "timestamp",
+    Code: "javascript",
+    DBRef: "dbPointer",
+    MinKey: "minKey",
+    MaxKey: "maxKey",
+}
+
+def bson_type(value) -> str:
+    """BSON type alias of a decoded value (as used by $type)."""
+    value_type = type(value)
+    if value_type is int:
+        return "int" if -2**31 <= value < 2**31 else "long"
+    name = _BSON_TYPES.get(value_type)
+    if name is not None:
+        return name
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, (list, tuple)):
+        return "array"
+    return value_type.__name__
+
+def iter_fields(document: dict, max_depth: int = DEFAULT_MAX_DEPTH, max_array_items: int = MAX_ARRAY_ITEMS):
+    """Yield (path, value) for every field of a document, depth-first.
+
+    Subdocument fields are joined with ".", array elements get a "[]" suffix
+    (e.g. "items[].sku"). Only the first max_array_items elements of each
+    array are visited.
+    """
+    pending = [(None, document, 0)]
+    while pending:
+        prefix, value, depth = pending.pop()
+        if depth >= max_depth:
+            continue
+        if isinstance(value, dict):
+            children = ((key if prefix is None else f"{prefix}.{key}", child) for key, child in value.items())
+        else:
+            path = f"{prefix}[]"
+            children = ((path, child) for child in value[:max_array_items])
+        for path, child in children:
+            yield path, child
+            if isinstance(child, (dict, list)):
+                pending.append((path, child, depth + 1))
+
+def _example(value):
+    if isinstance(value, str) and len(value) > MAX_EXAMPLE_LENGTH:
+        return value[:MAX_EXAMPLE_LENGTH] + "..."
+    if isinstance(value, (dict, list, bytes, Binary)):
+        return None
+    return value
+
+class _PathStats:
+    __slots__ = ("docs", "occurrences", "types", "examples", "min_length", "max_length", "total_length")
+
+    def __init__(self):
+        self.docs = 0
+        self.occurrences = 0
+        self.types: dict[str, int] = {}
+        self.examples = []
+        self.min_length = None
+        self.max_length = 0
+        self.total_length = 0
+
+    def add(self, value):
+        self.occurrences += 1
+        type_name = bson_type(value)
+        self.types[type_name] = self.types.get(type_name, 0) + 1
+        if type_name == "array":
+            length = len(value)
+            self.min_length = length if self.min_length is None else min(self.min_length, length)
+            self.max_length = max(self.max_length, length)
+            self.total_length += length
+        elif len(self.examples) < MAX_EXAMPLES:
+            example = _example(value)
+            if example is not None and example not in self.examples:
+                self.examples.append(example)
+
+    def summary(self, doc_count: int) -> dict:
+        result = {
+            "types": dict(sorted(self.types.items(), key=lambda item: -item[1])),
+            "presence": round(self.docs / doc_count, 4),
+            "null_ratio": round(self.types.get("null", 0) / self.occurrences, 4),
+        }
+        arrays = self.types.get("array", 0)
+        if arrays:
+            result["array_length"] = {
+                "min": self.min_length,
+                "max": self.max_length,
+                "avg": round(self.total_length / arrays, 2),
+            }
+        if self.examples:
+            result["examples"] = self.examples
+        return result
+
+class SchemaAccumulator:
+    """Incrementally built, nested schema statistics.
+
+    Documents are folded in one at a time, so samples can be streamed from a
+    cursor. Per path it tracks BSON type frequencies, how many documents
+    contain the path, null ratio, array lengths and a few example values.
+    Presence is relative to all documents seen, so a nested path's missing
+    ratio includes documents where its parent is absent.
+    """
+
+    def __init__(self, max_paths: int = 500, max_depth: int = DEFAULT_MAX_DEPTH):
+        self.max_paths = max_paths
+        self.max_depth = max_depth
+        self.doc_count = 0
+        self.paths_truncated = False
+        self._paths: dict[str, _PathStats] = {}
+
+    def add(self, document: dict):
+        self.doc_count += 1
+        seen = set()
+        for path, value in iter_fields(document, self.max_depth):
+            stats = self._paths.get(path)
+            if stats is None:
+                if len(self._paths) >= self.max_paths:
+                    self.paths_truncated = True
+                    continue
+                stats = self._paths[path] = _PathStats()
+            stats.add(value)
+            if path not in seen:
+                seen.add(path)
+                stats.docs += 1
+
+    def long_arrays(self, min_length: int) -> list[str]:
+        """Array paths seen with more than min_length elements, outside other arrays."""
+        return sorted(
+            path for path, stats in self._paths.items()
+            if stats.max_length > min_length and "[]" not in path
+        )
+
+    def summary(self) -> dict:
+        return {
+            path: self._paths[path].summary(self.doc_count)
+            for path in sorted(self._paths)
+        }
+
+class _CatalogEntry:
+    def __init__(self, accumulator: SchemaAccumulator):
+        self.accumulator = accumulator
+        self.updated_at = 0.0
+        self.lock = threading.Lock()
+
+class SchemaCatalog:
+    """Per-collection schema statistics that are refreshed incrementally.
+
+    Each refresh folds a new sample into the existing statistics instead of
+    starting over, so the estimate sharpens with every call.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_paths: int = 500):
+        self.ttl_seconds = ttl_seconds
+        self.max_paths = max_paths
+        self._entries: dict[tuple, _CatalogEntry] = {}
+        self._lock = threading.Lock()
+
+    def entry(self, key: tuple) -> _CatalogEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _CatalogEntry(SchemaAccumulator(self.max_paths))
+            return entry
+
+    def is_fresh(self, entry: _CatalogEntry) -> bool:
+        return entry.accumulator.doc_count > 0 and time.monotonic() - entry.updated_at < self.ttl_seconds
+
+    def refresh(self, entry: _CatalogEntry, documents) -> int:
+        """Fold an iterable of documents into an entry. Returns how many were added.
+
+        Caller must hold entry.lock.
+        """
+        added = 0
+        for document in documents:
+            entry.accumulator.add(document)
+            added += 1
+        entry.updated_at = time.monotonic()
+        return added
+
+    def get(self, key: tuple) -> SchemaAccumulator | None:
+        """Accumulated statistics for a collection, if any have been gathered."""
+        entry = self._entries.get(key)
+        if entry is None or entry.accumulator.doc_count == 0:
+            return None
+        return entry.accumulator
+
+    def drop(self, key: tuple):
+        with self._lock:
+            self._entries.pop(key, None)
+
+schema_catalog = SchemaCatalog(
+    ttl_seconds=float(os.getenv("SCHEMA_CATALOG_TTL_SECONDS", "300")),
+    max_paths=int(os.getenv("SCHEMA_MAX_PATHS", "500"))
+)
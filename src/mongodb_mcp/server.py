@@ -1,10 +1,34 @@
 import argparse
 import os
+import threading
+from mongodb_mcp import executor, metrics
 from mongodb_mcp.app import mcp
-from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.auth import AUTH_DISABLED, get_api_keys, get_auth_mode
+from mongodb_mcp.connection import get_client, warm_up
+from mongodb_mcp.logging_config import get_logger, setup_logging
 
 logger = get_logger("server")
 
+def _warm_up_in_background():
+    """Open configured connections without delaying the transport's handshake.
+
+    MONGODB_CONNECT_ON_START=true also opens the default connection from
+    MONGODB_URI, so the first tool call does not pay for server selection.
+    """
+    def run():
+        from mongodb_mcp import cache
+        include_default = os.getenv("MONGODB_CONNECT_ON_START", "false").lower() == "true"
+        for name in warm_up(include_default=include_default):
+            cache.start_watcher(get_client(name), name)
+    
+    threading.Thread(target=run, name="mongodb-mcp-warm-up", daemon=True).start()
+
+def http_app():
+    """The streamable-http ASGI app behind authentication and admission control."""
+    from mongodb_mcp.admission import AdmissionMiddleware
+    
+    return AdmissionMiddleware(mcp.streamable_http_app())
+
 def main():
     parser = argparse.ArgumentParser(description="MongoDB MCP Server")
     parser.add_argument(
@@ -25,33 +49,52 @@ def main():
         help="HTTP server port (default: 8000)"
     )
     args = parser.parse_args()
+    setup_logging()
     
     # Import tools to register them with the mcp instance
     # This must happen before mcp.run()
     logger.info("Registering tools...")
-    from mongodb_mcp.tools import connection, exploration, query, crud
+    from mongodb_mcp.tools import connection, exploration, query, crud, transfer, diagnostics, batch, watch
     
-    logger.info(f"Starting MongoDB MCP Server")
-    logger.info(f"Transport: {args.transport}")
+    logger.info("Starting MongoDB MCP Server")
+    logger.info("Transport: %s", args.transport)
+    logger.info("Tool workers: %s", executor.get_worker_count())
+    
+    # Open and pre-warm pools for connections named in MONGODB_CONNECTIONS,
+    # while the transport starts answering
+    _warm_up_in_background()
     
     if args.transport == "streamable-http":
-        logger.info(f"Listening on http://{args.host}:{args.port}")
+        logger.info("Listening on http://%s:%s", args.host, args.port)
         
         # Check auth configuration
-        auth_mode = os.getenv("AUTH_MODE", "disabled")
-        if auth_mode != "disabled":
-            api_key = os.getenv("MCP_API_KEY")
-            if not api_key:
-                logger.warning("AUTH_MODE is enabled but MCP_API_KEY is not set!")
+        auth_mode = get_auth_mode()
+        if auth_mode != AUTH_DISABLED:
+            keys = get_api_keys()
+            if not keys:
+                logger.warning("AUTH_MODE is enabled but neither MCP_API_KEY nor MCP_API_KEYS is set; all requests will be rejected!")
             else:
-                logger.info(f"Authentication enabled: {auth_mode}")
+                logger.info("Authentication enabled: %s (%s keys)", auth_mode, len(keys))
         else:
             logger.warning("Authentication is DISABLED. Set AUTH_MODE and MCP_API_KEY for production.")
         
-        mcp.run(transport="streamable-http", host=args.host, port=args.port)
+        from starlette.responses import PlainTextResponse
+        
+        @mcp.custom_route("/metrics", methods=["GET"])
+        async def metrics_endpoint(request):
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+        
+        import uvicorn
+        
+        # FastMCP reads the bind address from its settings when building the app
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+        uvicorn.run(http_app(), host=args.host, port=args.port, log_level=mcp.settings.log_level.lower())
     else:
         logger.info("Running in STDIO mode")
         mcp.run(transport="stdio")
+    
+    executor.shutdown(wait=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+import hashlib
+import heapq
+import math
+import random
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+class HyperLogLog:
+    """Distinct-count estimate in 2**precision bytes (Flajolet et al., 2007).
+
+    The relative standard error is about 1.04 / sqrt(2**precision), 2.3% at
+    the default precision of 11. Small cardinalities use linear counting.
+    """
+
+    def __init__(self, precision: int = 11):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add_bytes(self, data: bytes):
+        x = _hash64(data)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, value):
+        self.add_bytes(f"{type(value).__name__}:{value!r}".encode())
+
+    def merge(self, other: "HyperLogLog"):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.m and zeros:
+            return round(self.m * math.log(self.m / zeros))
+        return round(raw)
+
+class KLLSketch:
+    """Streaming quantiles in O(k log(n/k)) space (Karnin, Lang and Liberty, 2016).
+
+    Items live in compactors of growing weight; a full compactor sorts
+    itself and promotes every other item, from a random offset, to the next
+    level. Rank error is about 1.65 / k with high probability, under 1% at
+    the default k of 200.
+    """
+
+    def __init__(self, k: int = 200, seed: int = None):
+        self.k = k
+        self.compactors: list[list[float]] = [[]]
+        self.count = 0
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        height = len(self.compactors)
+        return max(2, math.ceil(self.k * (2 / 3) ** (height - level - 1)))
+
+    def _compact(self):
+        level = 0
+        while level < len(self.compactors):
+            compactor = self.compactors[level]
+            if len(compactor) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                # An odd item out stays at this level
+                kept = [compactor.pop()] if len(compactor) % 2 else []
+                compactor.sort()
+                offset = self._random.randint(0, 1)
+                self.compactors[level + 1].extend(compactor[offset::2])
+                self.compactors[level] = kept
+            level += 1
+
+    def update(self, value: float):
+        self.compactors[0].append(value)
+        self.count += 1
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compact()
+
+    def update_many(self, values):
+        """Add a batch of values with one sorted compaction per level.
+
+        A compaction's rank error is bounded by its level's weight, not by
+        how many items it halves, so compacting a whole batch at once is no
+        less accurate than compacting item by item.
+        """
+        values = list(values)
+        self.count += len(values)
+        self.compactors[0].extend(values)
+        self._compact()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self._compact()
+
+    def quantiles(self, fractions) -> list[float]:
+        """Approximate values at the given fractions (0..1) of the sorted stream."""
+        weighted = sorted(
+            (item, 1 << level)
+            for level, compactor in enumerate(self.compactors)
+            for item in compactor
+        )
+        if not weighted:
+            return [None for _ in fractions]
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for fraction in fractions:
+            target = fraction * total
+            cumulative = 0
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(item)
+        return results
+
+class SpaceSaving:
+    """The most frequent items of a stream in a fixed number of counters (Metwally et al., 2005).
+
+    When all counters are taken, a new item replaces the least counted one
+    and inherits its count as its error. Every item more frequent than
+    n / capacity is guaranteed a counter, and counts are exact as long as
+    nothing was evicted. The least counted item is found through a heap of
+    (count, key) snapshots; outdated snapshots are skipped when popped.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counters: dict = {}
+        self.evicted = False
+        self._heap: list = []
+        self._sequence = 0
+
+    def _push(self, key, count: int):
+        self._sequence += 1
+        heapq.heappush(self._heap, (count, self._sequence, key))
+        if len(self._heap) > 8 * self.capacity:
+            self._heap = [(counter[0], i, k) for i, (k, counter) in enumerate(self.counters.items())]
+            heapq.heapify(self._heap)
+            self._sequence = len(self._heap)
+
+    def add(self, key, value=None):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += 1
+            self._push(key, counter[0])
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [1, 0, value]
+            self._push(key, 1)
+            return
+        while True:
+            count, _, smallest = heapq.heappop(self._heap)
+            current = self.counters.get(smallest)
+            if current is not None and current[0] == count:
+                break
+        del self.counters[smallest]
+        self.counters[key] = [count + 1, count, value]
+        self._push(key, count + 1)
+        self.evicted = True
+
+    def top(self, n: int) -> list[tuple]:
+        """(value, count, error) of the n highest counters, highest first."""
+        ranked = sorted(self.counters.values(), key=lambda counter: -counter[0])[:n]
+        return [(value, count, error) for count, error, value in ranked]
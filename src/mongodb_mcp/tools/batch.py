@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+from mongodb_mcp import executor, metrics
+from mongodb_mcp.app import mcp
+from mongodb_mcp.encoding import encode
+from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.operations import bounded, deferred_time_limit, get_time_limit_ms
+from mongodb_mcp.pipeline import analyze_pipeline
+from mongodb_mcp.tools import exploration, query
+
+logger = get_logger("tools.batch")
+
+# Read-only tools that can run inside a batch
+BATCH_TOOLS = {
+    fn.__name__: fn
+    for fn in (
+        query.find, query.find_one, query.count, query.distinct, query.facet, query.aggregate, query.explain,
+        exploration.list_databases, exploration.list_collections, exploration.collection_stats,
+        exploration.collection_schema, exploration.profile_collection, exploration.list_indexes,
+        exploration.recommend_indexes,
+    )
+}
+
+def _validate(index: int, operation) -> str | None:
+    if not isinstance(operation, dict) or "tool" not in operation:
+        return f"Operation {index} must be an object like {{\"tool\": \"find\", \"args\": {{...}}}}"
+    if operation["tool"] not in BATCH_TOOLS:
+        return f"Operation {index}: '{operation['tool']}' cannot be batched. Use one of {sorted(BATCH_TOOLS)}"
+    args = operation.get("args", {})
+    if not isinstance(args, dict):
+        return f"Operation {index}: args must be an object"
+    if operation["tool"] == "aggregate":
+        analysis = analyze_pipeline(args.get("database", ""), args.get("collection", ""), args.get("pipeline") or [])
+        if analysis.write_stages:
+            return f"Operation {index}: aggregations with $out or $merge cannot be batched"
+    return None
+
+def _embed(result: str) -> str:
+    # Tool results are already JSON documents; plain-text results become JSON strings
+    if result[:1] in ("{", "["):
+        return result
+    return encode(result)
+
+@mcp.tool()
+async def batch(operations: list, parallelism: int = 8) -> str:
+    """Run several read operations concurrently and return all results at once.
+    
+    Each operation names a read tool and its arguments, e.g.
+    {"id": "orders-stats", "tool": "collection_stats", "args": {"database": "shop", "collection": "orders"}}.
+    Supported tools: find, find_one, count, distinct, facet, aggregate (without $out/$merge),
+    explain, list_databases, list_collections, collection_stats, collection_schema,
+    profile_collection, list_indexes and recommend_indexes. Results keep the order of the operations.
+    Each operation is held to its own tool's time limit as well as the batch's, counted
+    from when it starts running.
+    
+    Args:
+        operations: List of {"tool", "args", optional "id"} objects
+        parallelism: Operations in flight at once (capped by BATCH_MAX_PARALLELISM)
+    """
+    try:
+        max_operations = int(os.getenv("BATCH_MAX_OPERATIONS", "100"))
+        if not operations:
+            return "Error: No operations provided."
+        if len(operations) > max_operations:
+            return f"Error: A batch is limited to {max_operations} operations."
+        for index, operation in enumerate(operations):
+            problem = _validate(index, operation)
+            if problem:
+                return f"Error: {problem}"
+
+        parallelism = max(1, min(parallelism, int(os.getenv("BATCH_MAX_PARALLELISM", "16"))))
+        semaphore = asyncio.Semaphore(parallelism)
+
+        async def run(index: int, operation: dict) -> tuple[bool, str]:
+            name = operation["tool"]
+            args = operation.get("args", {})
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    with deferred_time_limit(get_time_limit_ms(name, args.get("max_time_ms"))):
+                        result = await executor.run_blocking(name, bounded(BATCH_TOOLS[name]), **args)
+                except TypeError as e:
+                    # Unknown or missing arguments
+                    result = f"Error: {str(e)}"
+                elapsed = time.perf_counter() - started
+            ok = not metrics.is_error(result)
+            metrics.tool_latency.observe(name, value=elapsed)
+            metrics.tool_calls.inc(name, "ok" if ok else "error")
+            header = encode({
+                "id": operation.get("id", index),
+                "tool": name,
+                "ok": ok,
+                "elapsed_ms": round(elapsed * 1000, 2),
+            })
+            return ok, f'{header[:-1]},"result":{_embed(result)}}}'
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(run(i, op) for i, op in enumerate(operations)))
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        failed = sum(not ok for ok, _ in outcomes)
+        results = [result for _, result in outcomes]
+        logger.info("batch: %s operations, %s failed, %sms", len(operations), failed, elapsed_ms)
+        return (
+            f'{{"operations":{len(operations)},"failed":{failed},"elapsed_ms":{elapsed_ms},'
+            f'"results":[{",".join(results)}]}}'
+        )
+    except Exception as e:
+        logger.error("batch failed: %s", e)
+        return f"Error: {str(e)}"
@@ -1,61 +1,137 @@
-import os
-from pymongo import MongoClient
+from mongodb_mcp import cache
 from mongodb_mcp.app import mcp
-from mongodb_mcp.connection import set_client, get_client
+from mongodb_mcp.catalog import metadata_catalog
+from mongodb_mcp.changestreams import subscriptions
+from mongodb_mcp.connection import (
+    close_client, configured_connections, get_client, list_connections as registered_connections,
+    mask_uri, open_client, resolve_name
+)
+from mongodb_mcp.cursors import cursor_registry
+from mongodb_mcp.encoding import encode
+from mongodb_mcp.health import health_monitor
 from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.profiling import profile_cache
 
 logger = get_logger("tools.connection")
 
 @mcp.tool()
-def connect(connection_string: str = None) -> str:
-    """Connect to a MongoDB instance.
+def connect(
+    connection_string: str = None,
+    connection: str = None,
+    max_pool_size: int = None,
+    min_pool_size: int = None,
+    max_idle_time_ms: int = None,
+    compressors: str = None,
+    read_preference: str = None,
+    socket_timeout_ms: int = None
+) -> str:
+    """Connect to a MongoDB instance under a name.
+    
+    Calling connect again with the same settings reuses the warm connection pool.
     
     Args:
-        connection_string: MongoDB URI. Uses MONGODB_URI env var if not provided.
+        connection_string: MongoDB URI. Defaults to the URI configured for this name
+            in MONGODB_CONNECTIONS, or MONGODB_URI for the default connection.
+        connection: Connection name (default: "default")
+        max_pool_size: Maximum pooled connections (default: MONGODB_MAX_POOL_SIZE or driver default)
+        min_pool_size: Connections kept open and pre-warmed (default: MONGODB_MIN_POOL_SIZE)
+        max_idle_time_ms: Close pooled connections idle for longer than this
+        compressors: Wire compressors, e.g. "zstd,snappy,zlib"
+        read_preference: e.g. "primary", "secondaryPreferred", "nearest"
+        socket_timeout_ms: Give up on a socket read after this long, for operations
+            running without a time limit (default: MONGODB_SOCKET_TIMEOUT_MS)
     """
-    uri = connection_string or os.getenv("MONGODB_URI")
+    name = resolve_name(connection)
+    configured = dict(configured_connections().get(name, {}))
+    configured_uri = configured.pop("uri", None)
+    uri = connection_string or configured_uri
     if not uri:
         return "Error: No connection string provided and MONGODB_URI not set in environment."
-    
-    # Mask the URI for logging (hide credentials)
-    masked_uri = uri.split("@")[-1] if "@" in uri else uri
-    logger.info(f"Connecting to MongoDB: ...@{masked_uri}")
-    
+
+    overrides = {
+        **configured,
+        "maxPoolSize": max_pool_size,
+        "minPoolSize": min_pool_size,
+        "maxIdleTimeMS": max_idle_time_ms,
+        "compressors": compressors,
+        "readPreference": read_preference,
+        "socketTimeoutMS": socket_timeout_ms,
+    }
+    overrides = {k: v for k, v in overrides.items() if v is not None}
+
+    logger.info("Connecting '%s' to MongoDB: ...@%s", name, mask_uri(uri))
+
     try:
-        client = MongoClient(uri, serverSelectionTimeoutMS=5000)
-        # Verify connection
-        client.admin.command('ping')
-        set_client(client)
+        client, reused = open_client(name, uri, **overrides)
+        if reused:
+            logger.info("Connection '%s' already open, reusing pool", name)
+            return f"Already connected to MongoDB as '{name}' (reusing connection pool)"
+        cursor_registry.close_all(name)
+        subscriptions.close_all(name)
+        cache.result_cache.invalidate(connection=name)
+        profile_cache.invalidate(connection=name)
+        metadata_catalog.invalidate(connection=name)
+        cache.start_watcher(client, name)
         logger.info("Successfully connected to MongoDB")
-        return "Successfully connected to MongoDB"
+        return f"Successfully connected to MongoDB as '{name}'"
     except Exception as e:
-        logger.error(f"Failed to connect: {str(e)}")
-        set_client(None)
+        logger.error("Failed to connect: %s", e)
         return f"Failed to connect: {str(e)}"
 
 @mcp.tool()
-def disconnect() -> str:
-    """Close the current MongoDB connection."""
-    client = get_client()
-    if client:
-        client.close()
-        set_client(None)
-        logger.info("Disconnected from MongoDB")
+def disconnect(connection: str = None) -> str:
+    """Close a MongoDB connection.
+    
+    Args:
+        connection: Connection name (default: "default")
+    """
+    name = resolve_name(connection)
+    if get_client(name):
+        cache.stop_watcher(name)
+        cursor_registry.close_all(name)
+        subscriptions.close_all(name)
+        cache.result_cache.invalidate(connection=name)
+        profile_cache.invalidate(connection=name)
+        metadata_catalog.invalidate(connection=name)
+        close_client(name)
+        logger.info("Disconnected '%s' from MongoDB", name)
         return "Disconnected from MongoDB."
     logger.debug("Disconnect called but no active connection")
     return "No active connection."
 
 @mcp.tool()
-def connection_status() -> str:
-    """Check the current connection status."""
-    client = get_client()
+def connection_status(connection: str = None, probe: bool = False) -> str:
+    """Check the current connection status.
+    
+    Answers from the topology and heartbeats the driver monitors in the
+    background, without a round trip: status (healthy, degraded when only
+    reads are possible, unreachable), circuit breaker state and per-server
+    type and round trip time.
+    
+    Args:
+        connection: Connection name (default: "default")
+        probe: If true, also ping the cluster now (closes an open circuit on success)
+    """
+    name = resolve_name(connection)
+    client = get_client(name)
     if not client:
         return "Not connected."
-    try:
-        # Simple ping to check if connection is still alive
-        client.admin.command('ping')
-        logger.debug("Connection health check: OK")
-        return "Connected and healthy."
-    except Exception as e:
-        logger.warning(f"Connection unhealthy: {str(e)}")
-        return f"Connected but unhealthy: {str(e)}"
+    health = health_monitor.get(name)
+    if health is None:
+        # Clients registered without pool bookkeeping have no monitor
+        try:
+            client.admin.command('ping')
+            return "Connected and healthy."
+        except Exception as e:
+            logger.warning("Connection unhealthy: %s", e)
+            return f"Connected but unhealthy: {str(e)}"
+    if probe:
+        health.probe()
+    status = health.to_dict()
+    logger.debug("Connection '%s' status: %s, circuit %s", name, status['status'], status['circuit'])
+    return encode(status)
+
+@mcp.tool()
+def list_connections() -> str:
+    """List open named connections and their pool settings."""
+    return encode({"connections": registered_connections()})
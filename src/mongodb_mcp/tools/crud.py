@@ -1,64 +1,76 @@
-import json
 import os
+import time
 from mongodb_mcp.app import mcp
-from mongodb_mcp.connection import get_client
+from mongodb_mcp.cache import result_cache
+from mongodb_mcp.catalog import metadata_catalog
+from mongodb_mcp.connection import get_active_client
+from mongodb_mcp.encoding import encode
 from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.profiling import profile_cache
 
 logger = get_logger("tools.crud")
 
-def _get_active_client():
-    client = get_client()
-    if not client:
-        raise RuntimeError("Not connected to MongoDB. Please use 'connect' tool first.")
-    return client
-
 def _check_readonly():
     read_only = os.getenv("READ_ONLY", "false").lower() == "true"
     if read_only:
         logger.warning("Write operation blocked: server is in READ_ONLY mode")
         raise RuntimeError("Server is in READ-ONLY mode. Write operations are disabled.")
 
+def _after_write(database: str, collection: str, connection: str = None):
+    """Drop cached reads, profiles and metadata of a namespace that may have just changed."""
+    result_cache.invalidate(database, collection, connection)
+    profile_cache.invalidate(database, collection, connection)
+    metadata_catalog.note_write(database, collection, connection)
+
 @mcp.tool()
-def insert_one(database: str, collection: str, document: dict) -> str:
+def insert_one(database: str, collection: str, document: dict, connection: str = None) -> str:
     """Insert a single document.
     
     Args:
         database: Database name
         collection: Collection name
         document: Document to insert
+        connection: Named connection (default: "default")
     """
     try:
         _check_readonly()
-        client = _get_active_client()
+        client = get_active_client(connection)
         coll = client[database][collection]
-        result = coll.insert_one(document)
-        logger.info(f"insert_one: {database}.{collection} -> {result.inserted_id}")
-        return json.dumps({"inserted_id": str(result.inserted_id)}, indent=2)
+        try:
+            result = coll.insert_one(document)
+        finally:
+            _after_write(database, collection, connection)
+        logger.info("insert_one: %s.%s -> %s", database, collection, result.inserted_id)
+        return encode({"inserted_id": str(result.inserted_id)})
     except Exception as e:
-        logger.error(f"insert_one failed: {str(e)}")
+        logger.error("insert_one failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def insert_many(database: str, collection: str, documents: list) -> str:
+def insert_many(database: str, collection: str, documents: list, connection: str = None) -> str:
     """Insert multiple documents.
     
     Args:
         database: Database name
         collection: Collection name
         documents: List of documents to insert
+        connection: Named connection (default: "default")
     """
     try:
         _check_readonly()
-        client = _get_active_client()
+        client = get_active_client(connection)
         coll = client[database][collection]
-        result = coll.insert_many(documents)
-        logger.info(f"insert_many: {database}.{collection} -> {len(result.inserted_ids)} docs")
-        return json.dumps({
+        try:
+            result = coll.insert_many(documents)
+        finally:
+            _after_write(database, collection, connection)
+        logger.info("insert_many: %s.%s -> %s docs", database, collection, len(result.inserted_ids))
+        return encode({
             "inserted_count": len(result.inserted_ids),
             "inserted_ids": [str(id) for id in result.inserted_ids]
-        }, indent=2)
+        })
     except Exception as e:
-        logger.error(f"insert_many failed: {str(e)}")
+        logger.error("insert_many failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
@@ -67,7 +79,8 @@ def update_one(
     collection: str, 
     filter: dict, 
     update: dict,
-    upsert: bool = False
+    upsert: bool = False,
+    connection: str = None
 ) -> str:
     """Update a single document.
     
@@ -77,20 +90,27 @@ def update_one(
         filter: Filter to find document
         update: Update operations (e.g., {"$set": {"status": "active"}})
         upsert: If true, create a new document if no match found
+        connection: Named connection (default: "default")
     """
     try:
         _check_readonly()
-        client = _get_active_client()
+        client = get_active_client(connection)
         coll = client[database][collection]
-        result = coll.update_one(filter, update, upsert=upsert)
-        logger.info(f"update_one: {database}.{collection} matched={result.matched_count} modified={result.modified_count}")
-        return json.dumps({
+        try:
+            result = coll.update_one(filter, update, upsert=upsert)
+        finally:
+            _after_write(database, collection, connection)
+        logger.info(
+            "update_one: %s.%s matched=%s modified=%s",
+            database, collection, result.matched_count, result.modified_count
+        )
+        return encode({
             "matched_count": result.matched_count,
             "modified_count": result.modified_count,
             "upserted_id": str(result.upserted_id) if result.upserted_id else None
-        }, indent=2)
+        })
     except Exception as e:
-        logger.error(f"update_one failed: {str(e)}")
+        logger.error("update_one failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
@@ -99,7 +119,8 @@ def update_many(
     collection: str, 
     filter: dict, 
     update: dict,
-    upsert: bool = False
+    upsert: bool = False,
+    connection: str = None
 ) -> str:
     """Update multiple documents.
     
@@ -109,58 +130,138 @@ def update_many(
         filter: Filter to find documents
         update: Update operations
         upsert: If true, create if no match
+        connection: Named connection (default: "default")
     """
     try:
         _check_readonly()
-        client = _get_active_client()
+        client = get_active_client(connection)
         coll = client[database][collection]
-        result = coll.update_many(filter, update, upsert=upsert)
-        logger.info(f"update_many: {database}.{collection} matched={result.matched_count} modified={result.modified_count}")
-        return json.dumps({
+        try:
+            result = coll.update_many(filter, update, upsert=upsert)
+        finally:
+            _after_write(database, collection, connection)
+        logger.info(
+            "update_many: %s.%s matched=%s modified=%s",
+            database, collection, result.matched_count, result.modified_count
+        )
+        return encode({
             "matched_count": result.matched_count,
             "modified_count": result.modified_count,
             "upserted_id": str(result.upserted_id) if result.upserted_id else None
-        }, indent=2)
+        })
     except Exception as e:
-        logger.error(f"update_many failed: {str(e)}")
+        logger.error("update_many failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def delete_one(database: str, collection: str, filter: dict) -> str:
+def delete_one(database: str, collection: str, filter: dict, connection: str = None) -> str:
     """Delete a single document.
     
     Args:
         database: Database name
         collection: Collection name
         filter: Filter to find document to delete
+        connection: Named connection (default: "default")
     """
     try:
         _check_readonly()
-        client = _get_active_client()
+        client = get_active_client(connection)
         coll = client[database][collection]
-        result = coll.delete_one(filter)
-        logger.info(f"delete_one: {database}.{collection} deleted={result.deleted_count}")
-        return json.dumps({"deleted_count": result.deleted_count}, indent=2)
+        try:
+            result = coll.delete_one(filter)
+        finally:
+            _after_write(database, collection, connection)
+        logger.info("delete_one: %s.%s deleted=%s", database, collection, result.deleted_count)
+        return encode({"deleted_count": result.deleted_count})
     except Exception as e:
-        logger.error(f"delete_one failed: {str(e)}")
+        logger.error("delete_one failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def delete_many(database: str, collection: str, filter: dict) -> str:
+def delete_many(database: str, collection: str, filter: dict, connection: str = None) -> str:
     """Delete multiple documents.
     
     Args:
         database: Database name
         collection: Collection name
         filter: Filter to find documents to delete
+        connection: Named connection (default: "default")
     """
     try:
         _check_readonly()
-        client = _get_active_client()
+        client = get_active_client(connection)
         coll = client[database][collection]
-        result = coll.delete_many(filter)
-        logger.info(f"delete_many: {database}.{collection} deleted={result.deleted_count}")
-        return json.dumps({"deleted_count": result.deleted_count}, indent=2)
+        try:
+            result = coll.delete_many(filter)
+        finally:
+            _after_write(database, collection, connection)
+        logger.info("delete_many: %s.%s deleted=%s", database, collection, result.deleted_count)
+        return encode({"deleted_count": result.deleted_count})
+    except Exception as e:
+        logger.error("delete_many failed: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def bulk_write(
+    database: str,
+    collection: str,
+    operations: list,
+    ordered: bool = True,
+    parallelism: int = 4,
+    connection: str = None
+) -> str:
+    """Run many mixed write operations in size-bounded batches.
+    
+    Each operation is an object with one key naming its type:
+    {"insert_one": {"document": {...}}},
+    {"update_one" | "update_many": {"filter": {...}, "update": {...}, "upsert": false}},
+    {"replace_one": {"filter": {...}, "replacement": {...}, "upsert": false}},
+    {"delete_one" | "delete_many": {"filter": {...}}}.
+    
+    Returns aggregated counts and a bounded error summary rather than per-document ids.
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        operations: List of write operations
+        ordered: If true, stop at the first error. If false, keep going and
+            submit batches concurrently.
+        parallelism: Concurrent batches for unordered writes (capped by BULK_MAX_PARALLELISM)
+        connection: Named connection (default: "default")
+    """
+    try:
+        _check_readonly()
+        if not operations:
+            return "Error: No operations provided."
+        from mongodb_mcp import bulk
+        parsed = bulk.parse_operations(operations)
+        max_ops, max_bytes = bulk.get_chunk_limits()
+        chunks = bulk.chunk_operations(parsed, max_ops, max_bytes)
+        parallelism = max(1, min(parallelism, int(os.getenv("BULK_MAX_PARALLELISM", "8"))))
+
+        client = get_active_client(connection)
+        coll = client[database][collection]
+        started = time.perf_counter()
+        try:
+            summary, unprocessed = bulk.execute(coll, chunks, ordered, parallelism)
+        finally:
+            _after_write(database, collection, connection)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        logger.info(
+            "bulk_write: %s.%s ops=%s chunks=%s ordered=%s errors=%s elapsed=%sms",
+            database, collection, len(parsed), len(chunks), ordered, summary.error_count, elapsed_ms
+        )
+        response = {
+            **summary.to_dict(),
+            "operations": len(parsed),
+            "chunks": len(chunks),
+            "ordered": ordered,
+            "elapsed_ms": elapsed_ms,
+        }
+        if unprocessed:
+            response["unprocessed_count"] = unprocessed
+        return encode(response)
     except Exception as e:
-        logger.error(f"delete_many failed: {str(e)}")
+        logger.error("bulk_write failed: %s", e)
         return f"Error: {str(e)}"
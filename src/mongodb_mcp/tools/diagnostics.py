@@ -0,0 +1,23 @@
+from mongodb_mcp import metrics
+from mongodb_mcp.app import mcp
+from mongodb_mcp.encoding import encode
+from mongodb_mcp.logging_config import get_logger
+
+logger = get_logger("tools.diagnostics")
+
+@mcp.tool()
+def server_metrics(format: str = "summary") -> str:
+    """Per-tool latency, driver command timings and connection pool usage.
+    
+    Over streamable-http the same data is served at /metrics.
+    
+    Args:
+        format: "summary" for percentiles as JSON, or "prometheus" for the raw exposition text
+    """
+    try:
+        if format == "prometheus":
+            return metrics.render()
+        return encode(metrics.snapshot())
+    except Exception as e:
+        logger.error("server_metrics failed: %s", e)
+        return f"Error: {str(e)}"
@@ -1,111 +1,337 @@
-import json
+import asyncio
+import os
+import time
+from mongodb_mcp import executor, profiling
 from mongodb_mcp.app import mcp
-from mongodb_mcp.connection import get_client
+from mongodb_mcp.catalog import metadata_catalog
+from mongodb_mcp.connection import get_active_client, resolve_name
+from mongodb_mcp.encoding import encode
 from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.operations import bounded
+from mongodb_mcp.schema import schema_catalog
+from mongodb_mcp.workload import recommend, workload_store
 
 logger = get_logger("tools.exploration")
 
-def _get_active_client():
-    client = get_client()
-    if not client:
-        raise RuntimeError("Not connected to MongoDB. Please use 'connect' tool first.")
-    return client
-
 @mcp.tool()
-def list_databases() -> str:
-    """List all databases on the connected MongoDB instance."""
+def list_databases(connection: str = None, refresh: bool = False) -> str:
+    """List all databases on the connected MongoDB instance.
+    
+    Args:
+        connection: Named connection (default: "default")
+        refresh: If true, bypass the metadata catalog and ask the server
+    """
     try:
-        client = _get_active_client()
-        databases = client.list_database_names()
-        logger.info(f"Listed {len(databases)} databases")
-        return json.dumps({"databases": databases}, indent=2)
+        client = get_active_client(connection)
+        databases = metadata_catalog.databases(client, connection, refresh=refresh)
+        logger.info("Listed %s databases", len(databases))
+        return encode({"databases": databases})
     except Exception as e:
-        logger.error(f"list_databases failed: {str(e)}")
+        logger.error("list_databases failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def list_collections(database: str) -> str:
+def list_collections(database: str, connection: str = None, refresh: bool = False) -> str:
     """List collections in a specified database.
     
     Args:
         database: database name
+        connection: Named connection (default: "default")
+        refresh: If true, bypass the metadata catalog and ask the server
     """
     try:
-        client = _get_active_client()
-        db = client[database]
-        collections = db.list_collection_names()
-        logger.info(f"Listed {len(collections)} collections in '{database}'")
-        return json.dumps({"database": database, "collections": collections}, indent=2)
+        client = get_active_client(connection)
+        collections = [info["name"] for info in metadata_catalog.collections(client, database, connection, refresh=refresh)]
+        logger.info("Listed %s collections in '%s'", len(collections), database)
+        return encode({"database": database, "collections": collections})
     except Exception as e:
-        logger.error(f"list_collections failed for '{database}': {str(e)}")
+        logger.error("list_collections failed for '%s': %s", database, e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def collection_stats(database: str, collection: str) -> str:
+def collection_stats(database: str, collection: str, connection: str = None, refresh: bool = False) -> str:
     """Get statistics for a collection (count, size, avg object size).
     
+    Served from the metadata catalog for up to CATALOG_TTL_SECONDS.
+    
     Args:
         database: Database name
         collection: Collection name
+        connection: Named connection (default: "default")
+        refresh: If true, bypass the metadata catalog and ask the server
     """
     try:
-        client = _get_active_client()
-        db = client[database]
-        stats = db.command("collStats", collection)
-        
-        relevant_stats = {
-            "ns": stats.get("ns"),
-            "count": stats.get("count"),
-            "size": stats.get("size"),
-            "avgObjSize": stats.get("avgObjSize"),
-            "storageSize": stats.get("storageSize"),
-            "nindexes": stats.get("nindexes"),
-            "totalIndexSize": stats.get("totalIndexSize")
+        client = get_active_client(connection)
+        relevant_stats = metadata_catalog.stats(client, database, collection, connection, refresh=refresh)
+        logger.info("Retrieved stats for '%s.%s': %s docs", database, collection, relevant_stats.get('count'))
+        return encode(relevant_stats)
+    except Exception as e:
+        logger.error("collection_stats failed for '%s.%s': %s", database, collection, e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+async def database_overview(database: str, connection: str = None, refresh: bool = False) -> str:
+    """Stats for every collection in a database in one call, largest first.
+    
+    Collection stats are gathered concurrently (up to CATALOG_MAX_PARALLELISM at
+    once) through the metadata catalog. Views are listed separately, without
+    stats, and are not counted in collection_count.
+    
+    Args:
+        database: Database name
+        connection: Named connection (default: "default")
+        refresh: If true, bypass the metadata catalog and ask the server
+    """
+    try:
+        client = get_active_client(connection)
+        infos = await executor.run_blocking(
+            "database_overview", bounded(metadata_catalog.collections), client, database, connection, refresh=refresh
+        )
+        max_collections = int(os.getenv("CATALOG_OVERVIEW_MAX_COLLECTIONS", "500"))
+        collections = [info["name"] for info in infos if info["type"] == "collection"]
+        views = [info["name"] for info in infos if info["type"] != "collection"]
+        omitted = collections[max_collections:]
+        collections = collections[:max_collections]
+        semaphore = asyncio.Semaphore(max(1, int(os.getenv("CATALOG_MAX_PARALLELISM", "8"))))
+
+        async def gather_stats(name: str) -> dict:
+            async with semaphore:
+                try:
+                    stats = await executor.run_blocking(
+                        "collection_stats", bounded(metadata_catalog.stats),
+                        client, database, name, connection, refresh=refresh
+                    )
+                except Exception as e:
+                    return {"name": name, "error": str(e)}
+            return {"name": name, **{field: value for field, value in stats.items() if field != "ns"}}
+
+        results = await asyncio.gather(*(gather_stats(name) for name in collections))
+        results.sort(key=lambda stats: stats.get("size") or 0, reverse=True)
+        totals = {
+            field: sum(stats.get(field) or 0 for stats in results)
+            for field in ("count", "size", "storageSize", "nindexes", "totalIndexSize")
+        }
+        response = {
+            "database": database,
+            "collection_count": len(results) + len(omitted),
+            "totals": totals,
+            "collections": results
         }
-        logger.info(f"Retrieved stats for '{database}.{collection}': {relevant_stats.get('count')} docs")
-        return json.dumps(relevant_stats, indent=2)
+        if views:
+            response["views"] = views
+        if omitted:
+            response["collections_omitted"] = len(omitted)
+        logger.info("database_overview: '%s' with %s collections", database, len(results))
+        return encode(response)
     except Exception as e:
-        logger.error(f"collection_stats failed for '{database}.{collection}': {str(e)}")
+        logger.error("database_overview failed for '%s': %s", database, e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def collection_schema(database: str, collection: str, sample_size: int = 5) -> str:
-    """Infer a simple schema from sample documents.
+def collection_schema(
+    database: str,
+    collection: str,
+    sample_size: int = 100,
+    refresh: bool = False,
+    connection: str = None
+) -> str:
+    """Infer a nested schema from sampled documents.
+    
+    Reports per-path BSON type frequencies, presence and null ratios, array
+    lengths and example values. Array elements appear as "field[]". Results are
+    kept in a schema catalog; later calls merge a fresh sample into the stored
+    statistics once they are older than SCHEMA_CATALOG_TTL_SECONDS.
     
     Args:
         database: Database name
         collection: Collection name
-        sample_size: Number of documents to sample (default: 5)
+        sample_size: Number of documents to sample per refresh (default: 100)
+        refresh: If true, sample again even if the catalog entry is fresh
+        connection: Named connection (default: "default")
     """
     try:
-        client = _get_active_client()
-        coll = client[database][collection]
+        client = get_active_client(connection)
+        entry = schema_catalog.entry((resolve_name(connection), database, collection))
         
-        cursor = coll.aggregate([{"$sample": {"size": sample_size}}])
-        samples = list(cursor)
-        
-        if not samples:
-            logger.info(f"Collection '{database}.{collection}' is empty")
-            return "Collection is empty, cannot infer schema."
+        with entry.lock:
+            added = 0
+            if refresh or not schema_catalog.is_fresh(entry):
+                coll = client[database][collection]
+                cursor = coll.aggregate(
+                    [{"$sample": {"size": sample_size}}],
+                    batchSize=min(sample_size, 1000)
+                )
+                with cursor:
+                    added = schema_catalog.refresh(entry, cursor)
+            
+            accumulator = entry.accumulator
+            if accumulator.doc_count == 0:
+                logger.info("Collection '%s.%s' is empty", database, collection)
+                return "Collection is empty, cannot infer schema."
             
-        schema_keys = {}
-        for doc in samples:
-            for key, value in doc.items():
-                type_name = type(value).__name__
-                if key not in schema_keys:
-                    schema_keys[key] = set()
-                schema_keys[key].add(type_name)
+            response = {
+                "database": database,
+                "collection": collection,
+                "sampled_docs": accumulator.doc_count,
+                "new_samples": added,
+                "inferred_schema": accumulator.summary()
+            }
+            if accumulator.paths_truncated:
+                response["paths_truncated"] = True
+        
+        logger.info(
+            "Inferred schema for '%s.%s' from %s samples (%s new)",
+            database, collection, accumulator.doc_count, added
+        )
+        return encode(response)
+        
+    except Exception as e:
+        logger.error("collection_schema failed for '%s.%s': %s", database, collection, e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def profile_collection(
+    database: str,
+    collection: str,
+    sample_size: int = None,
+    fields: list = None,
+    refresh: bool = False,
+    max_time_ms: int = None,
+    connection: str = None
+) -> str:
+    """Profile value distributions per field from a random sample.
+    
+    Per path: distinct count estimate (HyperLogLog), most frequent values
+    (exact unless more distinct values were seen than tracked), min/max,
+    mean and quantiles of numbers and dates (KLL sketch), and string
+    lengths. Memory stays bounded however large the sample. Profiles are
+    cached per collection for PROFILE_CACHE_TTL_SECONDS, or until a write
+    through this server changes the collection.
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        sample_size: Documents to sample (default: PROFILE_SAMPLE_SIZE, capped by PROFILE_MAX_SAMPLE_SIZE)
+        fields: Only profile these paths and their subfields, e.g. ["status", "items[].price"]
+        refresh: If true, sample again even if a cached profile exists
+        max_time_ms: Time limit for this call in ms; can only lower MAX_TIME_MS
+        connection: Named connection (default: "default")
+    """
+    try:
+        client = get_active_client(connection)
+        sample_size = min(sample_size or profiling.get_sample_size(), int(os.getenv("PROFILE_MAX_SAMPLE_SIZE", "100000")))
+        key = (resolve_name(connection), database, collection, sample_size, tuple(sorted(fields or ())))
+        
+        response = None if refresh else profiling.profile_cache.get(key)
+        write_seq = profiling.profile_cache.write_seq()
+        if response is not None:
+            logger.info("profile_collection: %s.%s served from cache", database, collection)
+            return encode(response)
         
-        final_schema = {k: list(v) for k, v in schema_keys.items()}
-        logger.info(f"Inferred schema for '{database}.{collection}' from {len(samples)} samples")
+        profile = profiling.CollectionProfile(
+            max_paths=int(os.getenv("PROFILE_MAX_PATHS", "200")), fields=fields
+        )
+        started = time.perf_counter()
+        cursor = client[database][collection].aggregate(
+            [{"$sample": {"size": sample_size}}],
+            batchSize=min(sample_size, 1000)
+        )
+        with cursor:
+            for document in cursor:
+                profile.add(document)
+        if profile.doc_count == 0:
+            logger.info("Collection '%s.%s' is empty", database, collection)
+            return "Collection is empty, nothing to profile."
         
-        return json.dumps({
+        response = {
             "database": database,
             "collection": collection,
-            "sampled_docs": len(samples),
-            "inferred_schema": final_schema
-        }, indent=2)
+            "sampled_docs": profile.doc_count,
+            "profile": profile.summary(),
+        }
+        if profile.paths_truncated:
+            response["paths_truncated"] = True
+        profiling.profile_cache.put(key, response, write_seq)
+        logger.info(
+            "Profiled '%s.%s' from %s samples in %.0fms",
+            database, collection, profile.doc_count, (time.perf_counter() - started) * 1000
+        )
+        return encode(response)
+        
+    except Exception as e:
+        logger.error("profile_collection failed for '%s.%s': %s", database, collection, e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def list_indexes(database: str, collection: str, connection: str = None) -> str:
+    """List a collection's indexes, with usage counts where the server reports them.
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        connection: Named connection (default: "default")
+    """
+    try:
+        client = get_active_client(connection)
+        coll = client[database][collection]
+        indexes = []
+        for index in coll.list_indexes():
+            info = {"name": index["name"], "key": dict(index["key"])}
+            for option in ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "hidden"):
+                if option in index:
+                    info[option] = index[option]
+            indexes.append(info)
+        
+        try:
+            usage = {
+                stats["name"]: stats["accesses"]["ops"]
+                for stats in coll.aggregate([{"$indexStats": {}}])
+            }
+            for info in indexes:
+                if info["name"] in usage:
+                    info["ops_since_restart"] = usage[info["name"]]
+        except Exception as e:
+            logger.debug("$indexStats unavailable for '%s.%s': %s", database, collection, e)
+        
+        logger.info("Listed %s indexes on '%s.%s'", len(indexes), database, collection)
+        return encode({"database": database, "collection": collection, "indexes": indexes})
+    except Exception as e:
+        logger.error("list_indexes failed for '%s.%s': %s", database, collection, e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def recommend_indexes(
+    database: str,
+    collection: str,
+    min_count: int = 1,
+    connection: str = None
+) -> str:
+    """Suggest indexes for the query shapes this server has run against a collection.
+    
+    Filters, sorts and projections seen by find, find_one, count, distinct and
+    aggregate are recorded as query shapes with their frequency and latency.
+    Shapes no existing index serves get a compound index in equality, sort,
+    range order, ranked by estimated time saved.
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        min_count: Ignore shapes seen fewer times than this
+        connection: Named connection (default: "default")
+    """
+    try:
+        client = get_active_client(connection)
+        shapes = workload_store.shapes(connection, database, collection)
+        if not shapes:
+            return f"No queries on '{database}.{collection}' have been recorded yet."
         
+        existing = [list(index["key"].items()) for index in client[database][collection].list_indexes()]
+        result = recommend(shapes, existing, min_count)
+        logger.info(
+            "recommend_indexes: '%s.%s' %s shapes -> %s recommendations",
+            database, collection, len(shapes), len(result["recommendations"])
+        )
+        return encode({"database": database, "collection": collection, **result})
     except Exception as e:
-        logger.error(f"collection_schema failed for '{database}.{collection}': {str(e)}")
+        logger.error("recommend_indexes failed for '%s.%s': %s", database, collection, e)
         return f"Error: {str(e)}"
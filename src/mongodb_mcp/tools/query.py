@@ -1,21 +1,30 @@
-import json
 import os
+import time
+from itertools import chain
+from mongodb_mcp import counting, facets
 from mongodb_mcp.app import mcp
-from mongodb_mcp.connection import get_client
+from mongodb_mcp.budget import ResponseBudget, get_limits, slice_projection, truncate_document
+from mongodb_mcp.cache import result_cache
+from mongodb_mcp.catalog import metadata_catalog
+from mongodb_mcp.connection import get_active_client, resolve_name
+from mongodb_mcp.cursors import cursor_registry
+from mongodb_mcp.encoding import encode
+from mongodb_mcp.explain import QueryGuardError, build_command, check_query, explain as run_explain, summarize
 from mongodb_mcp.logging_config import get_logger
-from bson import json_util
+from mongodb_mcp.operations import time_limit
+from mongodb_mcp.pipeline import analyze_pipeline, limit_pipeline
+from mongodb_mcp.profiling import profile_cache
+from mongodb_mcp.schema import schema_catalog
+from mongodb_mcp.workload import pipeline_shape, query_shape, workload_store
 
 logger = get_logger("tools.query")
 
-def _get_active_client():
-    client = get_client()
-    if not client:
-        raise RuntimeError("Not connected to MongoDB. Please use 'connect' tool first.")
-    return client
-
-def _serialize(data):
-    """Serialize MongoDB data to JSON using json_util to handle ObjectIds etc."""
-    return json.loads(json_util.dumps(data))
+def _budget_projection(connection: str, database: str, collection: str, projection: dict, limits) -> tuple[dict, frozenset]:
+    """Slice arrays the schema catalog has seen grow past RESPONSE_MAX_ARRAY_ITEMS."""
+    accumulator = schema_catalog.get((resolve_name(connection), database, collection))
+    if accumulator is None:
+        return projection, frozenset()
+    return slice_projection(projection, accumulator.long_arrays(limits.max_array), limits)
 
 @mcp.tool()
 def find(
@@ -24,44 +33,99 @@ def find(
     filter: dict = None,
     projection: dict = None,
     sort: dict = None,
-    limit: int = 20
+    limit: int = 20,
+    paginate: bool = False,
+    max_time_ms: int = None,
+    connection: str = None
 ) -> str:
     """Query documents from a MongoDB collection.
     
+    Responses are limited to RESPONSE_MAX_BYTES: long strings, large arrays and
+    binary values are shortened with markers, and documents stop being added
+    once the budget is spent (byte_budget_reached). Arrays known from
+    collection_schema to be oversized are sliced on the server.
+    
     Args:
         database: Database name
         collection: Collection name
         filter: Query filter (MongoDB filter syntax)
         projection: Fields to include/exclude (e.g., {"name": 1, "_id": 0})
         sort: Sort order (e.g., {"created_at": -1})
-        limit: Maximum documents to return (default: 20)
+        limit: Maximum documents to return (default: 20). Page size when paginating.
+        paginate: If true, keep the cursor open and return a next_token for get_more
+        max_time_ms: Time limit for this call in ms; can only lower MAX_TIME_MS
+        connection: Named connection (default: "default")
     """
     try:
-        client = _get_active_client()
+        client = get_active_client(connection)
         
         max_docs = int(os.getenv("MAX_DOCUMENTS", "100"))
         limit = min(limit, max_docs)
         
-        logger.info(f"find: {database}.{collection} filter={filter} limit={limit}")
+        logger.info("find: %s.%s filter=%s limit=%s", database, collection, filter, limit)
+        
+        cache_key = None
+        if not paginate:
+            cache_key = result_cache.make_key(
+                database, collection, "find", connection,
+                filter=filter, projection=projection, sort=sort, limit=limit
+            )
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                logger.info("find: served from cache")
+                return cached
+        
+        warning = check_query(
+            client, database, collection, "find", connection,
+            filter=filter, projection=projection, sort=sort, limit=limit
+        )
+        
+        limits = get_limits()
+        server_projection, sliced = _budget_projection(connection, database, collection, projection, limits)
+        budget = ResponseBudget(limits, sliced)
         
         coll = client[database][collection]
-        cursor = coll.find(filter or {}, projection or {})
+        started = time.perf_counter()
+        cursor = coll.find(filter or {}, server_projection or {})
         
         if sort:
             cursor = cursor.sort(list(sort.items()))
         
-        cursor = cursor.limit(limit)
-        documents = list(cursor)
+        if paginate:
+            cursor = cursor.batch_size(limit)
+            documents, overflow = budget.collect(cursor, limit)
+        else:
+            cursor = cursor.limit(limit)
+            documents, overflow = budget.collect(cursor, limit)
+            cursor.close()
+        workload_store.record(
+            connection, database, collection, "find",
+            query_shape(filter, sort, projection), (time.perf_counter() - started) * 1000
+        )
         
-        logger.info(f"find: returned {len(documents)} documents")
+        logger.info(
+            "find: returned %s documents", len(documents),
+            extra={"namespace": f"{database}.{collection}", "docs": len(documents)}
+        )
         
-        return json.dumps({
+        response = {
             "count": len(documents), 
-            "documents": _serialize(documents)
-        }, indent=2)
+            "documents": documents
+        }
+        budget.annotate(response)
+        if warning:
+            response["warning"] = warning
+        if paginate and (cursor.alive or overflow is not None):
+            response["next_token"] = cursor_registry.register(
+                cursor, f"{database}.{collection}", connection,
+                pending=[overflow] if overflow is not None else None, sliced=sliced
+            )
+        result = encode(response)
+        result_cache.put(cache_key, result, database, collection, connection=connection)
+        return result
         
     except Exception as e:
-        logger.error(f"find failed: {str(e)}")
+        logger.error("find failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
@@ -69,7 +133,8 @@ def find_one(
     database: str,
     collection: str,
     filter: dict = None,
-    projection: dict = None
+    projection: dict = None,
+    connection: str = None
 ) -> str:
     """Find a single document matching criteria.
     
@@ -78,45 +143,149 @@ def find_one(
         collection: Collection name
         filter: Query filter
         projection: Fields to include/exclude
+        connection: Named connection (default: "default")
     """
     try:
-        client = _get_active_client()
-        logger.info(f"find_one: {database}.{collection} filter={filter}")
+        client = get_active_client(connection)
+        logger.info("find_one: %s.%s filter=%s", database, collection, filter)
+        
+        cache_key = result_cache.make_key(
+            database, collection, "find_one", connection, filter=filter, projection=projection
+        )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("find_one: served from cache")
+            return cached
+        
+        limits = get_limits()
+        server_projection, sliced = _budget_projection(connection, database, collection, projection, limits)
         
         coll = client[database][collection]
-        document = coll.find_one(filter or {}, projection or {})
+        started = time.perf_counter()
+        document = coll.find_one(filter or {}, server_projection or {})
+        workload_store.record(
+            connection, database, collection, "find_one",
+            query_shape(filter, projection=projection), (time.perf_counter() - started) * 1000
+        )
         
         if not document:
             logger.debug("find_one: no document found")
-            return "No document found."
-            
-        return json.dumps(_serialize(document), indent=2)
+            result = "No document found."
+        else:
+            result = encode(truncate_document(document, limits, set(), sliced))
+        result_cache.put(cache_key, result, database, collection, connection=connection)
+        return result
         
     except Exception as e:
-        logger.error(f"find_one failed: {str(e)}")
+        logger.error("find_one failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
 def count(
     database: str,
     collection: str,
-    filter: dict = None
+    filter: dict = None,
+    mode: str = "exact",
+    latency_budget_ms: int = None,
+    sample_size: int = None,
+    max_time_ms: int = None,
+    connection: str = None
 ) -> str:
-    """Count documents matching a filter.
+    """Count documents matching a filter, exactly or as a cheaper estimate.
+    
+    Modes:
+    - exact: count_documents
+    - estimated: collection metadata when there is no filter; with a filter, an
+      exact count if the planner can answer it from an index (COUNT_SCAN),
+      otherwise a sampled approximation
+    - approximate: match a random sample and scale up, with a 95% confidence interval
+    - auto: metadata without a filter; otherwise an exact count limited to the
+      latency budget, falling back to approximate if it runs over
     
     Args:
         database: Database name
         collection: Collection name
         filter: Query filter
+        mode: "exact" (default), "estimated", "approximate" or "auto"
+        latency_budget_ms: Time allowed for an exact count in auto mode (default: COUNT_LATENCY_BUDGET_MS)
+        sample_size: Documents sampled for approximate counts (default: COUNT_SAMPLE_SIZE)
+        max_time_ms: Time limit for this call in ms; can only lower MAX_TIME_MS
+        connection: Named connection (default: "default")
     """
     try:
-        client = _get_active_client()
+        if mode not in counting.MODES:
+            return f"Error: Unknown count mode '{mode}'. Use one of {list(counting.MODES)}"
+        from pymongo.errors import ExecutionTimeout, NetworkTimeout
+        client = get_active_client(connection)
+        budget = latency_budget_ms or counting.get_latency_budget_ms()
+        sample_size = sample_size or counting.get_sample_size()
+        
+        cache_key = result_cache.make_key(
+            database, collection, "count", connection,
+            filter=filter, mode=mode, budget=budget if mode == counting.AUTO else None,
+            sample_size=sample_size if mode != counting.EXACT else None
+        )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("count: %s.%s served from cache", database, collection)
+            return cached
+        
         coll = client[database][collection]
-        count_val = coll.count_documents(filter or {})
-        logger.info(f"count: {database}.{collection} = {count_val}")
-        return json.dumps({"count": count_val}, indent=2)
+        shape = query_shape(filter)
+        response = None
+        warning = None
+        
+        if mode in (counting.ESTIMATED, counting.AUTO) and not filter:
+            response = {"count": coll.estimated_document_count(), "method": "metadata"}
+        elif mode == counting.ESTIMATED:
+            try:
+                plan = summarize(run_explain(client[database], build_command(collection, "count", filter=filter)))
+            except Exception as e:
+                logger.debug("count: explain failed, sampling instead: %s", e)
+                plan = None
+            if plan and "COUNT_SCAN" in plan.stages:
+                response = {"count": coll.count_documents(filter), "method": "index_count"}
+        elif mode == counting.AUTO:
+            slow_key = (resolve_name(connection), database, collection, shape)
+            if slow_key not in counting.slow_counts:
+                try:
+                    warning = check_query(client, database, collection, "count", connection, filter=filter)
+                    started = time.perf_counter()
+                    # A nested limit, since the call's own limit overrides maxTimeMS
+                    with time_limit(budget):
+                        count_val = coll.count_documents(filter)
+                    workload_store.record(
+                        connection, database, collection, "count", shape, (time.perf_counter() - started) * 1000
+                    )
+                    response = {"count": count_val, "method": "exact"}
+                except (ExecutionTimeout, NetworkTimeout):
+                    logger.info("count: exact count on %s.%s exceeded %sms, sampling instead", database, collection, budget)
+                    counting.slow_counts.add(slow_key)
+                except QueryGuardError as e:
+                    logger.info("count: %s Sampling instead.", e)
+        elif mode == counting.EXACT:
+            warning = check_query(client, database, collection, "count", connection, filter=filter)
+            started = time.perf_counter()
+            count_val = coll.count_documents(filter or {})
+            workload_store.record(
+                connection, database, collection, "count", shape, (time.perf_counter() - started) * 1000
+            )
+            response = {"count": count_val, "method": "exact"}
+        
+        if response is None:
+            response = {**counting.approximate_count(coll, filter or {}, sample_size), "method": "sampled"}
+        
+        logger.info(
+            "count: %s.%s = %s (%s)", database, collection, response["count"], response["method"],
+            extra={"namespace": f"{database}.{collection}"}
+        )
+        if warning:
+            response["warning"] = warning
+        result = encode(response)
+        result_cache.put(cache_key, result, database, collection, connection=connection)
+        return result
     except Exception as e:
-        logger.error(f"count failed: {str(e)}")
+        logger.error("count failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
@@ -124,69 +293,374 @@ def distinct(
     database: str,
     collection: str,
     field: str,
-    filter: dict = None
+    filter: dict = None,
+    max_time_ms: int = None,
+    connection: str = None
 ) -> str:
     """Get distinct values for a field.
     
+    At most DISTINCT_MAX_VALUES values are returned; use facet for counts,
+    paging and estimates on high-cardinality fields.
+    
     Args:
         database: Database name
         collection: Collection name
         field: Field name to get distinct values for
         filter: Optional query filter
+        max_time_ms: Time limit for this call in ms; can only lower MAX_TIME_MS
+        connection: Named connection (default: "default")
+    """
+    try:
+        client = get_active_client(connection)
+        
+        cache_key = result_cache.make_key(
+            database, collection, "distinct", connection, field=field, filter=filter
+        )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("distinct: %s.%s.%s served from cache", database, collection, field)
+            return cached
+        
+        from pymongo.errors import OperationFailure
+        coll = client[database][collection]
+        started = time.perf_counter()
+        try:
+            values = coll.distinct(field, filter or {})
+        except OperationFailure as e:
+            if e.code == 17217:
+                return f"Error: Distinct values of '{field}' exceed the 16MB result limit. Use facet to page through them."
+            raise
+        workload_store.record(
+            connection, database, collection, "distinct",
+            query_shape(filter), (time.perf_counter() - started) * 1000
+        )
+        logger.info(
+            "distinct: %s.%s.%s = %s values", database, collection, field, len(values),
+            extra={"namespace": f"{database}.{collection}", "docs": len(values)}
+        )
+        max_values = facets.get_distinct_max_values()
+        response = {"values": values[:max_values] if max_values else values}
+        if max_values and len(values) > max_values:
+            response["truncated"] = True
+            response["total_values"] = len(values)
+        result = encode(response)
+        result_cache.put(cache_key, result, database, collection, connection=connection)
+        return result
+    except Exception as e:
+        logger.error("distinct failed: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def facet(
+    database: str,
+    collection: str,
+    field: str,
+    filter: dict = None,
+    top_k: int = 20,
+    distinct_count: str = "approximate",
+    sample_size: int = None,
+    max_time_ms: int = None,
+    connection: str = None
+) -> str:
+    """Most frequent values of a field with their counts, for fields of any cardinality.
+    
+    Values are grouped and counted on the server and returned most frequent
+    first. If there are more than top_k, a next_token pages through the rest
+    with get_more. Arrays are unwound as in distinct.
+    
+    The number of distinct values is exact when all values fit on the first
+    page. Otherwise distinct_count decides:
+    - approximate: estimated from a random sample (GEE), with the number seen as a lower bound
+    - exact: a second aggregation counting every group
+    - none: skip it
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        field: Field to facet on (dot notation for nested fields)
+        filter: Optional query filter
+        top_k: Values per page (capped by MAX_DOCUMENTS, default: 20)
+        distinct_count: "approximate" (default), "exact" or "none"
+        sample_size: Documents sampled for the approximate count (default: COUNT_SAMPLE_SIZE)
+        max_time_ms: Time limit for this call in ms; can only lower MAX_TIME_MS
+        connection: Named connection (default: "default")
     """
     try:
-        client = _get_active_client()
+        if distinct_count not in facets.DISTINCT_COUNT_MODES:
+            return f"Error: Unknown distinct_count '{distinct_count}'. Use one of {list(facets.DISTINCT_COUNT_MODES)}"
+        client = get_active_client(connection)
+        top_k = max(1, min(top_k, int(os.getenv("MAX_DOCUMENTS", "100"))))
+        sample_size = sample_size or counting.get_sample_size()
+        
+        cache_key = result_cache.make_key(
+            database, collection, "facet", connection, field=field, filter=filter, top_k=top_k,
+            distinct_count=distinct_count, sample_size=sample_size if distinct_count == facets.APPROXIMATE else None
+        )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info("facet: %s.%s.%s served from cache", database, collection, field)
+            return cached
+        
+        pipeline = facets.top_values_pipeline(field, filter)
+        warning = check_query(client, database, collection, "aggregate", connection, pipeline=pipeline)
+        
         coll = client[database][collection]
-        values = coll.distinct(field, filter or {})
-        logger.info(f"distinct: {database}.{collection}.{field} = {len(values)} values")
-        return json.dumps({"values": _serialize(values)}, indent=2)
+        started = time.perf_counter()
+        cursor = coll.aggregate(pipeline, batchSize=top_k)
+        budget = ResponseBudget()
+        values, overflow = budget.collect(cursor, top_k)
+        workload_store.record(
+            connection, database, collection, "aggregate",
+            pipeline_shape(pipeline), (time.perf_counter() - started) * 1000
+        )
+        has_more = cursor.alive or overflow is not None
+        
+        response = {"field": field, "count": len(values), "values": values}
+        if not has_more:
+            response["distinct_count"] = len(values)
+        elif distinct_count == facets.EXACT:
+            response["distinct_count"] = facets.exact_distinct_count(coll, field, filter)
+        elif distinct_count == facets.APPROXIMATE:
+            response["distinct_estimate"] = facets.approximate_distinct_count(coll, field, filter, sample_size)
+        budget.annotate(response)
+        if warning:
+            response["warning"] = warning
+        if has_more:
+            response["next_token"] = cursor_registry.register(
+                cursor, f"{database}.{collection}", connection,
+                pending=[overflow] if overflow is not None else None
+            )
+        
+        logger.info(
+            "facet: %s.%s.%s returned %s values", database, collection, field, len(values),
+            extra={"namespace": f"{database}.{collection}", "docs": len(values)}
+        )
+        result = encode(response)
+        if not has_more:
+            result_cache.put(cache_key, result, database, collection, connection=connection)
+        return result
     except Exception as e:
-        logger.error(f"distinct failed: {str(e)}")
+        logger.error("facet failed: %s", e)
         return f"Error: {str(e)}"
 
 @mcp.tool()
 def aggregate(
     database: str,
     collection: str,
-    pipeline: list
+    pipeline: list,
+    paginate: bool = False,
+    max_time_ms: int = None,
+    connection: str = None
 ) -> str:
     """Run an aggregation pipeline.
     
+    Results are capped at MAX_DOCUMENTS by a $limit pushed to the server; the
+    response lists any such rewrites and whether results were truncated. Output
+    documents are shortened and cut off at RESPONSE_MAX_BYTES as in find.
+    
     Args:
         database: Database name
         collection: Collection name
         pipeline: Aggregation pipeline stages
+        paginate: If true, keep the cursor open and return a next_token for get_more
+        max_time_ms: Time limit for this call in ms; can only lower MAX_TIME_MS
+        connection: Named connection (default: "default")
     """
     try:
-        client = _get_active_client()
+        client = get_active_client(connection)
+        
+        analysis = analyze_pipeline(database, collection, pipeline)
         
         read_only = os.getenv("READ_ONLY", "false").lower() == "true"
-        if read_only:
-            str_pipeline = str(pipeline)
-            if "$out" in str_pipeline or "$merge" in str_pipeline:
-                logger.warning("Blocked aggregation with $out/$merge in read-only mode")
-                return "Error: Aggregation with $out or $merge is not allowed in read-only mode."
+        if read_only and analysis.write_stages:
+            logger.warning("Blocked aggregation with write stages in read-only mode: %s", analysis.write_stages)
+            return "Error: Aggregation with $out or $merge is not allowed in read-only mode."
 
         max_docs = int(os.getenv("MAX_DOCUMENTS", "100"))
         
-        logger.info(f"aggregate: {database}.{collection} pipeline={len(pipeline)} stages")
+        logger.info("aggregate: %s.%s pipeline=%s stages", database, collection, len(pipeline))
+        
+        cache_key = None
+        if analysis.cacheable and not paginate:
+            cache_key = result_cache.make_key(database, collection, "aggregate", connection, pipeline=pipeline)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                logger.info("aggregate: served from cache")
+                return cached
+        
+        warning = check_query(client, database, collection, "aggregate", connection, pipeline=pipeline)
         
         coll = client[database][collection]
-        cursor = coll.aggregate(pipeline)
         
-        documents = []
-        for doc in cursor:
-            documents.append(doc)
-            if len(documents) >= max_docs:
-                break
+        rewrites = []
+        if paginate:
+            batch_size = max_docs
+        else:
+            pipeline, batch_size, rewrites = limit_pipeline(pipeline, max_docs)
         
-        logger.info(f"aggregate: returned {len(documents)} documents")
-                
-        return json.dumps({
+        started = time.perf_counter()
+        try:
+            cursor = coll.aggregate(pipeline, batchSize=batch_size)
+        finally:
+            for namespace in analysis.writes:
+                result_cache.invalidate(*namespace.split(".", 1), connection)
+                profile_cache.invalidate(*namespace.split(".", 1), connection)
+                metadata_catalog.note_write(*namespace.split(".", 1), connection)
+        budget = ResponseBudget()
+        if paginate:
+            documents, overflow = budget.collect(cursor, max_docs)
+            truncated = False
+        else:
+            documents, overflow = budget.collect(cursor, max_docs + 1)
+            truncated = len(documents) > max_docs
+            del documents[max_docs:]
+            cursor.close()
+        workload_store.record(
+            connection, database, collection, "aggregate",
+            pipeline_shape(pipeline), (time.perf_counter() - started) * 1000
+        )
+        
+        logger.info(
+            "aggregate: returned %s documents", len(documents),
+            extra={"namespace": f"{database}.{collection}", "docs": len(documents)}
+        )
+        
+        response = {
             "count": len(documents), 
-            "documents": _serialize(documents)
-        }, indent=2)
+            "documents": documents
+        }
+        if truncated:
+            response["truncated"] = True
+        budget.annotate(response)
+        if warning:
+            response["warning"] = warning
+        if rewrites:
+            response["rewrites"] = rewrites
+        if paginate and (cursor.alive or overflow is not None):
+            response["next_token"] = cursor_registry.register(
+                cursor, f"{database}.{collection}", connection,
+                pending=[overflow] if overflow is not None else None
+            )
+        result = encode(response)
+        result_cache.put(cache_key, result, database, collection, analysis.reads, connection)
+        return result
         
     except Exception as e:
-        logger.error(f"aggregate failed: {str(e)}")
+        logger.error("aggregate failed: %s", e)
         return f"Error: {str(e)}"
+
+@mcp.tool()
+def explain(
+    database: str,
+    collection: str,
+    operation: str = "find",
+    filter: dict = None,
+    projection: dict = None,
+    sort: dict = None,
+    limit: int = None,
+    pipeline: list = None,
+    field: str = None,
+    verbosity: str = "executionStats",
+    raw: bool = False,
+    connection: str = None
+) -> str:
+    """Explain how MongoDB would run a query and summarise the plan.
+    
+    Returns the winning plan, indexes used, documents examined vs returned and
+    execution time, with warnings for collection scans and in-memory sorts.
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        operation: "find", "count", "distinct" or "aggregate"
+        filter: Query filter (find, count, distinct)
+        projection: Fields to include/exclude (find)
+        sort: Sort order (find)
+        limit: Maximum documents (find)
+        pipeline: Aggregation pipeline stages (aggregate)
+        field: Field name (distinct)
+        verbosity: "queryPlanner" (plan only, nothing executed) or "executionStats"
+            (runs the query to measure it)
+        raw: If true, include the full explain output
+        connection: Named connection (default: "default")
+    """
+    try:
+        client = get_active_client(connection)
+        
+        if operation == "aggregate":
+            analysis = analyze_pipeline(database, collection, pipeline or [])
+            if analysis.write_stages:
+                # Never execute $out/$merge just to measure them
+                verbosity = "queryPlanner"
+        
+        command = build_command(
+            collection, operation, filter=filter, projection=projection,
+            sort=sort, limit=limit, pipeline=pipeline, field=field
+        )
+        output = run_explain(client[database], command, verbosity)
+        summary = summarize(output)
+        logger.info("explain: %s.%s %s -> %s", database, collection, operation, ' <- '.join(summary.stages))
+        
+        response = summary.to_dict()
+        response["verbosity"] = verbosity
+        if raw:
+            response["raw"] = output
+        return encode(response)
+    except Exception as e:
+        logger.error("explain failed: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def get_more(token: str, batch_size: int = 20) -> str:
+    """Fetch the next page from a cursor opened by find or aggregate with paginate=true.
+    
+    Args:
+        token: The next_token returned by the previous page
+        batch_size: Maximum documents to return (default: 20)
+    """
+    try:
+        max_docs = int(os.getenv("MAX_DOCUMENTS", "100"))
+        batch_size = min(batch_size, max_docs)
+        
+        with cursor_registry.lease(token) as entry:
+            budget = ResponseBudget(sliced=entry.sliced)
+            pending = iter(entry.pending)
+            documents, overflow = budget.collect(chain(pending, entry.cursor), batch_size)
+            entry.pending = ([overflow] if overflow is not None else []) + list(pending)
+            has_more = entry.cursor.alive or bool(entry.pending)
+            namespace = entry.namespace
+        
+        logger.info(
+            "get_more: %s returned %s documents", namespace, len(documents),
+            extra={"namespace": namespace, "docs": len(documents)}
+        )
+        
+        response = {
+            "count": len(documents),
+            "documents": documents
+        }
+        budget.annotate(response)
+        if has_more:
+            response["next_token"] = token
+        return encode(response)
+        
+    except KeyError as e:
+        logger.warning("get_more: %s", e.args[0])
+        return f"Error: {e.args[0]}"
+    except Exception as e:
+        logger.error("get_more failed: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def cache_stats(clear: bool = False) -> str:
+    """Show result cache hit/miss counters and size.
+    
+    Args:
+        clear: If true, drop all cached results and reset the counters
+    """
+    stats = result_cache.stats()
+    if clear:
+        result_cache.clear()
+        result_cache.reset_stats()
+        logger.info("Result cache cleared")
+    return encode(stats)
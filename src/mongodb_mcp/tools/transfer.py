@@ -0,0 +1,254 @@
+import gzip
+import os
+import tempfile
+import time
+import bson
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from mongodb_mcp.app import mcp
+from mongodb_mcp.connection import get_active_client
+from mongodb_mcp.encoding import encode
+from mongodb_mcp.logging_config import get_logger
+from mongodb_mcp.tools.crud import _after_write, _check_readonly
+
+logger = get_logger("tools.transfer")
+
+NDJSON = "ndjson"
+BSON = "bson"
+
+_RAW_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+def _transfer_root() -> str:
+    """The TRANSFER_DIR directory; file transfer is disabled unless it is set."""
+    root = os.getenv("TRANSFER_DIR")
+    if not root:
+        raise RuntimeError("File transfer is disabled. Set TRANSFER_DIR to enable export_collection and import_collection.")
+    return os.path.realpath(root)
+
+def _resolve_path(path: str) -> tuple[str, str]:
+    """Resolve a path inside TRANSFER_DIR, refusing anything that escapes it.
+
+    Returns the absolute path and the path relative to TRANSFER_DIR; only
+    the latter is shown to clients.
+    """
+    root = _transfer_root()
+    resolved = os.path.realpath(os.path.join(root, path))
+    if resolved == root or os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Path '{path}' is outside TRANSFER_DIR")
+    return resolved, os.path.relpath(resolved, root)
+
+def _detect_format(path: str, format: str = None) -> tuple[str, bool]:
+    """Return (format, gzipped) from an explicit format or the file extension."""
+    gzipped = path.endswith(".gz")
+    base = path[:-3] if gzipped else path
+    if format is None:
+        format = BSON if base.endswith(".bson") else NDJSON
+    if format not in (NDJSON, BSON):
+        raise ValueError(f"Unsupported format '{format}'. Use 'ndjson' or 'bson'")
+    return format, gzipped
+
+def _open(path: str, mode: str, gzipped: bool):
+    if gzipped:
+        return gzip.open(path, mode, compresslevel=int(os.getenv("TRANSFER_GZIP_LEVEL", "6")))
+    return open(path, mode)
+
+class _Progress:
+    """Logs throughput every TRANSFER_PROGRESS_EVERY documents."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.every = int(os.getenv("TRANSFER_PROGRESS_EVERY", "100000"))
+        self.started = time.perf_counter()
+        self.count = 0
+        self._next = self.every
+
+    def add(self, n: int):
+        self.count += n
+        if self.count >= self._next:
+            self._next += self.every
+            logger.info("%s: %s docs (%s docs/s)", self.label, self.count, self.rate())
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def rate(self) -> int:
+        return int(self.count / self.elapsed()) if self.elapsed() else 0
+
+def _read_documents(f, format: str):
+    """Yield (document, size) pairs from an open NDJSON or BSON file."""
+    if format == BSON:
+        for doc in bson.decode_file_iter(f, codec_options=_RAW_OPTIONS):
+            yield doc, len(doc.raw)
+        return
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json_util.loads(line), len(line)
+
+@mcp.tool()
+def export_collection(
+    database: str,
+    collection: str,
+    path: str,
+    filter: dict = None,
+    projection: dict = None,
+    format: str = None,
+    batch_size: int = 1000,
+    overwrite: bool = False,
+    connection: str = None
+) -> str:
+    """Stream a collection (or filtered subset) to a local NDJSON or BSON file.
+    
+    Documents are written as they arrive, so memory use stays bounded by one
+    batch. A path ending in .gz is gzip-compressed. Writing files counts as a
+    write, so this is disabled in READ_ONLY mode.
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        path: Output file, relative to TRANSFER_DIR (e.g. "orders.ndjson.gz")
+        filter: Query filter (default: all documents)
+        projection: Fields to include/exclude
+        format: "ndjson" (Extended JSON, one document per line) or "bson"
+            (mongodump-compatible). Defaults to the file extension.
+        batch_size: Documents fetched per round trip
+        overwrite: Replace the file if it already exists (default: refuse)
+        connection: Named connection (default: "default")
+    """
+    try:
+        _check_readonly()
+        format, gzipped = _detect_format(path, format)
+        target, relative = _resolve_path(path)
+        if os.path.exists(target) and not overwrite:
+            return f"Error: File already exists: {relative} (pass overwrite=true to replace it)"
+        if os.path.isdir(target):
+            return f"Error: Path is a directory: {relative}"
+        client = get_active_client(connection)
+        coll = client[database][collection]
+        if format == BSON:
+            # Raw documents are written back out without decoding
+            coll = coll.with_options(codec_options=_RAW_OPTIONS)
+
+        progress = _Progress(f"export {database}.{collection}")
+        # A fresh temporary file next to the target, so nothing else is clobbered
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".export-", suffix=".partial")
+        os.close(fd)
+        written = 0
+        try:
+            with _open(temp_path, "wb", gzipped) as f:
+                with coll.find(filter or {}, projection, batch_size=batch_size) as cursor:
+                    for doc in cursor:
+                        if format == BSON:
+                            data = doc.raw
+                        else:
+                            data = encode(doc, pretty=False).encode() + b"\n"
+                        f.write(data)
+                        written += len(data)
+                        progress.add(1)
+            os.replace(temp_path, target)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        logger.info("export_collection: %s.%s -> %s (%s docs)", database, collection, target, progress.count)
+        return encode({
+            "path": relative,
+            "format": format,
+            "gzip": gzipped,
+            "exported_count": progress.count,
+            "bytes_written": written,
+            "elapsed_ms": round(progress.elapsed() * 1000, 1),
+            "docs_per_second": progress.rate()
+        })
+    except Exception as e:
+        logger.error("export_collection failed: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def import_collection(
+    database: str,
+    collection: str,
+    path: str,
+    format: str = None,
+    batch_size: int = 1000,
+    ordered: bool = False,
+    connection: str = None
+) -> str:
+    """Stream documents from a local NDJSON or BSON file into a collection.
+    
+    The file is read incrementally and inserted in batches bounded by
+    batch_size and BULK_CHUNK_MAX_BYTES. A path ending in .gz is decompressed.
+    
+    Args:
+        database: Database name
+        collection: Collection name
+        path: Input file, relative to TRANSFER_DIR
+        format: "ndjson" or "bson". Defaults to the file extension.
+        batch_size: Documents per insert batch
+        ordered: If true, stop at the first failed insert. If false (default),
+            skip failing documents (e.g. duplicate keys) and keep going.
+        connection: Named connection (default: "default")
+    """
+    try:
+        _check_readonly()
+        format, gzipped = _detect_format(path, format)
+        source, relative = _resolve_path(path)
+        if not os.path.isfile(source):
+            return f"Error: File not found: {path}"
+        from pymongo import InsertOne
+        from mongodb_mcp import bulk
+
+        client = get_active_client(connection)
+        coll = client[database][collection]
+        _, max_bytes = bulk.get_chunk_limits()
+
+        progress = _Progress(f"import {database}.{collection}")
+        summary = bulk.BulkSummary()
+        stopped = False
+        batch, batch_bytes, offset = [], 0, 0
+
+        def flush():
+            details = bulk.run_chunk(coll, offset, batch, ordered)
+            summary.add(details)
+            progress.add(len(batch))
+            return ordered and bool(details.get("writeErrors"))
+
+        try:
+            with _open(source, "rb", gzipped) as f:
+                for doc, size in _read_documents(f, format):
+                    if batch and (len(batch) >= batch_size or batch_bytes + size > max_bytes):
+                        if flush():
+                            stopped = True
+                            break
+                        offset += len(batch)
+                        batch, batch_bytes = [], 0
+                    batch.append(InsertOne(doc))
+                    batch_bytes += size
+                if batch and not stopped:
+                    stopped = flush()
+        finally:
+            _after_write(database, collection, connection)
+
+        logger.info(
+            "import_collection: %s -> %s.%s inserted=%s errors=%s",
+            source, database, collection, summary.counts["inserted_count"], summary.error_count
+        )
+        response = {
+            "path": relative,
+            "format": format,
+            "gzip": gzipped,
+            "inserted_count": summary.counts["inserted_count"],
+            "read_count": progress.count,
+            "elapsed_ms": round(progress.elapsed() * 1000, 1),
+            "docs_per_second": progress.rate()
+        }
+        if "errors" in summary.to_dict():
+            response["errors"] = summary.to_dict()["errors"]
+        if stopped:
+            response["stopped_early"] = True
+        return encode(response)
+    except Exception as e:
+        logger.error("import_collection failed: %s", e)
+        return f"Error: {str(e)}"
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+from mongodb_mcp.app import mcp
+from mongodb_mcp.budget import ResponseBudget
+from mongodb_mcp.changestreams import PAUSE, subscriptions
+from mongodb_mcp.connection import get_active_client
+from mongodb_mcp.encoding import encode
+from mongodb_mcp.logging_config import get_logger
+
+logger = get_logger("tools.watch")
+
+@mcp.tool()
+def watch(
+    database: str = None,
+    collection: str = None,
+    pipeline: list = None,
+    full_document: str = None,
+    resume_after: dict = None,
+    overflow: str = PAUSE,
+    connection: str = None
+) -> str:
+    """Start watching changes to a collection, a database or the whole cluster.
+
+    Changes are buffered on the server side of this tool until they are read
+    with poll_changes. Requires a replica set or sharded cluster.
+
+    Args:
+        database: Database to watch (omit to watch the whole cluster)
+        collection: Collection to watch (requires database)
+        pipeline: Aggregation stages applied to the change events, e.g. [{"$match": {"operationType": "insert"}}]
+        full_document: "updateLookup" to include the current document with updates,
+            or "whenAvailable"/"required" to use pre/post images
+        resume_after: A resume_token from an earlier poll_changes, to continue where it left off
+        overflow: When the buffer (WATCH_BUFFER_SIZE) is full, "pause" reading until the next
+            poll (default) or "drop_oldest" events
+        connection: Connection name (default: "default")
+    """
+    try:
+        client = get_active_client(connection)
+        subscription = subscriptions.open(
+            client, database, collection, pipeline, full_document, resume_after, overflow, connection
+        )
+        return encode({
+            "subscription": subscription.id,
+            "target": subscription.description,
+            "resume_token": subscription.resume_token,
+        })
+    except Exception as e:
+        logger.error("watch failed: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+async def poll_changes(subscription: str, max_events: int = 100, wait_ms: int = 0) -> str:
+    """Read the changes buffered for a subscription since the last poll.
+
+    Events are removed from the buffer once returned. The resume_token of the
+    last returned event can be passed to watch to continue from it later.
+
+    Args:
+        subscription: The subscription id returned by watch
+        max_events: Maximum events to return (capped by MAX_DOCUMENTS)
+        wait_ms: If nothing is buffered, wait up to this long for a change (capped by WATCH_MAX_WAIT_MS)
+    """
+    try:
+        entry = subscriptions.get(subscription)
+        max_events = max(1, min(max_events, int(os.getenv("MAX_DOCUMENTS", "100"))))
+        wait_ms = min(wait_ms, int(os.getenv("WATCH_MAX_WAIT_MS", "10000")))
+        # Waiting happens on the event loop so it doesn't hold a worker thread
+        deadline = time.monotonic() + wait_ms / 1000
+        while not entry.pending() and not entry.ended and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        budget = ResponseBudget()
+        events, status = entry.poll(max_events, budget)
+        response = {"count": len(events), "events": events, **status}
+        budget.annotate(response)
+        return encode(response)
+    except KeyError as e:
+        logger.warning("poll_changes: %s", e.args[0])
+        return f"Error: {e.args[0]}"
+    except Exception as e:
+        logger.error("poll_changes failed: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+def unwatch(subscription: str) -> str:
+    """Stop a subscription and discard its buffered changes.
+
+    Args:
+        subscription: The subscription id returned by watch
+    """
+    if subscriptions.close(subscription):
+        logger.info("Closed subscription %s", subscription)
+        return f"Subscription {subscription} closed"
+    return f"Error: Unknown or expired subscription '{subscription}'"
+
+@mcp.tool()
+def list_subscriptions() -> str:
+    """List open change stream subscriptions with their buffered and received event counts."""
+    return encode(subscriptions.list())
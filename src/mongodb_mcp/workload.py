@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from mongodb_mcp.connection import resolve_name
+
+# Latency assumed for an indexed query when no indexed shape has been observed
+DEFAULT_INDEXED_MS = 1.0
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A query with its values stripped, as far as index selection is concerned."""
+    equality: tuple[str, ...] = ()
+    sort: tuple[tuple[str, int], ...] = ()
+    range: tuple[str, ...] = ()
+    projection: tuple[str, ...] = ()
+    complex: bool = False
+
+    @property
+    def indexable(self) -> bool:
+        return bool(self.equality or self.sort or self.range)
+
+    def to_dict(self) -> dict:
+        result = {"equality": list(self.equality), "sort": dict(self.sort), "range": list(self.range)}
+        if self.projection:
+            result["projection"] = list(self.projection)
+        if self.complex:
+            result["complex"] = True
+        return result
+
+def _classify(filter: dict, equality: set, ranges: set) -> bool:
+    """Sort filter fields into equality and range predicates.
+
+    Returns True if the filter has operators the shape cannot describe
+    ($or, $expr, $text, ...).
+    """
+    unsupported = False
+    for key, value in filter.items():
+        if key == "$and" and isinstance(value, list):
+            for clause in value:
+                if isinstance(clause, dict):
+                    unsupported |= _classify(clause, equality, ranges)
+        elif key.startswith("$"):
+            unsupported = True
+        elif isinstance(value, dict) and value and all(op.startswith("$") for op in value):
+            operators = set(value)
+            if operators <= {"$eq", "$in"}:
+                equality.add(key)
+            else:
+                ranges.add(key)
+        elif hasattr(value, "pattern"):
+            # Regex literals match by range scan at best
+            ranges.add(key)
+        else:
+            equality.add(key)
+    return unsupported
+
+def query_shape(filter: dict = None, sort: dict = None, projection: dict = None) -> QueryShape:
+    equality, ranges = set(), set()
+    unsupported = _classify(filter or {}, equality, ranges)
+    sort_keys = tuple(
+        (name, -1 if direction == -1 else 1)
+        for name, direction in (sort or {}).items()
+        if name != "$natural"
+    )
+    return QueryShape(
+        equality=tuple(sorted(equality)),
+        sort=sort_keys,
+        range=tuple(sorted(ranges - equality)),
+        projection=tuple(sorted(projection or {})),
+        complex=unsupported,
+    )
+
+def pipeline_shape(pipeline: list) -> QueryShape:
+    """Shape of the leading $match stages and the $sort right after them."""
+    filters, sort = [], None
+    for stage in pipeline:
+        if not isinstance(stage, dict) or len(stage) != 1:
+            break
+        (name, spec), = stage.items()
+        if name == "$match" and isinstance(spec, dict) and sort is None:
+            filters.append(spec)
+        elif name == "$sort" and isinstance(spec, dict) and sort is None:
+            sort = spec
+        else:
+            break
+    filter = filters[0] if len(filters) == 1 else ({"$and": filters} if filters else {})
+    return query_shape(filter, sort)
+
+class _ShapeStats:
+    def __init__(self, shape: QueryShape):
+        self.shape = shape
+        self.operations: set[str] = set()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_seen = 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+class WorkloadStore:
+    """Frequency and latency per (namespace, query shape), bounded in LRU order."""
+
+    def __init__(self, enabled: bool = True, max_shapes: int = 1000):
+        self.enabled = enabled
+        self.max_shapes = max_shapes
+        self._shapes: OrderedDict[tuple, _ShapeStats] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, connection: str, database: str, collection: str, operation: str,
+               shape: QueryShape, elapsed_ms: float):
+        if not self.enabled:
+            return
+        key = (resolve_name(connection), database, collection, shape)
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is None:
+                stats = self._shapes[key] = _ShapeStats(shape)
+                while len(self._shapes) > self.max_shapes:
+                    self._shapes.popitem(last=False)
+            else:
+                self._shapes.move_to_end(key)
+            stats.operations.add(operation)
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.last_seen = time.time()
+
+    def shapes(self, connection: str, database: str, collection: str) -> list[_ShapeStats]:
+        namespace = (resolve_name(connection), database, collection)
+        with self._lock:
+            return [stats for key, stats in self._shapes.items() if key[:3] == namespace]
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+
+def esr_keys(shape: QueryShape) -> list[tuple[str, int]]:
+    """Index keys in equality, sort, range order."""
+    keys = [(name, 1) for name in shape.equality]
+    keys += [(name, direction) for name, direction in shape.sort if name not in shape.equality]
+    used = {name for name, _ in keys}
+    keys += [(name, 1) for name in shape.range if name not in used]
+    return keys
+
+def index_serves(shape: QueryShape, index_keys: list[tuple]) -> bool:
+    """Whether an index's key pattern serves a shape's filter and sort."""
+    position = len(shape.equality)
+    if {name for name, _ in index_keys[:position]} != set(shape.equality):
+        return False
+
+    sort = [(name, direction) for name, direction in shape.sort if name not in shape.equality]
+    if sort:
+        segment = index_keys[position:position + len(sort)]
+        if [name for name, _ in segment] != [name for name, _ in sort]:
+            return False
+        same = all(direction == key_direction for (_, direction), (_, key_direction) in zip(sort, segment))
+        inverse = all(direction == -key_direction for (_, direction), (_, key_direction) in zip(sort, segment)
+                      if isinstance(key_direction, int))
+        if not (same or inverse):
+            return False
+        position += len(sort)
+
+    range_fields = set(shape.range) - {name for name, _ in sort}
+    if range_fields:
+        return position < len(index_keys) and index_keys[position][0] in range_fields
+    return True
+
+@dataclass
+class Recommendation:
+    keys: list[tuple[str, int]]
+    shapes: list[_ShapeStats] = field(default_factory=list)
+
+    def saved_ms(self, indexed_ms: float) -> float:
+        return sum(max(0.0, stats.avg_ms - indexed_ms) * stats.count for stats in self.shapes)
+
+def recommend(shapes: list[_ShapeStats], existing: list[list[tuple]], min_count: int = 1) -> dict:
+    """Propose ESR-ordered indexes for observed shapes not served by existing indexes.
+
+    Time saved is estimated as the excess latency of each affected shape over
+    the average latency of shapes that already use an index on the same
+    collection (or DEFAULT_INDEXED_MS if there are none), times its frequency.
+    Candidates that a longer candidate also serves are merged into it.
+    """
+    indexed, unserved, unindexable = [], [], 0
+    for stats in shapes:
+        if not stats.shape.indexable:
+            unindexable += 1
+        elif any(index_serves(stats.shape, keys) for keys in existing):
+            indexed.append(stats)
+        elif stats.count >= min_count:
+            unserved.append(stats)
+
+    indexed_ms = DEFAULT_INDEXED_MS
+    if indexed:
+        indexed_ms = sum(s.total_ms for s in indexed) / sum(s.count for s in indexed)
+
+    candidates: dict[tuple, Recommendation] = {}
+    for stats in unserved:
+        keys = esr_keys(stats.shape)
+        candidates.setdefault(tuple(keys), Recommendation(keys)).shapes.append(stats)
+
+    proposed: list[Recommendation] = []
+    for candidate in sorted(candidates.values(), key=lambda c: len(c.keys), reverse=True):
+        for recommendation in proposed:
+            if all(index_serves(stats.shape, recommendation.keys) for stats in candidate.shapes):
+                recommendation.shapes.extend(candidate.shapes)
+                break
+        else:
+            proposed.append(candidate)
+
+    proposed.sort(key=lambda r: r.saved_ms(indexed_ms), reverse=True)
+    return {
+        "indexed_latency_ms": round(indexed_ms, 3),
+        "recommendations": [
+            {
+                "index": dict(r.keys),
+                "est_time_saved_ms": round(r.saved_ms(indexed_ms), 1),
+                "queries": sum(s.count for s in r.shapes),
+                "avg_ms": round(sum(s.total_ms for s in r.shapes) / sum(s.count for s in r.shapes), 3),
+                "shapes": [
+                    {**s.shape.to_dict(), "operations": sorted(s.operations), "count": s.count}
+                    for s in r.shapes
+                ],
+            }
+            for r in proposed
+        ],
+        "shapes_already_indexed": len(indexed),
+        "shapes_not_indexable": unindexable,
+    }
+
+workload_store = WorkloadStore(
+    enabled=os.getenv("WORKLOAD_CAPTURE", "true").lower() == "true",
+    max_shapes=int(os.getenv("WORKLOAD_MAX_SHAPES", "1000"))
+)
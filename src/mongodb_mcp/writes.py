@@ -0,0 +1,30 @@
+from collections import OrderedDict
+
+class WriteLog:
+    """Sequence number of the last write per scope, bounded to max_scopes scopes.
+
+    Readers take seq before reading and ask written_since afterwards. Scopes
+    are kept in write order; past max_scopes the least recently written are
+    forgotten and floor rises to the last sequence number forgotten, so a
+    read older than floor counts as racing a write. Callers hold their own lock.
+    """
+
+    def __init__(self, max_scopes: int = 10000):
+        self.max_scopes = max_scopes
+        self.seq = 0
+        self.floor = 0
+        self._last: OrderedDict = OrderedDict()
+
+    def record(self, scope):
+        self.seq += 1
+        self._last[scope] = self.seq
+        self._last.move_to_end(scope)
+        while len(self._last) > self.max_scopes:
+            _, self.floor = self._last.popitem(last=False)
+
+    def written_since(self, seq: int, scopes) -> bool:
+        """Whether any of scopes was written after seq."""
+        return seq < self.floor or any(self._last.get(scope, 0) > seq for scope in scopes)
+
+    def __len__(self) -> int:
+        return len(self._last)